@@ -0,0 +1,465 @@
+"""
+Benchmarks for the calculation hot paths.
+
+Each benchmark is run at several input sizes and reported as seconds per item
+(and items per second). Results are written as JSON; with --compare, the run
+fails (exit status 1) if any metric got slower than the baseline by more than
+--threshold percent.
+
+    python benchmarks/bench.py --output bench.json
+    python benchmarks/bench.py --sizes 1 1000 --compare bench.json --threshold 15
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import numpy as np
+
+import compiled_config
+from brackets import BracketTable
+from corporate import CorporateRevenue
+from cra import CRA, get_config_registry
+from gross_from_remittance import gross_from_remittance
+from individual import IndividualRevenue
+
+YEAR = 2024
+DEFAULT_SIZES = (1, 1_000, 1_000_000)
+# Scalar and subprocess benchmarks are capped; larger sizes are skipped for them
+# and listed under "skipped" in the report
+SCALAR_MAX = 100_000
+CLI_MAX = 100_000
+MIN_SECONDS = 0.2
+
+
+def _incomes(n, seed=0):
+    return np.random.default_rng(seed).uniform(1_000, 400_000, n)
+
+
+def _time(fn, min_seconds=MIN_SECONDS, repeat=3):
+    """Best wall time of fn(), repeating short runs until min_seconds is reached."""
+    best = float("inf")
+    for _ in range(repeat):
+        loops = 0
+        start = time.perf_counter()
+        while True:
+            fn()
+            loops += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                break
+        best = min(best, elapsed / loops)
+        if best > min_seconds * 10:
+            break
+    return best
+
+
+############################################
+# Benchmarks: fn(size) -> seconds for `size` items, or None to skip
+############################################
+def bench_individual_scalar(n):
+    if n > SCALAR_MAX:
+        return None
+    rev = IndividualRevenue(YEAR)
+    incomes = _incomes(n).tolist()
+
+    def run():
+        for income in incomes:
+            rev.compute_basic_return(income, 0.0, 0.0, 0.0, 0.0, 0.0, False)
+
+    return _time(run)
+
+
+def bench_individual_batch(n):
+    rev = IndividualRevenue(YEAR)
+    incomes = _incomes(n)
+    return _time(lambda: rev.compute_basic_return_batch(incomes, 0.0, 0.0, 0.0, 0.0, 0.0, False))
+
+
+def bench_individual_projected(n):
+    """compute_basic_return_fields for total_tax_payable only."""
+    if n > SCALAR_MAX:
+        return None
+    rev = IndividualRevenue(YEAR)
+    incomes = _incomes(n).tolist()
+    fields = ("total_tax_payable",)
+
+    def run():
+        for income in incomes:
+            rev.compute_basic_return_fields(fields, income, 0.0, 0.0, 0.0, 0.0, 0.0, False)
+
+    return _time(run)
+
+
+def bench_individual_projected_batch(n):
+    rev = IndividualRevenue(YEAR)
+    incomes = _incomes(n)
+    fields = ("total_tax_payable",)
+    return _time(lambda: rev.compute_basic_return_fields_batch(fields, incomes, 0.0, 0.0, 0.0,
+                                                               0.0, 0.0, False))
+
+
+def bench_individual_compiled(n):
+    """Total tax from a CompiledReturn over employment income (compiled once)."""
+    if n > SCALAR_MAX:
+        return None
+    compiled = IndividualRevenue(YEAR).compile_return()
+    incomes = _incomes(n).tolist()
+
+    def run():
+        for income in incomes:
+            compiled.total_tax_payable(income)
+
+    return _time(run)
+
+
+def bench_individual_cents_scalar(n):
+    if n > SCALAR_MAX:
+        return None
+    rev = IndividualRevenue(YEAR)
+    incomes = [round(x * 100) for x in _incomes(n).tolist()]
+
+    def run():
+        for income in incomes:
+            rev.compute_basic_return_cents(income, 0, 0, 0, 0, 0, False)
+
+    return _time(run)
+
+
+def bench_individual_cents_batch(n):
+    rev = IndividualRevenue(YEAR)
+    incomes = np.round(_incomes(n) * 100).astype(np.int64)
+    return _time(lambda: rev.compute_basic_return_cents_batch(incomes, 0, 0, 0, 0, 0, False))
+
+
+def bench_corporate_scalar(n):
+    if n > SCALAR_MAX:
+        return None
+    rev = CorporateRevenue(YEAR)
+    revenues = _incomes(n).tolist()
+
+    def run():
+        for revenue in revenues:
+            rev.estimate_ccpc_tax(revenue, [3_000.0, 2_000.0], 0.0, 0.0)
+
+    return _time(run)
+
+
+def bench_corporate_batch(n):
+    rev = CorporateRevenue(YEAR)
+    revenues = _incomes(n)
+    return _time(lambda: rev.estimate_ccpc_tax_batch(revenues, 5_000.0, 0.0, 0.0))
+
+
+def bench_gross_from_remittance(n):
+    if n > SCALAR_MAX:
+        return None
+    targets = np.random.default_rng(1).uniform(100, 150_000, n).tolist()
+
+    def run():
+        for target in targets:
+            gross_from_remittance(target, YEAR)
+
+    return _time(run)
+
+
+def bench_cra_construct(n):
+    if n > SCALAR_MAX:
+        return None
+
+    def run():
+        for _ in range(n):
+            CRA(YEAR)
+
+    return _time(run)
+
+
+def bench_config_load(n):
+    """Cold config load from the compiled artifact: registry cleared before each load."""
+    if n > SCALAR_MAX:
+        return None
+    registry = get_config_registry()
+
+    def run():
+        for _ in range(n):
+            registry.clear()
+            registry.get(YEAR)
+
+    seconds = _time(run)
+    registry.clear()
+    return seconds
+
+
+def bench_config_load_json(n):
+    """Cold config load from the source JSON (parse, validate, hash, build tables), no artifact."""
+    if n > SCALAR_MAX:
+        return None
+    year = str(YEAR)
+
+    def run():
+        for _ in range(n):
+            artifact = compiled_config.compile_config(compiled_config.CONFIG_PATH.read_bytes())
+            snapshot = compiled_config.freeze(artifact["years"][year])
+            for key in compiled_config.JURISDICTIONS.values():
+                BracketTable.from_config(snapshot[key])
+
+    return _time(run)
+
+
+def _run_cli(args, stdin=None):
+    subprocess.run(
+        [sys.executable, str(SRC / "driver.py"), *args],
+        stdin=stdin,
+        stdout=subprocess.DEVNULL,
+        check=True,
+    )
+
+
+def bench_cli_cold_start(n):
+    """n one-shot 'driver.py individual' invocations, each a fresh interpreter."""
+    if n > 100:
+        return None
+
+    def run():
+        for _ in range(n):
+            _run_cli(["individual", str(YEAR), "100000", "--quiet"])
+
+    return _time(run, repeat=1)
+
+
+def bench_cli_batch(n):
+    """One 'driver.py batch individual' invocation over an n-row CSV (includes startup)."""
+    if n > CLI_MAX:
+        return None
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "input.csv"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("income\n")
+            f.writelines(f"{x:.2f}\n" for x in _incomes(n))
+
+        def run():
+            with open(path, encoding="utf-8") as stdin:
+                _run_cli(["batch", "individual", "--year", str(YEAR)], stdin=stdin)
+
+        return _time(run, repeat=1)
+
+
+def bench_batch_binary(n):
+    """In-process 'batch individual' over an n-row memory-mapped column file."""
+    from binary_io import write_binary
+    from driver import run_binary_batch
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "input.taxcol"
+        dst = Path(tmp) / "output.taxcol"
+        incomes = _incomes(n)
+        zeros = np.zeros(n)
+        write_binary(src, "individual", {
+            "year": np.full(n, float(YEAR)),
+            "income": incomes,
+            "ucc_benefit": zeros,
+            "ei_benefits": zeros,
+            "investment_income": zeros,
+            "rrsp_contribution": zeros,
+            "medical_expenses": zeros,
+            "self_employed": zeros,
+        })
+        return _time(lambda: run_binary_batch("individual", src, dst, chunk_size=100_000),
+                     repeat=1)
+
+
+def bench_parallel_batch(n):
+    """BatchExecutor.individual with 2 workers (pool started and warmed up beforehand)."""
+    from parallel import BatchExecutor
+
+    incomes = _incomes(n)
+    with BatchExecutor([YEAR], workers=2) as executor:
+        executor.individual(YEAR, incomes[:1])
+        return _time(lambda: executor.individual(YEAR, incomes))
+
+
+def bench_sweep(n, fmt="binary"):
+    """'sweep' of n incomes ($1 steps) for one year and flag, written to a file."""
+    from sweep import run_sweep
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dst = Path(tmp) / ("sweep.taxcol" if fmt == "binary" else "sweep.csv")
+        return _time(lambda: run_sweep([YEAR], dst, self_employed=(False,), stop=n - 1),
+                     repeat=1)
+
+
+def bench_sweep_csv(n):
+    return bench_sweep(n, fmt="csv")
+
+
+def bench_scenario_grid(n):
+    """Ranked owner-manager scenario grid of about n scenarios (100 spouse salaries)."""
+    from scenario import ScenarioGrid, run_scenarios
+
+    grid = ScenarioGrid(YEAR, {
+        "revenue": 200_000.0,
+        "primary_salary": {"start": 0, "stop": 150_000, "step": 150_000 / max(1, n // 100)},
+        "spouse_salary": {"start": 0, "stop": 99_000, "step": 1_000},
+        "mrr": 18_000.0,
+    })
+    return _time(lambda: run_scenarios(grid))
+
+
+def bench_generate(n):
+    """'generate individual' of n synthetic records to a column file."""
+    from population import generate_population
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "population.taxcol"
+        return _time(lambda: generate_population("individual", n, path, seed=1), repeat=1)
+
+
+def bench_payroll_deductions(n, use_tables=False):
+    """A year of biweekly withholding for n/26 employees (n pay periods in total)."""
+    from payroll_remittance import payroll_deductions
+
+    if n < 26:
+        return None
+    pay = _incomes(n // 26 * 26).reshape(-1, 26) / 26
+    if use_tables:
+        payroll_deductions(YEAR, pay[:1], use_tables=True)  # build/load the table once
+    return _time(lambda: payroll_deductions(YEAR, pay, use_tables=use_tables))
+
+
+def bench_payroll_deductions_tables(n):
+    return bench_payroll_deductions(n, use_tables=True)
+
+
+BENCHMARKS = {
+    "individual_compute_basic_return": bench_individual_scalar,
+    "individual_compute_basic_return_batch": bench_individual_batch,
+    "individual_compute_basic_return_fields": bench_individual_projected,
+    "individual_compute_basic_return_fields_batch": bench_individual_projected_batch,
+    "individual_compiled_return": bench_individual_compiled,
+    "individual_compute_basic_return_cents": bench_individual_cents_scalar,
+    "individual_compute_basic_return_cents_batch": bench_individual_cents_batch,
+    "corporate_estimate_ccpc_tax": bench_corporate_scalar,
+    "corporate_estimate_ccpc_tax_batch": bench_corporate_batch,
+    "gross_from_remittance": bench_gross_from_remittance,
+    "cra_construct": bench_cra_construct,
+    "config_load": bench_config_load,
+    "config_load_json": bench_config_load_json,
+    "cli_cold_start": bench_cli_cold_start,
+    "cli_batch": bench_cli_batch,
+    "batch_binary": bench_batch_binary,
+    "parallel_batch": bench_parallel_batch,
+    "sweep_binary": bench_sweep,
+    "sweep_csv": bench_sweep_csv,
+    "scenario_grid": bench_scenario_grid,
+    "generate_binary": bench_generate,
+    "payroll_deductions": bench_payroll_deductions,
+    "payroll_deductions_tables": bench_payroll_deductions_tables,
+}
+
+
+def run_benchmarks(names, sizes):
+    """(results, skipped): a result per measured (name, size), and the pairs skipped."""
+    results = []
+    skipped = []
+    for name in names:
+        for size in sizes:
+            seconds = BENCHMARKS[name](size)
+            if seconds is None:
+                skipped.append({"name": name, "size": size})
+                continue
+            per_item = seconds / size
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "seconds": seconds,
+                    "seconds_per_item": per_item,
+                    "items_per_second": 1.0 / per_item if per_item else float("inf"),
+                }
+            )
+            print(
+                f"{name:<40} n={size:<9,} {seconds * 1e3:>11.3f} ms  "
+                f"{per_item * 1e6:>11.3f} us/item",
+                file=sys.stderr,
+            )
+    return results, skipped
+
+
+def compare(results, baseline, threshold_pct):
+    """Return the metrics that regressed by more than threshold_pct versus baseline."""
+    previous = {(r["name"], r["size"]): r for r in baseline["results"]}
+    regressions = []
+    for r in results:
+        old = previous.get((r["name"], r["size"]))
+        if old is None:
+            continue
+        change = (r["seconds_per_item"] / old["seconds_per_item"] - 1.0) * 100
+        if change > threshold_pct:
+            regressions.append({**r, "baseline_seconds_per_item": old["seconds_per_item"],
+                                "change_pct": change})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the tax calculation hot paths.")
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_SIZES),
+        help="Input sizes to measure (default: 1 1000 1000000)",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=list(BENCHMARKS),
+        help="Benchmarks to run (default: all)",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10.0,
+        help="Allowed slowdown versus baseline, in percent (default: 10)",
+    )
+    args = parser.parse_args()
+
+    results, skipped = run_benchmarks(args.only, args.sizes)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "year": YEAR,
+        "results": results,
+        "skipped": skipped,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(
+                f"REGRESSION {r['name']} n={r['size']}: {r['change_pct']:+.1f}% "
+                f"({r['baseline_seconds_per_item'] * 1e6:.3f} -> "
+                f"{r['seconds_per_item'] * 1e6:.3f} us/item)",
+                file=sys.stderr,
+            )
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
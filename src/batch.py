@@ -0,0 +1,191 @@
+"""
+NumPy array kernels for computing many returns at once.
+
+Each kernel mirrors one stage of IndividualRevenue.compute_basic_return (or
+CorporateRevenue.estimate_ccpc_tax) on column arrays, so a batch of N rows is
+a handful of vector operations instead of N Python calls. Results are columnar
+(ReturnBatch / CorporateReturnBatch, one float64 array per field) and match the
+scalar path to the cent.
+
+Rows the scalar path cannot compute do not raise here: a zero employment
+income gives a NaN/inf avg_tax_rate (ZeroDivisionError in the scalar path) and
+an income outside every bracket gives a NaN marginal_tax_rate (LookupError).
+"""
+
+import numpy as np
+
+from columnar import CorporateReturnBatch, ReturnBatch
+
+
+def _columns(*values):
+    """Broadcast scalars/sequences to equally-shaped 1-D float64 arrays."""
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.float64)) for v in values))
+
+
+############################################
+# Individual kernels
+############################################
+def cpp_contribution(rev, employment_income, self_employed):
+    earnings = np.minimum(rev.ympe, employment_income)
+    cpp = (earnings - rev.cpp_basic_annual_exemption) * rev.cpp_rate
+    return np.where(self_employed, cpp * 2, cpp)
+
+
+def canada_employment_amount(cra, employment_income):
+    return np.minimum(cra.get_canada_employment_amount_max(), employment_income)
+
+
+def basic_personal_amount(income, bpa, federal_brackets):
+    """Federal BPA with the additional amount phased out above the 4th bracket floor."""
+    threshold_bracket = federal_brackets[3][0]
+    top_bracket = federal_brackets[4][0]
+    default_additional_bpa = bpa.max - bpa.min
+    reduction_factor = default_additional_bpa / (top_bracket - threshold_bracket)
+    additional_bpa = np.where(
+        income > threshold_bracket,
+        default_additional_bpa - (income - threshold_bracket) * reduction_factor,
+        default_additional_bpa,
+    )
+    return bpa.min + additional_bpa
+
+
+def eligible_medical_expenses(cra, income, medical_expenses):
+    floor, pct_of_income = cra.get_medical_expense_threshold_params()
+    threshold = np.minimum(floor, income * pct_of_income)
+    return np.maximum(0.0, medical_expenses - threshold)
+
+
+def non_refundable_tax_credits(
+    rev,
+    income,
+    federal_brackets,
+    cpp,
+    canada_employment_amount,
+    ei_premiums,
+    medical_expenses,
+    net_income,
+):
+    """Line 35000, mirroring IndividualRevenue.compute_non_refundable_tax_credits."""
+    cra = rev.cra
+    bpa = basic_personal_amount(income, rev.bpa, federal_brackets)
+    income_tax_credit = np.minimum(net_income * 0.03, cra.basic_income_tax_credit)
+    medical = eligible_medical_expenses(cra, income, medical_expenses)
+    tax_credits = bpa + cpp + canada_employment_amount + ei_premiums + income_tax_credit + medical
+    return tax_credits * cra.fed_non_refundable_tax_credit_rate
+
+
+def provincial_tax(income, provincial_brackets, provincial_bpa):
+    gross = provincial_brackets.tax_array(income)
+    credit = provincial_bpa * provincial_brackets[0][2]
+    return np.maximum(0.0, gross - credit)
+
+
+def compute_basic_return_batch(
+    rev,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """
+    Columnar IndividualRevenue.compute_basic_return for an IndividualRevenue `rev`.
+    Inputs are equal-length arrays (scalars broadcast); returns a ReturnBatch.
+    """
+    (
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+    ) = _columns(
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+    )
+    self_employed = np.broadcast_to(np.asarray(self_employed, dtype=bool), employment_income.shape)
+    cra = rev.cra
+    federal_brackets = cra.get_federal_bracket_table()
+    provincial_brackets = cra.get_provincial_bracket_table()
+
+    cpp = cpp_contribution(rev, employment_income, self_employed)
+    cea = canada_employment_amount(cra, employment_income)
+    total_income = employment_income + ucc_benefit + ei_benefits + investment_income
+    taxable_income = total_income - rrsp_contribution
+    basic_federal_tax = federal_brackets.tax_array(taxable_income)
+    prov_tax = provincial_tax(taxable_income, provincial_brackets, cra.get_provincial_bpa())
+    marginal_tax_rate = federal_brackets.marginal_rate_array(
+        taxable_income
+    ) + provincial_brackets.marginal_rate_array(taxable_income)
+    tax_credits = non_refundable_tax_credits(
+        rev,
+        taxable_income,
+        federal_brackets,
+        cpp,
+        cea,
+        ei_benefits,
+        medical_expenses,
+        taxable_income,
+    )
+    net_federal_tax = np.maximum(0.0, basic_federal_tax - tax_credits)
+    total_tax_payable = net_federal_tax + prov_tax
+    after_tax_income = employment_income - total_tax_payable
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_tax_rate = total_tax_payable / employment_income
+    return ReturnBatch({
+        "employment_income": employment_income,
+        "total_income": total_income,
+        "taxable_income": taxable_income,
+        "after_tax_income": after_tax_income,
+        "rrsp_contribution": rrsp_contribution,
+        "net_federal_tax": net_federal_tax,
+        "provincial_tax": prov_tax,
+        "cpp_contribution": cpp,
+        "total_tax_payable": total_tax_payable,
+        "avg_tax_rate": avg_tax_rate,
+        "marginal_tax_rate": marginal_tax_rate,
+    })
+
+
+############################################
+# Corporate kernels
+############################################
+def estimate_ccpc_tax_batch(rev, revenue, cpp_contribution, deductions, tax_credits):
+    """
+    Columnar CorporateRevenue.estimate_ccpc_tax for a CorporateRevenue `rev`.
+    cpp_contribution is the already-summed CPP per row (the scalar path takes a
+    list and sums it). Returns a CorporateReturnBatch.
+    """
+    revenue, cpp_contribution, deductions, tax_credits = _columns(
+        revenue, cpp_contribution, deductions, tax_credits
+    )
+    cra = rev.cra
+    federal_tax_rate = cra.get_federal_corporate_tax(is_small_business=True)
+    provincial_tax_rate = cra.get_provincial_corporate_tax(is_small_business=True)
+    taxable_revenue = revenue - deductions
+    net_federal_tax = taxable_revenue * federal_tax_rate
+    provincial_tax = taxable_revenue * provincial_tax_rate
+    tax_rate = federal_tax_rate + provincial_tax_rate
+    total_tax = (taxable_revenue * tax_rate) + cpp_contribution
+    total_tax_payable = total_tax - tax_credits
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_tax_rate = total_tax_payable / revenue
+    return CorporateReturnBatch({
+        "revenue": revenue,
+        "taxable_revenue": taxable_revenue,
+        "after_tax_revenue": revenue - total_tax_payable,
+        "tax_credits": tax_credits,
+        "deductions": deductions,
+        "tax_rate": np.full(revenue.shape, tax_rate),
+        "net_federal_tax": net_federal_tax,
+        "provincial_tax": provincial_tax,
+        "cpp_contribution": cpp_contribution,
+        "total_tax_payable": total_tax_payable,
+        "avg_tax_rate": avg_tax_rate,
+    })
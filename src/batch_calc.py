@@ -0,0 +1,102 @@
+"""
+Vectorized batch calculators over column arrays: the batch counterparts of
+driver.calculate_individual_tax and driver.calculate_corporate_tax. They are
+shared by the driver's batch subcommand and the tools built on it (sweep),
+which import them from here rather than from driver.
+"""
+
+import dataclasses
+from typing import TYPE_CHECKING
+
+from corporate import CorporateRevenue
+from data_objects import CorporateReturn, IndividualReturn
+from individual import IndividualRevenue
+
+if TYPE_CHECKING:
+    # columnar imports NumPy, which the scalar CLI does not load
+    from columnar import CorporateReturnBatch, ReturnBatch
+
+INDIVIDUAL_RETURN_FIELDS = tuple(f.name for f in dataclasses.fields(IndividualReturn))
+CORPORATE_RETURN_FIELDS = tuple(f.name for f in dataclasses.fields(CorporateReturn))
+
+
+def calculate_individual_tax_batch(
+    year: int, incomes, cents: bool = False, fields=None, rev=None, **kwargs
+) -> "ReturnBatch | dict":
+    """
+    Vectorized calculate_individual_tax: incomes and any optional kwarg may be
+    arrays (scalars broadcast). Returns a columnar ReturnBatch. With cents=True
+    the integer-cents engine is used and results are exact to the cent. With
+    fields (e.g. ("total_tax_payable",)) only those columns are computed and a
+    plain dict of float64 columns is returned instead (see projection); the
+    cents engine ignores fields and always returns the full ReturnBatch. rev
+    is an IndividualRevenue for year to reuse (e.g. a pool worker's) instead
+    of building one.
+    """
+    if rev is None:
+        rev = IndividualRevenue(year)
+    amounts = {
+        "employment_income": incomes,
+        "ucc_benefit": kwargs.get("ucc_benefit", 0.0),
+        "ei_benefits": kwargs.get("ei_benefits", 0.0),
+        "investment_income": kwargs.get("investment_income", 0.0),
+        "rrsp_contribution": kwargs.get("rrsp_contribution", 0.0),
+        "medical_expenses": kwargs.get("medical_expenses", 0.0),
+    }
+    self_employed = kwargs.get("self_employed", False)
+    if cents:
+        from fixed_point import batch_to_dollars, to_cents_array
+
+        amounts = {k: to_cents_array(v) for k, v in amounts.items()}
+        columns = rev.compute_basic_return_cents_batch(**amounts, self_employed=self_employed)
+        return batch_to_dollars(columns)
+    if fields is not None:
+        return rev.compute_basic_return_fields_batch(fields, **amounts,
+                                                     self_employed=self_employed)
+    return rev.compute_basic_return_batch(**amounts, self_employed=self_employed)
+
+
+def calculate_corporate_tax_batch(
+    year: int,
+    revenue,
+    cpp_contributions=0.0,
+    deductions=0.0,
+    tax_credits=0.0,
+    cents: bool = False,
+    fields=None,
+    rev=None,
+) -> "CorporateReturnBatch | dict":
+    """
+    Vectorized calculate_corporate_tax. cpp_contributions is the summed CPP per
+    row. Returns a columnar CorporateReturnBatch. With cents=True the
+    integer-cents engine is used and results are exact to the cent. fields
+    restricts the computed columns, and the result is then a plain dict, as
+    for calculate_individual_tax_batch. rev is a CorporateRevenue for year to
+    reuse instead of building one.
+    """
+    if rev is None:
+        rev = CorporateRevenue(year)
+    if cents:
+        from fixed_point import batch_to_dollars, to_cents_array
+
+        columns = rev.estimate_ccpc_tax_cents_batch(
+            revenue=to_cents_array(revenue),
+            cpp_contribution=to_cents_array(cpp_contributions),
+            deductions=to_cents_array(deductions),
+            tax_credits=to_cents_array(tax_credits),
+        )
+        return batch_to_dollars(columns)
+    if fields is not None:
+        return rev.estimate_ccpc_tax_fields_batch(
+            fields,
+            revenue=revenue,
+            cpp_contribution=cpp_contributions,
+            deductions=deductions,
+            tax_credits=tax_credits,
+        )
+    return rev.estimate_ccpc_tax_batch(
+        revenue=revenue,
+        cpp_contribution=cpp_contributions,
+        deductions=deductions,
+        tax_credits=tax_credits,
+    )
@@ -0,0 +1,126 @@
+"""
+Streaming record readers and writers for the driver.py batch subcommand.
+
+Records are plain dicts. Inputs are read lazily and handed out in fixed-size
+chunks, and outputs are written chunk by chunk, so memory stays bounded by
+the chunk size no matter how large the file is.
+"""
+
+import csv
+import json
+import math
+import sys
+from itertools import islice
+from pathlib import Path
+
+FORMATS = ("csv", "jsonl")
+# Memory-mapped column files (see binary_io); not a record format
+BINARY = "binary"
+
+_EXTENSIONS = {
+    ".csv": "csv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".taxcol": BINARY,
+}
+
+
+def detect_format(path, default="csv"):
+    """Guess the record format from a file extension; stdin ("-") uses default."""
+    if path is None or path == "-":
+        return default
+    return _EXTENSIONS.get(Path(path).suffix.lower(), default)
+
+
+def open_input(path):
+    if path is None or path == "-":
+        return sys.stdin
+    return open(path, encoding="utf-8", newline="")
+
+
+def open_output(path):
+    if path is None or path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="")
+
+
+def read_records(stream, fmt):
+    """Yield one dict per CSV row or JSONL line."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown format {fmt!r}. Must be one of {FORMATS}")
+
+
+def iter_chunks(records, chunk_size):
+    """Group an iterator of records into lists of at most chunk_size."""
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    records = iter(records)
+    while chunk := list(islice(records, chunk_size)):
+        yield chunk
+
+
+class RecordWriter:
+    """
+    Write dict records as CSV (header taken from the first record) or JSONL.
+    Non-finite floats (an undefined rate, a missing value) are written as an
+    empty CSV field or a JSON null.
+    """
+
+    def __init__(self, stream, fmt):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown format {fmt!r}. Must be one of {FORMATS}")
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+
+    def write(self, records):
+        for record in records:
+            if self.fmt == "jsonl":
+                record = {k: None if _is_missing(v) else v for k, v in record.items()}
+                self.stream.write(json.dumps(record, allow_nan=False))
+                self.stream.write("\n")
+                continue
+            if self._csv is None:
+                self._csv = csv.DictWriter(self.stream, fieldnames=list(record))
+                self._csv.writeheader()
+            self._csv.writerow({k: "" if _is_missing(v) else v for k, v in record.items()})
+
+    def flush(self):
+        self.stream.flush()
+
+
+def format_csv_rows(columns, formats):
+    """
+    CSV text for equally long columns (arrays or lists), one %-format per
+    column, with CRLF line endings like RecordWriter. Non-finite floats are
+    written as empty fields, as RecordWriter writes them.
+    """
+    import numpy as np
+
+    values, row = [], []
+    for column, fmt in zip(columns, formats):
+        column = np.asarray(column)
+        finite = np.isfinite(column) if column.dtype.kind == "f" else None
+        if finite is None or finite.all():
+            values.append(column.tolist())
+            row.append(fmt)
+        elif not finite.any():
+            values.append([""] * len(column))
+            row.append("%s")
+        else:
+            values.append([fmt % v if ok else "" for v, ok in zip(column.tolist(),
+                                                                 finite.tolist())])
+            row.append("%s")
+    row = ",".join(row) + "\r\n"
+    return "".join(map(row.__mod__, zip(*values)))
+
+
+def _is_missing(value):
+    return isinstance(value, float) and not math.isfinite(value)
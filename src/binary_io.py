@@ -0,0 +1,170 @@
+"""
+Fixed-width binary column files for very large batch inputs and results.
+
+Layout (all little-endian):
+
+    8 bytes   magic b"TAXCOL\\x00\\x01"
+    8 bytes   header length (uint64)
+    header    UTF-8 JSON: format, entity, rows, columns, config_version
+    padding   spaces up to a 64-byte boundary
+    data      one float64 column after another, rows × 8 bytes each
+
+Every column is a contiguous float64 block, so a file is opened as a single
+memory map and each column is a zero-copy array view. The batch engine reads
+inputs and writes results directly through those views; nothing is parsed
+or formatted. Missing values (e.g. a row without a year) are NaN.
+"""
+
+import json
+import struct
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"TAXCOL\x00\x01"
+FORMAT_VERSION = 1
+EXTENSION = ".taxcol"
+DTYPE = np.dtype("<f8")
+_ALIGN = 64
+_PREFIX = struct.Struct("<8sQ")
+
+# Input columns per entity, named like the CSV/JSONL record fields
+INPUT_COLUMNS = {
+    "individual": (
+        "year",
+        "income",
+        "ucc_benefit",
+        "ei_benefits",
+        "investment_income",
+        "rrsp_contribution",
+        "medical_expenses",
+        "self_employed",
+    ),
+    "corporation": (
+        "year",
+        "revenue",
+        "cpp_contributions",
+        "deductions",
+        "tax_credits",
+    ),
+}
+
+
+class BinaryColumns:
+    """
+    An open column file. columns maps each name to a memory-mapped float64
+    view; assignments through the views write to the file when it was opened
+    for writing. Use as a context manager or call close().
+    """
+
+    def __init__(self, path, header, data):
+        self.path = Path(path)
+        self.header = header
+        self._data = data
+        self.columns = {name: data[i] for i, name in enumerate(header["columns"])}
+
+    @property
+    def entity(self):
+        return self.header["entity"]
+
+    @property
+    def rows(self):
+        return self.header["rows"]
+
+    @property
+    def config_version(self):
+        return self.header.get("config_version")
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def flush(self):
+        if isinstance(self._data, np.memmap):
+            self._data.flush()
+
+    def close(self):
+        self.flush()
+        self.columns = {}
+        self._data = None
+
+
+def _encode_header(header):
+    body = json.dumps(header).encode("utf-8")
+    data_offset = -(-(_PREFIX.size + len(body)) // _ALIGN) * _ALIGN
+    body += b" " * (data_offset - _PREFIX.size - len(body))
+    return _PREFIX.pack(MAGIC, len(body)) + body
+
+
+def read_header(path):
+    """(header dict, data offset) of a column file."""
+    with open(path, "rb") as f:
+        prefix = f.read(_PREFIX.size)
+        if len(prefix) != _PREFIX.size:
+            raise ValueError(f"{path}: not a column file (too short)")
+        magic, length = _PREFIX.unpack(prefix)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a column file (bad magic)")
+        header = json.loads(f.read(length))
+    if header.get("format") != FORMAT_VERSION:
+        raise ValueError(f"{path}: unsupported column file format {header.get('format')!r}")
+    return header, _PREFIX.size + length
+
+
+def open_binary(path, mode="r"):
+    """Memory-map a column file; mode is "r" (read-only) or "r+" (read/write)."""
+    if mode not in ("r", "r+"):
+        raise ValueError("mode must be 'r' or 'r+'")
+    header, offset = read_header(path)
+    shape = (len(header["columns"]), header["rows"])
+    expected = offset + shape[0] * shape[1] * DTYPE.itemsize
+    size = Path(path).stat().st_size
+    if size < expected:
+        raise ValueError(f"{path}: truncated ({size} bytes, header needs {expected})")
+    if shape[0] * shape[1] == 0:
+        # numpy cannot map an empty region
+        data = np.empty(shape, dtype=DTYPE)
+    else:
+        data = np.memmap(path, dtype=DTYPE, mode=mode, offset=offset, shape=shape)
+    return BinaryColumns(path, header, data)
+
+
+def create_binary(path, entity, columns, rows, config_version=None):
+    """
+    Create a column file of `rows` rows (all zeros) and return it open for
+    writing, so results can be filled in chunk by chunk.
+    """
+    columns = list(columns)
+    if len(set(columns)) != len(columns):
+        raise ValueError(f"Duplicate column names: {columns}")
+    header = {
+        "format": FORMAT_VERSION,
+        "entity": entity,
+        "rows": int(rows),
+        "columns": columns,
+        "config_version": config_version,
+    }
+    prefix = _encode_header(header)
+    with open(path, "wb") as f:
+        f.write(prefix)
+        f.truncate(len(prefix) + len(columns) * int(rows) * DTYPE.itemsize)
+    return open_binary(path, "r+")
+
+
+def write_binary(path, entity, columns, config_version=None):
+    """Write a dict of equal-length 1-D arrays as a column file."""
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) > 1:
+        raise ValueError("Columns must have equal length")
+    rows = lengths.pop() if lengths else 0
+    with create_binary(path, entity, columns, rows, config_version) as out:
+        for name, values in columns.items():
+            out[name][:] = values
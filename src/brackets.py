@@ -0,0 +1,116 @@
+from bisect import bisect_left
+
+
+class BracketTable:
+    """
+    Compiled tax bracket schedule.
+
+    Stores the sorted bracket floors, ceilings and rates together with the
+    cumulative tax owed on every bracket below each floor, so the tax on an
+    income is one bisect plus one multiply-add instead of a walk over every
+    bracket. Behaves like the list of (min, max, rate) tuples it was built from,
+    so it can be passed anywhere a bracket list is expected.
+    """
+
+    __slots__ = ("brackets", "floors", "ceilings", "rates", "cumulative", "_arrays")
+
+    def __init__(self, brackets):
+        self.brackets = tuple(sorted(tuple(b) for b in brackets))
+        self.floors = tuple(b[0] for b in self.brackets)
+        self.ceilings = tuple(b[1] for b in self.brackets)
+        self.rates = tuple(b[2] for b in self.brackets)
+        cumulative = []
+        total = 0.0
+        for mn, mx, rate in self.brackets:
+            cumulative.append(total)
+            total += (mx - mn) * rate
+        self.cumulative = tuple(cumulative)
+        self._arrays = None
+
+    @classmethod
+    def from_config(cls, bracket_list):
+        """Build from a config bracket list (null = infinity)."""
+        return cls(
+            (mn, float("inf") if mx is None else mx, rate) for mn, mx, rate in bracket_list
+        )
+
+    @classmethod
+    def from_columns(cls, floors, ceilings, rates, cumulative):
+        """Rebuild from precompiled columns (see compiled_config) without recomputing them."""
+        table = cls.__new__(cls)
+        table.brackets = tuple(zip(floors, ceilings, rates))
+        table.floors = tuple(floors)
+        table.ceilings = tuple(ceilings)
+        table.rates = tuple(rates)
+        table.cumulative = tuple(cumulative)
+        table._arrays = None
+        return table
+
+    def __len__(self):
+        return len(self.brackets)
+
+    def __getitem__(self, index):
+        return self.brackets[index]
+
+    def __iter__(self):
+        return iter(self.brackets)
+
+    def __repr__(self):
+        return f"BracketTable({list(self.brackets)!r})"
+
+    def _index(self, income):
+        """Index of the bracket whose floor is the last one below income (-1 if none)."""
+        return bisect_left(self.floors, income) - 1
+
+    def tax(self, income):
+        i = self._index(income)
+        if i < 0:
+            return 0.0
+        return self.cumulative[i] + (min(income, self.ceilings[i]) - self.floors[i]) * self.rates[i]
+
+    def marginal_rate(self, income):
+        i = self._index(income)
+        if i < 0 or income > self.ceilings[i]:
+            raise LookupError("Income not found in tax brackets")
+        return self.rates[i]
+
+    ############################################
+    # Array variants
+    ############################################
+    def arrays(self):
+        """(floors, ceilings, rates, cumulative) as float64 NumPy arrays."""
+        if self._arrays is None:
+            import numpy as np
+
+            self._arrays = tuple(
+                np.asarray(v, dtype=np.float64)
+                for v in (self.floors, self.ceilings, self.rates, self.cumulative)
+            )
+        return self._arrays
+
+    def _index_array(self, incomes):
+        import numpy as np
+
+        floors = self.arrays()[0]
+        idx = np.searchsorted(floors, incomes, side="left") - 1
+        return idx < 0, np.maximum(idx, 0)
+
+    def tax_array(self, incomes):
+        """Vectorized tax(): array of incomes in, array of taxes out."""
+        import numpy as np
+
+        incomes = np.asarray(incomes, dtype=np.float64)
+        floors, ceilings, rates, cumulative = self.arrays()
+        below, i = self._index_array(incomes)
+        taxes = cumulative[i] + (np.minimum(incomes, ceilings[i]) - floors[i]) * rates[i]
+        return np.where(below, 0.0, taxes)
+
+    def marginal_rate_array(self, incomes):
+        """Vectorized marginal_rate(); NaN where the scalar version raises LookupError."""
+        import numpy as np
+
+        incomes = np.asarray(incomes, dtype=np.float64)
+        _, ceilings, rates, _ = self.arrays()
+        below, i = self._index_array(incomes)
+        missing = below | (incomes > ceilings[i])
+        return np.where(missing, np.nan, rates[i])
@@ -0,0 +1,173 @@
+"""
+Columnar containers for bulk returns.
+
+A ReturnBatch / CorporateReturnBatch holds each IndividualReturn /
+CorporateReturn field as one contiguous float64 array instead of one frozen
+dataclass per row. Indexing a batch with an int gives a zero-copy row view
+that reads like the dataclass (batch[i].total_tax_payable); slicing gives a
+batch of array views; indexing with a field name gives that column.
+"""
+
+from dataclasses import fields
+
+import numpy as np
+
+from data_objects import CorporateReturn, IndividualReturn
+
+
+class _RowView:
+    """Read-only view of one row of a batch; field attributes are added per batch type."""
+
+    __slots__ = ("_columns", "_index")
+    FIELDS = ()
+    RETURN_TYPE = None
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def to_return(self):
+        """Materialize the row as its frozen dataclass."""
+        return self.RETURN_TYPE(**{f: getattr(self, f) for f in self.FIELDS})
+
+    def __eq__(self, other):
+        if isinstance(other, (_RowView, self.RETURN_TYPE)):
+            return all(getattr(self, f) == getattr(other, f) for f in self.FIELDS)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        values = ", ".join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS)
+        return f"{type(self).__name__}({values})"
+
+
+def _row_view_type(name, return_type):
+    field_names = tuple(f.name for f in fields(return_type))
+    namespace = {"__slots__": (), "FIELDS": field_names, "RETURN_TYPE": return_type}
+    for field_name in field_names:
+        namespace[field_name] = property(
+            lambda self, f=field_name: float(self._columns[f][self._index])
+        )
+    return type(name, (_RowView,), namespace)
+
+
+class _ColumnarBatch:
+    __slots__ = ("_columns",)
+    FIELDS = ()
+    ROW_TYPE = _RowView
+
+    def __init__(self, columns):
+        """columns: mapping of every field name to a 1-D array-like (float64 arrays are not copied)."""
+        missing = [f for f in self.FIELDS if f not in columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        cols = {f: np.asarray(columns[f], dtype=np.float64) for f in self.FIELDS}
+        lengths = {c.shape for c in cols.values()}
+        if len(lengths) > 1 or any(len(shape) != 1 for shape in lengths):
+            raise ValueError("Columns must be 1-D arrays of equal length")
+        self._columns = cols
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build from an iterable of dataclass returns or row views."""
+        rows = list(rows)
+        return cls({f: np.fromiter((getattr(r, f) for r in rows), np.float64, len(rows))
+                    for f in cls.FIELDS})
+
+    @classmethod
+    def empty(cls):
+        return cls({f: np.empty(0) for f in cls.FIELDS})
+
+    @classmethod
+    def concat(cls, batches):
+        batches = list(batches)
+        if not batches:
+            return cls.empty()
+        return cls({f: np.concatenate([b._columns[f] for b in batches]) for f in cls.FIELDS})
+
+    def __len__(self):
+        return len(self._columns[self.FIELDS[0]])
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._columns[key]
+        if isinstance(key, slice):
+            return type(self)({f: c[key] for f, c in self._columns.items()})
+        n = len(self)
+        index = int(key)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("batch index out of range")
+        return self.ROW_TYPE(self._columns, index)
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        try:
+            return self._columns[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.ROW_TYPE(self._columns, i)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(rows={len(self)})"
+
+    def keys(self):
+        return self.FIELDS
+
+    def columns(self):
+        """dict of field name -> column array (the underlying arrays, not copies)."""
+        return dict(self._columns)
+
+    def take(self, indices):
+        """Rows at the given indices (or boolean mask) as a new batch."""
+        return type(self)({f: c[indices] for f, c in self._columns.items()})
+
+    def to_rows(self):
+        return [row.to_return() for row in self]
+
+    ############################################
+    # Column-wise aggregation (NaN rows are ignored)
+    ############################################
+    def _aggregate(self, fn, field_names):
+        names = self.FIELDS if field_names is None else field_names
+        if isinstance(names, str):
+            return float(fn(self._columns[names]))
+        return {f: float(fn(self._columns[f])) for f in names}
+
+    def sum(self, field_names=None):
+        return self._aggregate(np.nansum, field_names)
+
+    def mean(self, field_names=None):
+        return self._aggregate(np.nanmean, field_names)
+
+    def min(self, field_names=None):
+        return self._aggregate(np.nanmin, field_names)
+
+    def max(self, field_names=None):
+        return self._aggregate(np.nanmax, field_names)
+
+
+IndividualReturnRow = _row_view_type("IndividualReturnRow", IndividualReturn)
+CorporateReturnRow = _row_view_type("CorporateReturnRow", CorporateReturn)
+
+
+class ReturnBatch(_ColumnarBatch):
+    """Columnar IndividualReturn results."""
+
+    __slots__ = ()
+    FIELDS = IndividualReturnRow.FIELDS
+    ROW_TYPE = IndividualReturnRow
+
+
+class CorporateReturnBatch(_ColumnarBatch):
+    """Columnar CorporateReturn results."""
+
+    __slots__ = ()
+    FIELDS = CorporateReturnRow.FIELDS
+    ROW_TYPE = CorporateReturnRow
@@ -0,0 +1,216 @@
+"""
+Precompiled CRA config artifact.
+
+compile-config validates data/cra_config.json and writes
+data/cra_config.compiled next to it: the parsed per-year parameters, the
+bracket floors/ceilings/rates/cumulative taxes as numeric columns, and the
+SHA-256 of the source JSON as the config version. The artifact is a marshal
+file, so loading it needs no JSON parse, no hashing and no bracket
+arithmetic.
+
+The runtime (cra.ConfigRegistry) goes through load(), which uses the
+artifact when it was built from the current JSON (same mtime and size) and
+otherwise silently recompiles it from the JSON and rewrites it.
+
+    python src/driver.py compile-config
+"""
+
+import argparse
+import marshal
+import os
+import sys
+from pathlib import Path
+from types import MappingProxyType
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "data" / "cra_config.json"
+
+# Bump when the artifact layout changes; older artifacts are rebuilt
+ARTIFACT_FORMAT = 1
+
+JURISDICTIONS = {
+    "federal": "federal_tax_brackets",
+    "provincial": "provincial_tax_brackets",
+}
+
+REQUIRED_KEYS = (
+    "basic_income_tax_credit",
+    "basic_personal_amount_credit",
+    "bpa",
+    "canada_employment_amount_max",
+    "corporate_tax",
+    "cpp",
+    "fed_non_refundable_tax_credit_rate",
+    "federal_tax_brackets",
+    "medical_expense_threshold",
+    "provincial_bpa",
+    "provincial_tax_brackets",
+    "ympe",
+)
+
+
+def artifact_path(config_path):
+    """data/cra_config.json -> data/cra_config.compiled"""
+    return Path(config_path).with_suffix(".compiled")
+
+
+def freeze(value):
+    """Recursively convert parsed JSON into read-only mappings and tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def _source_stamp(config_path):
+    st = os.stat(config_path)
+    return st.st_mtime_ns, st.st_size
+
+
+############################################
+# Validation
+############################################
+def _validate_brackets(year, key, brackets):
+    if not isinstance(brackets, list) or not brackets:
+        raise ValueError(f"{year}: {key} must be a non-empty list")
+    previous_floor = None
+    for i, bracket in enumerate(brackets):
+        if not isinstance(bracket, list) or len(bracket) != 3:
+            raise ValueError(f"{year}: {key}[{i}] must be [min, max, rate]")
+        mn, mx, rate = bracket
+        last = i == len(brackets) - 1
+        if mx is None and not last:
+            raise ValueError(f"{year}: {key}[{i}] only the top bracket may be open-ended")
+        if mx is not None and mx < mn:
+            raise ValueError(f"{year}: {key}[{i}] max {mx} is below min {mn}")
+        if previous_floor is not None and mn <= previous_floor:
+            raise ValueError(f"{year}: {key}[{i}] brackets must be in increasing order")
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError(f"{year}: {key}[{i}] rate {rate} is not between 0 and 1")
+        previous_floor = mn
+
+
+def validate_config(years):
+    """Raise ValueError if the parsed config is missing keys or has malformed brackets."""
+    if not isinstance(years, dict) or not years:
+        raise ValueError("Config must be a non-empty mapping of tax year to parameters")
+    for year, cfg in years.items():
+        if not year.isdigit():
+            raise ValueError(f"Invalid tax year key: {year!r}")
+        missing = [k for k in REQUIRED_KEYS if k not in cfg]
+        if missing:
+            raise ValueError(f"{year}: missing config keys {missing}")
+        for key in JURISDICTIONS.values():
+            _validate_brackets(year, key, cfg[key])
+
+
+############################################
+# Compile / load
+############################################
+def _bracket_columns(brackets):
+    """(floors, ceilings, rates, cumulative) tuples for a config bracket list."""
+    floors, ceilings, rates, cumulative = [], [], [], []
+    total = 0.0
+    for mn, mx, rate in sorted(brackets):
+        mx = float("inf") if mx is None else mx
+        floors.append(mn)
+        ceilings.append(mx)
+        rates.append(rate)
+        cumulative.append(total)
+        total += (mx - mn) * rate
+    return tuple(floors), tuple(ceilings), tuple(rates), tuple(cumulative)
+
+
+def compile_config(raw, source_stamp=None):
+    """Validate raw JSON bytes and build the artifact dict."""
+    import hashlib
+    import json
+
+    years = json.loads(raw)
+    validate_config(years)
+    return {
+        "format": ARTIFACT_FORMAT,
+        "version": hashlib.sha256(raw).hexdigest(),
+        "source_stamp": source_stamp,
+        "years": years,
+        "tables": {
+            year: {j: _bracket_columns(cfg[key]) for j, key in JURISDICTIONS.items()}
+            for year, cfg in years.items()
+        },
+    }
+
+
+def write_artifact(artifact, path):
+    """Write atomically, so a concurrent reader never sees a partial file."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(marshal.dumps(artifact))
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def read_artifact(path, source_stamp=None):
+    """The artifact at path, or None if it is missing, unreadable, outdated or stale."""
+    try:
+        artifact = marshal.loads(Path(path).read_bytes())
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if not isinstance(artifact, dict) or artifact.get("format") != ARTIFACT_FORMAT:
+        return None
+    if source_stamp is not None and artifact.get("source_stamp") != tuple(source_stamp):
+        return None
+    return artifact
+
+
+def load(config_path, source_stamp=None):
+    """
+    Compiled config for config_path, rebuilding the artifact when the JSON changed.
+    Failing to write the artifact (e.g. a read-only install) is not an error.
+    """
+    if source_stamp is None:
+        source_stamp = _source_stamp(config_path)
+    path = artifact_path(config_path)
+    artifact = read_artifact(path, source_stamp)
+    if artifact is not None:
+        return artifact
+    artifact = compile_config(Path(config_path).read_bytes(), tuple(source_stamp))
+    try:
+        write_artifact(artifact, path)
+    except OSError:
+        pass
+    return artifact
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="driver.py compile-config",
+        description="Validate the CRA config JSON and write the precompiled artifact.",
+    )
+    parser.add_argument(
+        "--config",
+        default=str(CONFIG_PATH),
+        help="Source config JSON (default: data/cra_config.json)",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Artifact path (default: next to the config, with a .compiled suffix)",
+    )
+    args = parser.parse_args(argv)
+
+    output = Path(args.output) if args.output else artifact_path(args.config)
+    try:
+        stamp = _source_stamp(args.config)
+        artifact = compile_config(Path(args.config).read_bytes(), stamp)
+    except (OSError, ValueError) as e:
+        sys.exit(f"compile-config: {e}")
+    write_artifact(artifact, output)
+    print(f"Wrote {output} (years {', '.join(sorted(artifact['years']))}, "
+          f"version {artifact['version'][:12]})")
+
+
+if __name__ == "__main__":
+    main()
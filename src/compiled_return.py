@@ -0,0 +1,151 @@
+"""
+Returns compiled for one taxpayer into fast functions of a single input.
+
+With the year, benefits, other income, medical expenses and self-employed
+flag fixed, total tax payable is piecewise linear in employment income (or in
+the RRSP contribution). compile_return() fits that function once from the
+known kink points (see piecewise) and returns a CompiledReturn whose knot
+tables answer total tax, after-tax income and marginal rate with one bisect
+and one multiply-add, with no config lookups or credit math per call.
+"""
+
+from piecewise import PiecewiseLinear, fit
+
+VARIABLES = ("employment_income", "rrsp_contribution")
+DEFAULT_HIGH = 1_000_000.0
+_TOTAL_TAX = ("total_tax_payable",)
+
+
+class CompiledReturn:
+    """
+    Total tax payable and after-tax income as PiecewiseLinear functions of
+    `variable`, for fixed other inputs. total_tax / after_tax are the knot
+    tables themselves; each segment is (x0, x1, y0, slope).
+    """
+
+    __slots__ = ("variable", "fixed", "total_tax", "after_tax")
+
+    def __init__(self, variable, fixed, total_tax, after_tax):
+        self.variable = variable
+        self.fixed = fixed
+        self.total_tax = total_tax
+        self.after_tax = after_tax
+
+    def __repr__(self):
+        return f"CompiledReturn(variable={self.variable!r}, segments={len(self.total_tax)})"
+
+    def total_tax_payable(self, x):
+        return self.total_tax(x)
+
+    def after_tax_income(self, x):
+        return self.after_tax(x)
+
+    def marginal_rate(self, x):
+        """
+        Effective marginal rate d(total tax)/d(variable) at x: the slope of the
+        segment, including credit phase-ins and outs. Negative for RRSP (each
+        dollar contributed saves that much tax). This is not the statutory
+        bracket rate reported as IndividualReturn.marginal_tax_rate.
+        """
+        return self.total_tax.slope(x)
+
+    def evaluate(self, x):
+        """(total tax payable, after-tax income, marginal rate) with a single bisect."""
+        tax = self.total_tax
+        i = tax.segment(x)
+        dx = x - tax.xs[i]
+        return (
+            tax.ys[i] + dx * tax.slopes[i],
+            self.after_tax.ys[i] + dx * self.after_tax.slopes[i],
+            tax.slopes[i],
+        )
+
+    def segments(self):
+        """[(x0, x1, total tax at x0, marginal rate)] for every segment."""
+        tax = self.total_tax
+        return list(zip(tax.xs, tax.xs[1:], tax.ys, tax.slopes))
+
+    def total_tax_payable_array(self, values):
+        return self.total_tax.evaluate_array(values)
+
+    def after_tax_income_array(self, values):
+        return self.after_tax.evaluate_array(values)
+
+
+def _total_tax_payable(rev, **inputs):
+    """
+    compute_basic_return(...).total_tax_payable through the projection (see
+    projection), which skips the marginal and average rates: they raise for a
+    zero income or an income that falls between two brackets.
+    """
+    return rev.compute_basic_return_fields(_TOTAL_TAX, **inputs)["total_tax_payable"]
+
+
+def taxable_income_breakpoints(rev):
+    """Taxable incomes where tax can change slope: bracket bounds and credit caps."""
+    cra = rev.cra
+    fed = cra.get_federal_bracket_table()
+    prov = cra.get_provincial_bracket_table()
+    floor, pct_of_income = cra.get_medical_expense_threshold_params()
+    points = fed.floors + fed.ceilings + prov.floors + prov.ceilings
+    points += (cra.basic_income_tax_credit / 0.03, floor / pct_of_income)
+    return [x for x in points if x != float("inf")]
+
+
+def compile_return(
+    rev,
+    variable="employment_income",
+    *,
+    employment_income=0.0,
+    ucc_benefit=0.0,
+    ei_benefits=0.0,
+    investment_income=0.0,
+    rrsp_contribution=0.0,
+    medical_expenses=0.0,
+    self_employed=False,
+    low=0.0,
+    high=None,
+):
+    """
+    Compile the return of an IndividualRevenue `rev` into a CompiledReturn
+    over `variable` ("employment_income" or "rrsp_contribution") on [low, high];
+    the other inputs are fixed at the given values (the variable's own keyword
+    is ignored). high defaults to $1M of employment income, or for RRSP to the
+    total income. Outside [low, high] the end segments extend linearly.
+    """
+    if variable not in VARIABLES:
+        raise ValueError(f"Unknown variable {variable!r}. Must be one of {VARIABLES}")
+    fixed = {
+        "employment_income": employment_income,
+        "ucc_benefit": ucc_benefit,
+        "ei_benefits": ei_benefits,
+        "investment_income": investment_income,
+        "rrsp_contribution": rrsp_contribution,
+        "medical_expenses": medical_expenses,
+        "self_employed": self_employed,
+    }
+    del fixed[variable]
+    other_income = ucc_benefit + ei_benefits + investment_income
+    taxable_points = taxable_income_breakpoints(rev)
+    if variable == "employment_income":
+        # taxable = salary + other income - RRSP
+        points = [t - other_income + rrsp_contribution for t in taxable_points]
+        points += [rev.ympe, rev.cra.get_canada_employment_amount_max()]
+        high = DEFAULT_HIGH if high is None else high
+    else:
+        # taxable = total income - RRSP
+        total_income = employment_income + other_income
+        points = [total_income - t for t in taxable_points]
+        high = total_income if high is None else high
+    if high <= low:
+        raise ValueError(f"Invalid range ({low}, {high}): upper bound must exceed lower bound")
+
+    def tax(x):
+        return _total_tax_payable(rev, **{variable: x}, **fixed)
+
+    total_tax = fit(tax, [low, high] + [x for x in points if low < x < high])
+    if variable == "employment_income":
+        after_tax = PiecewiseLinear(total_tax.xs, [x - y for x, y in zip(total_tax.xs, total_tax.ys)])
+    else:
+        after_tax = PiecewiseLinear(total_tax.xs, [employment_income - y for y in total_tax.ys])
+    return CompiledReturn(variable, fixed, total_tax, after_tax)
@@ -43,6 +43,66 @@ class CorporateRevenue:
             total_tax_payable=total_tax_payable,
             avg_tax_rate=avg_tax_rate)
 
+    def estimate_ccpc_tax_fields(self, fields, revenue, cpp_contributions, deductions,
+                                 tax_credits):
+        """
+        Only the named fields of the estimate as a dict, computing just the
+        stages that feed them (see projection).
+        """
+        from projection import estimate_ccpc_tax_fields
+
+        return estimate_ccpc_tax_fields(self, fields, revenue, cpp_contributions, deductions,
+                                        tax_credits)
+
+    def estimate_ccpc_tax_fields_batch(self, fields, revenue, cpp_contribution, deductions,
+                                       tax_credits):
+        """
+        Vectorized estimate_ccpc_tax_fields; cpp_contribution is the summed CPP
+        per row. Returns a dict of float64 columns.
+        """
+        from projection import estimate_ccpc_tax_fields_batch
+
+        return estimate_ccpc_tax_fields_batch(self, fields, revenue, cpp_contribution,
+                                              deductions, tax_credits)
+
+    def explain_ccpc_tax(self, revenue, cpp_contributions, deductions, tax_credits):
+        """
+        estimate_ccpc_tax with a line-by-line trace: an Explanation whose result
+        is the CorporateReturn (see explain).
+        """
+        from explain import explain_ccpc_tax
+
+        return explain_ccpc_tax(self, revenue, cpp_contributions, deductions, tax_credits)
+
+    def estimate_ccpc_tax_batch(self, revenue, cpp_contribution, deductions, tax_credits):
+        """
+        Vectorized estimate_ccpc_tax over column arrays (scalars broadcast).
+        cpp_contribution is the summed CPP per row. Returns a columnar
+        CorporateReturnBatch.
+        """
+        from batch import estimate_ccpc_tax_batch
+
+        return estimate_ccpc_tax_batch(self, revenue, cpp_contribution, deductions, tax_credits)
+
+    def estimate_ccpc_tax_cents(self, revenue, cpp_contributions, deductions, tax_credits):
+        """
+        estimate_ccpc_tax on the integer-cents engine: amounts in and out are
+        int cents, rounded to the cent at every line (see fixed_point).
+        """
+        from fixed_point import estimate_ccpc_tax_cents
+
+        return estimate_ccpc_tax_cents(self, revenue, cpp_contributions, deductions, tax_credits)
+
+    def estimate_ccpc_tax_cents_batch(self, revenue, cpp_contribution, deductions, tax_credits):
+        """
+        Vectorized estimate_ccpc_tax_cents over int64 cent columns. Returns a
+        dict of columns (int64 cents, float64 rates).
+        """
+        from fixed_point import estimate_ccpc_tax_cents_batch
+
+        return estimate_ccpc_tax_cents_batch(self, revenue, cpp_contribution, deductions,
+                                             tax_credits)
+
     def print_return_summary(self, tr: CorporateReturn):
         print("-" * 40)
         print(f"CCPC Revenue")
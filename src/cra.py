@@ -1,43 +1,169 @@
 import json
+import os
+import threading
 from pathlib import Path
 
+import compiled_config
+from brackets import BracketTable
 from data_objects import BPA
 
+_CONFIG_PATH = compiled_config.CONFIG_PATH
 
-def _load_cra_config():
+
+def _load_cra_config(config_path=_CONFIG_PATH):
     """Load CRA parameters from data/cra_config.json (keyed by tax year)."""
-    config_path = Path(__file__).resolve().parent.parent / "data" / "cra_config.json"
     with open(config_path, encoding="utf-8") as f:
         return json.load(f)
 
 
-def _brackets_from_config(bracket_list):
-    """Convert config bracket list (null = infinity) to list of (min, max, rate) tuples."""
-    result = []
-    for min_val, max_val, rate in bracket_list:
-        max_val = float("inf") if max_val is None else max_val
-        result.append((min_val, max_val, rate))
-    return result
+class ConfigRegistry:
+    """
+    Process-wide registry of immutable per-year CRA config snapshots.
+
+    The config is loaded once, from the precompiled artifact when it is up to
+    date (see compiled_config), and only re-read when the JSON's mtime or size
+    changes; a changed file whose content hash is unchanged keeps the existing
+    snapshots. Hit/miss/reload counters are available through stats().
+    """
+
+    def __init__(self, config_path=_CONFIG_PATH):
+        self.config_path = Path(config_path)
+        self._lock = threading.Lock()
+        self._stamp = None
+        self._version = None
+        self._raw_years = {}
+        self._years = {}
+        self._compiled_tables = {}
+        self._tables = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def _file_stamp(self):
+        st = os.stat(self.config_path)
+        return st.st_mtime_ns, st.st_size
+
+    def _refresh(self):
+        """Re-read the config if the file changed since the last load. Caller holds the lock."""
+        stamp = self._file_stamp()
+        if stamp == self._stamp:
+            return False
+        artifact = compiled_config.load(self.config_path, stamp)
+        version = artifact["version"]
+        self._stamp = stamp
+        if version == self._version:
+            return False
+        # years are frozen on first use; a one-shot call only pays for its own year
+        self._raw_years = artifact["years"]
+        self._years = {}
+        self._compiled_tables = artifact["tables"]
+        self._tables = {}
+        self._version = version
+        self.reloads += 1
+        return True
+
+    def get(self, year):
+        """Return the read-only config snapshot for a tax year."""
+        return self.get_versioned(year)[0]
+
+    def get_versioned(self, year):
+        """(snapshot, version hash) for a tax year, read under one lock."""
+        year_str = str(year)
+        with self._lock:
+            reloaded = self._refresh()
+            snapshot = self._years.get(year_str)
+            if snapshot is None:
+                if year_str not in self._raw_years:
+                    supported = ", ".join(sorted(self._raw_years.keys()))
+                    raise ValueError(f"Invalid year. Must be one of {{{supported}}}")
+                snapshot = self._years[year_str] = compiled_config.freeze(self._raw_years[year_str])
+            if reloaded:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return snapshot, self._version
+
+    def bracket_table(self, year, jurisdiction, snapshot):
+        """
+        Compiled BracketTable for (year, jurisdiction), built once per config snapshot.
+        jurisdiction is "federal" or "provincial".
+        """
+        key = (str(year), jurisdiction)
+        with self._lock:
+            cached = self._tables.get(key)
+            if cached is not None and cached[0] is snapshot:
+                return cached[1]
+            if self._years.get(key[0]) is snapshot:
+                table = BracketTable.from_columns(*self._compiled_tables[key[0]][jurisdiction])
+            else:
+                # snapshot predates the last reload; build from its own brackets
+                brackets = snapshot[compiled_config.JURISDICTIONS[jurisdiction]]
+                table = BracketTable.from_config(brackets)
+            self._tables[key] = (snapshot, table)
+            return table
+
+    def years(self):
+        with self._lock:
+            self._refresh()
+            return tuple(sorted(self._raw_years.keys()))
+
+    def version(self):
+        """SHA-256 of the config file contents currently loaded."""
+        with self._lock:
+            self._refresh()
+            return self._version
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "reloads": self.reloads,
+            "version": self._version,
+        }
+
+    def clear(self):
+        """Drop cached snapshots and counters; the next get() re-reads the file."""
+        with self._lock:
+            self._stamp = None
+            self._version = None
+            self._raw_years = {}
+            self._years = {}
+            self._compiled_tables = {}
+            self._tables = {}
+            self.hits = self.misses = self.reloads = 0
+
+
+_registry = ConfigRegistry()
+
+
+def get_config_registry():
+    return _registry
+
+
+def config_version():
+    """Version hash of the CRA config currently in use."""
+    return _registry.version()
 
 
 class CRA:
 
     def __init__(self, year):
         self.year = year
-        config = _load_cra_config()
-        year_str = str(year)
-        if year_str not in config:
-            supported = ", ".join(sorted(config.keys()))
-            raise ValueError(f"Invalid year. Must be one of {{{supported}}}")
-        self._config = config[year_str]
+        self._config, self.config_version = _registry.get_versioned(year)
         self.basic_income_tax_credit = self._config["basic_income_tax_credit"]
         self.fed_non_refundable_tax_credit_rate = self._config["fed_non_refundable_tax_credit_rate"]
 
     def get_federal_tax_brackets(self):
-        return _brackets_from_config(self._config["federal_tax_brackets"])
+        return self.get_federal_bracket_table().brackets
 
     def get_provincial_tax_brackets(self):
-        return _brackets_from_config(self._config["provincial_tax_brackets"])
+        return self.get_provincial_bracket_table().brackets
+
+    def get_federal_bracket_table(self):
+        return _registry.bracket_table(self.year, "federal", self._config)
+
+    def get_provincial_bracket_table(self):
+        return _registry.bracket_table(self.year, "provincial", self._config)
 
     def print_all_brackets(self):
         federal_tax_brackets = self.get_federal_tax_brackets()
@@ -79,9 +205,12 @@ class CRA:
         - the tax credit for a given year (e.g. For 2023 it was $1,368)
         - the total of the employment income that you reported on your return
         """
-        max_amount = self._config["canada_employment_amount_max"]
+        max_amount = self.get_canada_employment_amount_max()
         return min(max_amount, income)
 
+    def get_canada_employment_amount_max(self):
+        return self._config["canada_employment_amount_max"]
+
     def get_bpa(self):
         """
         n.b. The basic personal amount is the amount that can be earned before any
@@ -108,8 +237,13 @@ class CRA:
         return self._config["ympe"]
 
     def get_medical_expense_threshold(self, income):
+        floor, pct_of_income = self.get_medical_expense_threshold_params()
+        return min(floor, income * pct_of_income)
+
+    def get_medical_expense_threshold_params(self):
+        """(floor, pct_of_income): the threshold is the lesser of the floor and pct × income."""
         m = self._config["medical_expense_threshold"]
-        return min(m["floor"], income * m["pct_of_income"])
+        return m["floor"], m["pct_of_income"]
 
     def get_cpp_rate(self):
         return self._config["cpp"]["rate"]
@@ -28,7 +28,7 @@ class Income:
     investment_income: Optional[float] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class IndividualReturn:
     employment_income: float
     total_income: float
@@ -43,7 +43,7 @@ class IndividualReturn:
     marginal_tax_rate: float
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CorporateReturn:
     revenue: float
     taxable_revenue: float
@@ -56,3 +56,19 @@ class CorporateReturn:
     cpp_contribution: float
     total_tax_payable: float
     avg_tax_rate: float
+
+
+@dataclass(frozen=True, slots=True)
+class HouseholdSplit:
+    """
+    One owner-manager split of CCPC revenue: salaries and RRSP for the
+    primary earner and spouse, and the resulting household/corporate totals.
+    """
+    primary_salary: float
+    spouse_salary: float
+    primary_rrsp: float
+    spouse_rrsp: float
+    total_tax: float
+    household_after_tax: float
+    total_after_tax: float
+    monthly_disbursement: float
@@ -4,10 +4,31 @@ given a year and revenue/income. Callable from the command line.
 """
 
 import argparse
+import json
+import sys
+from functools import partial
+
+import batch_io
+import compiled_config
+from batch_calc import (
+    CORPORATE_RETURN_FIELDS,
+    INDIVIDUAL_RETURN_FIELDS,
+    calculate_corporate_tax_batch,
+    calculate_individual_tax_batch,
+)
 from individual import IndividualRevenue
 from corporate import CorporateRevenue
+from cra import config_version, get_config_registry
 from data_objects import IndividualReturn
 
+_INDIVIDUAL_OPTIONAL_FIELDS = (
+    "ucc_benefit",
+    "ei_benefits",
+    "investment_income",
+    "rrsp_contribution",
+    "medical_expenses",
+)
+
 
 def calculate_individual_tax(year: int, income: float, **kwargs) -> IndividualReturn:
     """
@@ -88,18 +109,723 @@ def calculate_corporate_tax(
     """
     rev = CorporateRevenue(year)
     cpp_contributions = cpp_contributions or []
-    tr = rev.estimate_ccpc_tax(
+    tr = rev.estimate_ccpc_tax_fields(
+        ("total_tax_payable",),
         revenue=revenue,
         cpp_contributions=cpp_contributions,
         deductions=deductions,
         tax_credits=tax_credits,
     )
-    return tr.total_tax_payable
+    return tr["total_tax_payable"]
+
+
+############################################
+# Batch mode
+############################################
+def _record_number(record, name, default=0.0):
+    value = record.get(name)
+    if value is None or value == "":
+        return default
+    return float(value)
+
+
+def _record_bool(record, name):
+    value = record.get(name)
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "y")
+    return bool(value)
+
+
+def _record_year(record, default_year):
+    value = record.get("year")
+    if value is None or value == "":
+        if default_year is None:
+            raise ValueError(f"Record has no year and --year was not given: {record}")
+        return default_year
+    return int(value)
+
+
+def _record_cpp(record):
+    """Corporate CPP contributions: a number, a JSON list or a ';'-separated CSV field."""
+    value = record.get("cpp_contributions")
+    if value is None or value == "":
+        return 0.0
+    if isinstance(value, list):
+        return sum(float(v) for v in value)
+    if isinstance(value, str):
+        return sum(float(v) for v in value.split(";") if v.strip())
+    return float(value)
+
+
+def _round_result(name, value):
+    value = float(value)
+    return round(value, 6) if name.endswith("_rate") else round(value, 2)
+
+
+def _individual_columns(records):
+    columns = {"incomes": [_record_number(r, "income") for r in records]}
+    for name in _INDIVIDUAL_OPTIONAL_FIELDS:
+        columns[name] = [_record_number(r, name) for r in records]
+    columns["self_employed"] = [_record_bool(r, "self_employed") for r in records]
+    return columns
+
+
+def _corporate_columns(records):
+    return {
+        "revenue": [_record_number(r, "revenue") for r in records],
+        "cpp_contributions": [_record_cpp(r) for r in records],
+        "deductions": [_record_number(r, "deductions") for r in records],
+        "tax_credits": [_record_number(r, "tax_credits") for r in records],
+    }
+
+
+def _result_fields(entity, full):
+    if not full:
+        return ("total_tax_payable",)
+    return INDIVIDUAL_RETURN_FIELDS if entity == "individual" else CORPORATE_RETURN_FIELDS
+
+
+def _compute_chunk(entity, default_year, fields, cents, records):
+    """Unrounded result columns {field: list} for records, in input order, computed per year."""
+    if entity == "individual":
+        compute, to_columns = calculate_individual_tax_batch, _individual_columns
+    else:
+        compute, to_columns = calculate_corporate_tax_batch, _corporate_columns
+
+    years = [_record_year(r, default_year) for r in records]
+    out = {name: [None] * len(records) for name in fields}
+    for year in dict.fromkeys(years):
+        rows = [i for i, y in enumerate(years) if y == year]
+        results = compute(year, cents=cents, fields=fields,
+                          **to_columns([records[i] for i in rows]))
+        for name in fields:
+            column = out[name]
+            for i, value in zip(rows, results[name].tolist()):
+                column[i] = value
+    return out
+
+
+def _append_results(records, fields, columns):
+    """Copies of records with the rounded result fields appended."""
+    out = []
+    for j, record in enumerate(records):
+        record = dict(record)
+        for name in fields:
+            record[name] = _round_result(name, columns[name][j])
+        out.append(record)
+    return out
+
 
+def _serial_columns(entity, default_year, cents, fields, chunks):
+    """Result columns per chunk of records, computed in this process."""
+    return map(partial(_compute_chunk, entity, default_year, fields, cents), chunks)
+
+
+def _process_shared_chunk(entity, default_year, fields, cents, specs):
+    """Worker side of _shared_columns: compute an input block into its output block."""
+    from parallel import SharedColumns, worker_revenue
+
+    inputs, outputs = (SharedColumns.attach(spec) for spec in specs)
+    results = _compute_columns(entity, inputs.columns, default_year, fields, cents, "batch",
+                               worker_revenue)
+    outputs = outputs.columns
+    for name in fields:
+        outputs[name][:] = results[name]
+
+
+def _shared_columns(executor, entity, default_year, cents, fields, chunks):
+    """
+    Result columns per chunk of records, computed by a BatchExecutor's pool.
+    Each chunk's input columns are written to a shared memory block that the
+    worker computes into a second block; records stay in this process and
+    only the block names cross the pipe.
+    """
+    from collections import deque
+
+    import binary_io
+    from parallel import SharedColumns
+
+    names = binary_io.INPUT_COLUMNS[entity]
+    blocks = deque()
+
+    def submit():
+        for records in chunks:
+            values = {name: [_binary_value(r, name) for r in records] for name in names}
+            values["year"] = [_record_year(r, default_year) for r in records]
+            inputs = SharedColumns.create(names, len(records))
+            outputs = SharedColumns.create(fields, len(records))
+            blocks.append((inputs, outputs))
+            for name, column in inputs.columns.items():
+                column[:] = values[name]
+            yield inputs.spec, outputs.spec
+
+    process = partial(_process_shared_chunk, entity, default_year, fields, cents)
+    try:
+        for _ in executor.imap(process, submit()):
+            inputs, outputs = blocks.popleft()
+            inputs.unlink()
+            outputs.unlink()
+            yield {name: values.tolist() for name, values in outputs.columns.items()}
+    finally:
+        for block in blocks:
+            block[0].unlink()
+            block[1].unlink()
+
+
+def _chunk_results(entity, full, chunks, compute):
+    """Output records per chunk, with results from compute (_serial_columns or _shared_columns)."""
+    from collections import deque
+
+    fields = _result_fields(entity, full)
+    pending = deque()
+
+    def feed():
+        for records in chunks:
+            pending.append(records)
+            yield records
+
+    for columns in compute(fields, feed()):
+        yield _append_results(pending.popleft(), fields, columns)
+
+
+def _cache_keys(entity, default_year, cents, records):
+    from result_cache import input_key
+
+    years = [float(_record_year(r, default_year)) for r in records]
+    if entity == "individual":
+        columns = _individual_columns(records)
+    else:
+        columns = _corporate_columns(records)
+    return [input_key(inputs, cents) for inputs in zip(years, *columns.values())]
+
+
+def _cached_chunks(cache, entity, default_year, full, cents, chunks, compute):
+    """
+    Output records per chunk, taking results from a ResultCache where it has
+    them. Only the other rows are passed, as one list per chunk, through
+    compute (see _chunk_results) and then added to the cache.
+    """
+    from collections import deque
 
-def main():
+    all_fields = _result_fields(entity, True)
+    pending = deque()
+
+    def misses():
+        for records in chunks:
+            keys = _cache_keys(entity, default_year, cents, records)
+            found = cache.get_many(entity, keys)
+            missing = [i for i, key in enumerate(keys) if key not in found]
+            pending.append((records, keys, found, missing))
+            yield [records[i] for i in missing]
+
+    for computed in compute(all_fields, misses()):
+        records, keys, found, missing = pending.popleft()
+        rows = list(zip(*(computed[name] for name in all_fields)))
+        cache.put_many(entity, zip((keys[i] for i in missing), rows))
+        found.update(zip((keys[i] for i in missing), rows))
+        values = [found[key] for key in keys]
+        columns = {name: [v[k] for v in values] for k, name in enumerate(all_fields)}
+        yield _append_results(records, _result_fields(entity, full), columns)
+
+
+def run_batch(entity, input_path=None, output_path=None, fmt=None, year=None, full=False,
+              chunk_size=10_000, workers=1, cents=False, cache=None):
+    """
+    Stream records from input_path (stdin if None/"-") through the batch
+    calculators and write them, with result fields appended, to output_path
+    (stdout if None/"-") in the same format. With workers > 1 chunks are
+    computed in a process pool, through shared memory, and written in input
+    order. With a result_cache.ResultCache, only rows it does not hold are
+    computed. Binary column files are handed to run_binary_batch (uncached).
+    Returns the number of records.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be positive, got {chunk_size}")
+    fmt = fmt or batch_io.detect_format(input_path)
+    if fmt == batch_io.BINARY:
+        return run_binary_batch(entity, input_path, output_path, year, full, chunk_size, workers,
+                                cents)
+    src = batch_io.open_input(input_path)
+    dst = batch_io.open_output(output_path)
+    writer = batch_io.RecordWriter(dst, fmt)
+    count = 0
+    executor = None
+    try:
+        chunks = batch_io.iter_chunks(batch_io.read_records(src, fmt), chunk_size)
+        if workers > 1:
+            from parallel import BatchExecutor
+
+            years = [year] if year is not None else [int(y) for y in get_config_registry().years()]
+            executor = BatchExecutor(years, workers=workers)
+            compute = partial(_shared_columns, executor, entity, year, cents)
+        else:
+            compute = partial(_serial_columns, entity, year, cents)
+        if cache is not None:
+            results = _cached_chunks(cache, entity, year, full, cents, chunks, compute)
+        else:
+            results = _chunk_results(entity, full, chunks, compute)
+        for records in results:
+            writer.write(records)
+            count += len(records)
+        writer.flush()
+    finally:
+        if executor is not None:
+            executor.close()
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    return count
+
+
+############################################
+# Binary column files
+############################################
+def _compute_columns(entity, columns, default_year, fields, cents, source, revenue=None):
+    """
+    Result columns {field: array} for a dict of binary_io input columns
+    (views are not modified). source names the input in errors. revenue, if
+    given, maps (entity, year) to the calculator to use, such as a pool
+    worker's preloaded parallel.worker_revenue.
+    """
+    import numpy as np
+
+    columns = dict(columns)
+    years = columns.pop("year")
+    missing = np.isnan(years)
+    if missing.any():
+        if default_year is None:
+            raise ValueError(f"{source}: rows without a year and --year was not given")
+        years = np.where(missing, default_year, years)
+    if entity == "individual":
+        compute = calculate_individual_tax_batch
+        columns["incomes"] = columns.pop("income")
+        columns["self_employed"] = columns["self_employed"] != 0
+    else:
+        compute = calculate_corporate_tax_batch
+    out = {name: np.empty(len(years)) for name in fields}
+    year_values = np.unique(years)
+    for year in year_values:
+        # a single-year chunk is computed on the mapped slices as-is
+        rows = slice(None) if len(year_values) == 1 else years == year
+        rev = revenue(entity, int(year)) if revenue is not None else None
+        results = compute(int(year), cents=cents, fields=fields, rev=rev,
+                          **{k: v[rows] for k, v in columns.items()})
+        for name in fields:
+            out[name][rows] = results[name]
+    return out
+
+
+def _process_binary_chunk(entity, input_path, default_year, full, cents, bounds, revenue=None):
+    """Result columns for rows [start, stop) of a column file, computed on its mapped buffers."""
+    import binary_io
+
+    start, stop = bounds
+    with binary_io.open_binary(input_path) as src:
+        columns = {name: values[start:stop] for name, values in src.columns.items()}
+    return _compute_columns(entity, columns, default_year, _result_fields(entity, full), cents,
+                            input_path, revenue)
+
+
+def _write_binary_chunk(entity, input_path, output_path, default_year, full, cents, bounds):
+    """Worker side of a parallel run_binary_batch: compute rows into the mapped output file."""
+    import binary_io
+    from parallel import worker_revenue
+
+    start, stop = bounds
+    columns = _process_binary_chunk(entity, input_path, default_year, full, cents, bounds,
+                                    worker_revenue)
+    with binary_io.open_binary(output_path, "r+") as dst:
+        for name, values in columns.items():
+            dst[name][start:stop] = values
+
+
+def run_binary_batch(entity, input_path, output_path, year=None, full=False,
+                     chunk_size=10_000, workers=1, cents=False):
+    """
+    run_batch for binary column files (see binary_io). The input is read and
+    the output written through memory maps, chunk by chunk; with workers > 1
+    each worker maps both files and writes its rows of the output itself,
+    so only row offsets cross the process pool's pipe. The output holds the
+    input columns followed by the (unrounded) result columns and records the
+    config version used. Returns the number of rows.
+    """
+    import binary_io
+
+    if input_path in (None, "-") or output_path in (None, "-"):
+        raise ValueError("The binary format needs --input and --output file paths")
+    with binary_io.open_binary(input_path) as src:
+        if src.entity != entity:
+            raise ValueError(f"{input_path} holds {src.entity} records, not {entity}")
+        input_columns = list(src.header["columns"])
+        out_columns = list(dict.fromkeys(input_columns + list(_result_fields(entity, full))))
+        n = src.rows
+        with binary_io.create_binary(output_path, entity, out_columns, n, config_version()) as dst:
+            for name in input_columns:
+                dst[name][:] = src[name]
+            bounds = [(a, min(a + chunk_size, n)) for a in range(0, n, chunk_size)]
+            executor = None
+            try:
+                if workers > 1:
+                    from parallel import BatchExecutor
+
+                    years = [year] if year is not None else [int(y) for y in get_config_registry().years()]
+                    executor = BatchExecutor(years, workers=workers)
+                    process = partial(_write_binary_chunk, entity, input_path, output_path, year,
+                                      full, cents)
+                    for _ in executor.imap(process, bounds):
+                        pass
+                else:
+                    process = partial(_process_binary_chunk, entity, input_path, year, full, cents)
+                    for (a, b), columns in zip(bounds, map(process, bounds)):
+                        for name, values in columns.items():
+                            dst[name][a:b] = values
+            finally:
+                if executor is not None:
+                    executor.close()
+    return n
+
+
+def _binary_value(record, name):
+    if name == "year":
+        value = record.get("year")
+        return float("nan") if value is None or value == "" else float(value)
+    if name == "self_employed":
+        return float(_record_bool(record, name))
+    if name == "cpp_contributions":
+        return _record_cpp(record)
+    return _record_number(record, name)
+
+
+def records_to_binary(entity, input_path, output_path, fmt=None, chunk_size=100_000):
+    """
+    Convert a CSV/JSONL record file to a binary column file of the entity's
+    input columns. The input is read twice (count, then fill), so it must be a
+    file. Returns the number of rows.
+    """
+    import binary_io
+
+    fmt = fmt or batch_io.detect_format(input_path)
+    if input_path in (None, "-"):
+        raise ValueError("Converting to binary needs an input file path")
+    with batch_io.open_input(input_path) as f:
+        n = sum(1 for _ in batch_io.read_records(f, fmt))
+    names = binary_io.INPUT_COLUMNS[entity]
+    with batch_io.open_input(input_path) as f, \
+            binary_io.create_binary(output_path, entity, names, n) as dst:
+        start = 0
+        for records in batch_io.iter_chunks(batch_io.read_records(f, fmt), chunk_size):
+            stop = start + len(records)
+            for name in names:
+                dst[name][start:stop] = [_binary_value(r, name) for r in records]
+            start = stop
+    return n
+
+
+def binary_to_records(input_path, output_path, fmt=None, chunk_size=100_000):
+    """
+    Convert a binary column file (inputs or results) to CSV/JSONL records.
+    Values are written unrounded. Returns the number of rows.
+    """
+    import binary_io
+
+    fmt = fmt or batch_io.detect_format(output_path)
+    dst = batch_io.open_output(output_path)
+    writer = batch_io.RecordWriter(dst, fmt)
+    try:
+        with binary_io.open_binary(input_path) as src:
+            names = src.header["columns"]
+            for start in range(0, src.rows, chunk_size):
+                columns = [src[name][start:start + chunk_size].tolist() for name in names]
+                records = []
+                for values in zip(*columns):
+                    record = dict(zip(names, values))
+                    if "year" in record and record["year"] == record["year"]:
+                        record["year"] = int(record["year"])
+                    if "self_employed" in record:
+                        record["self_employed"] = int(record["self_employed"])
+                    records.append(record)
+                writer.write(records)
+            writer.flush()
+            return src.rows
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+
+
+def convert_main(argv):
     parser = argparse.ArgumentParser(
-        description="Calculate taxes owed for an individual or corporation."
+        prog="driver.py convert",
+        description="Convert between CSV/JSONL records and binary column files (.taxcol).",
+    )
+    parser.add_argument(
+        "entity",
+        choices=["individual", "corporation"],
+        help="Entity type of the records",
+    )
+    parser.add_argument("input", help="Input file; its extension selects the format")
+    parser.add_argument(
+        "output",
+        help="Output file ('-' for stdout when writing records); its extension selects the format",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=100_000,
+        help="Rows converted per chunk (bounds memory use)",
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    in_fmt = batch_io.detect_format(args.input)
+    out_fmt = batch_io.detect_format(args.output)
+    if (in_fmt == batch_io.BINARY) == (out_fmt == batch_io.BINARY):
+        parser.error("exactly one of input and output must be a .taxcol file")
+    if out_fmt == batch_io.BINARY:
+        records_to_binary(args.entity, args.input, args.output, in_fmt, args.chunk_size)
+    else:
+        binary_to_records(args.input, args.output, out_fmt, args.chunk_size)
+
+
+def _explain_columns(entity, columns):
+    """Batch columns keyed like compute_basic_return_batch / estimate_ccpc_tax_batch."""
+    columns = dict(columns)
+    if entity == "individual":
+        columns["employment_income"] = columns.pop("incomes" if "incomes" in columns else "income")
+    else:
+        columns["cpp_contribution"] = columns.pop("cpp_contributions")
+    return columns
+
+
+def explain_record(entity, input_path, row, fmt=None, year=None):
+    """
+    Explanation (see explain) of record `row` (0-based) of a CSV/JSONL file or
+    binary column file. Binary rows are read straight from the memory map;
+    records are streamed up to the row. No other row is computed.
+    """
+    from itertools import islice
+
+    from explain import explain_row
+
+    revenue = IndividualRevenue if entity == "individual" else CorporateRevenue
+    fmt = fmt or batch_io.detect_format(input_path)
+    if fmt == batch_io.BINARY:
+        import binary_io
+
+        with binary_io.open_binary(input_path) as src:
+            if src.entity != entity:
+                raise ValueError(f"{input_path} holds {src.entity} records, not {entity}")
+            if not 0 <= row < src.rows:
+                raise IndexError(f"{input_path} has {src.rows} rows, no row {row}")
+            names = binary_io.INPUT_COLUMNS[entity]
+            columns = {name: src[name] for name in names if name != "year"}
+            row_year = src["year"][row]
+            row_year = year if row_year != row_year else int(row_year)
+            if row_year is None:
+                raise ValueError(f"Row {row} has no year and --year was not given")
+            return explain_row(revenue(row_year), row, **_explain_columns(entity, columns))
+    src = batch_io.open_input(input_path)
+    try:
+        record = next(islice(batch_io.read_records(src, fmt), row, None), None)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    if record is None:
+        raise IndexError(f"{input_path} has no row {row}")
+    to_columns = _individual_columns if entity == "individual" else _corporate_columns
+    columns = _explain_columns(entity, to_columns([record]))
+    return explain_row(revenue(_record_year(record, year)), 0, **columns)
+
+
+def explain_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="driver.py explain",
+        description="Print the line-by-line derivation of one record of a batch input "
+        "(CSV, JSONL or .taxcol) without computing the rest of the batch.",
+    )
+    parser.add_argument(
+        "entity",
+        choices=["individual", "corporation"],
+        help="Entity type of the records",
+    )
+    parser.add_argument("input", help="Input file, in any batch format")
+    parser.add_argument("row", type=int, help="Record to explain (0-based, header excluded)")
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="Tax year if the record has no year field",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the trace and result as JSON",
+    )
+    args = parser.parse_args(argv)
+    try:
+        explanation = explain_record(args.entity, args.input, args.row, year=args.year)
+    except (OSError, ValueError, IndexError) as e:
+        sys.exit(f"explain: {e}")
+    print(explanation.to_json() if args.json else explanation.format())
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(
+        prog="driver.py batch",
+        description="Calculate taxes for every record in a CSV or JSONL file (or stdin).",
+    )
+    parser.add_argument(
+        "entity",
+        choices=["individual", "corporation"],
+        help="Entity type of the records",
+    )
+    parser.add_argument(
+        "--input",
+        default="-",
+        help="Input file (default: stdin). Individual records: income, year, "
+        "rrsp_contribution, ucc_benefit, ei_benefits, investment_income, "
+        "medical_expenses, self_employed. Corporate records: revenue, year, "
+        "deductions, tax_credits, cpp_contributions",
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Output file (default: stdout), written in the input format",
+    )
+    parser.add_argument(
+        "--format",
+        choices=(*batch_io.FORMATS, batch_io.BINARY),
+        default=None,
+        help="Record format (default: from the input file extension, csv for stdin). "
+        "binary reads and writes memory-mapped .taxcol column files",
+    )
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="Tax year for records without a year field",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Append every return field instead of only total_tax_payable",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=10_000,
+        help="Records computed per chunk (bounds memory use)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for computing chunks (default: 1, in-process)",
+    )
+    parser.add_argument(
+        "--cents",
+        action="store_true",
+        help="Use the integer-cents engine: every line rounded to the cent, exact results",
+    )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        metavar="PATH",
+        help="SQLite result cache (created if missing): rows computed by an earlier run "
+        "with the same inputs and CRA config are not computed again",
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print the result cache statistics as JSON on stderr when done",
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    fmt = args.format or batch_io.detect_format(args.input)
+    if fmt == batch_io.BINARY and "-" in (args.input, args.output):
+        parser.error("the binary format needs --input and --output file paths")
+    if args.cache and fmt == batch_io.BINARY:
+        parser.error("--cache applies to csv and jsonl records, not the binary format")
+    if args.cache_stats and not args.cache:
+        parser.error("--cache-stats needs --cache")
+    cache = None
+    if args.cache:
+        from result_cache import ResultCache
+
+        cache = ResultCache(args.cache)
+    try:
+        run_batch(
+            args.entity,
+            input_path=args.input,
+            output_path=args.output,
+            fmt=fmt,
+            year=args.year,
+            full=args.full,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            cents=args.cents,
+            cache=cache,
+        )
+    finally:
+        if cache is not None:
+            if args.cache_stats:
+                print(json.dumps(cache.stats(), indent=2), file=sys.stderr)
+            cache.close()
+
+
+def sweep_main(argv):
+    # sweep builds on the batch calculators above
+    import sweep
+
+    return sweep.main(argv)
+
+
+def scenario_main(argv):
+    import scenario
+
+    return scenario.main(argv)
+
+
+def generate_main(argv):
+    import population
+
+    return population.main(argv)
+
+
+def cache_main(argv):
+    import result_cache
+
+    return result_cache.main(argv)
+
+
+_SUBCOMMANDS = {
+    "batch": batch_main,
+    "convert": convert_main,
+    "sweep": sweep_main,
+    "scenario": scenario_main,
+    "generate": generate_main,
+    "cache": cache_main,
+    "explain": explain_main,
+    "compile-config": compiled_config.main,
+}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] in _SUBCOMMANDS:
+        return _SUBCOMMANDS[argv[0]](argv[1:])
+
+    parser = argparse.ArgumentParser(
+        description="Calculate taxes owed for an individual or corporation.",
+        epilog="Use 'driver.py batch -h' to process a CSV/JSONL/binary file of records, "
+        "'driver.py convert -h' to convert between them, "
+        "'driver.py sweep -h' to write tax-at-every-income tables, "
+        "'driver.py scenario -h' to evaluate and rank owner-manager scenario grids, "
+        "'driver.py generate -h' to write synthetic populations for load testing, "
+        "'driver.py cache -h' to inspect a batch result cache, "
+        "'driver.py explain -h' to trace one record of a batch and "
+        "'driver.py compile-config' to rebuild the precompiled config artifact.",
     )
     parser.add_argument(
         "entity",
@@ -144,24 +870,41 @@ def main():
         action="store_true",
         help="Print only the tax amount",
     )
-    args = parser.parse_args()
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the line-by-line derivation of the return instead",
+    )
+    args = parser.parse_args(argv)
 
-    if args.entity == "individual":
+    if args.explain:
+        if args.entity == "individual":
+            explanation = IndividualRevenue(args.year).explain_basic_return(
+                args.amount, 0.0, 0.0, 0.0, args.rrsp, 0.0, args.self_employed
+            )
+        else:
+            explanation = CorporateRevenue(args.year).explain_ccpc_tax(
+                args.amount, [], args.deductions, args.tax_credits
+            )
+        print(explanation.format())
+    elif args.entity == "individual" and args.quiet:
+        tr = IndividualRevenue(args.year).compute_basic_return_fields(
+            ("total_tax_payable",), args.amount, 0.0, 0.0, 0.0, args.rrsp, 0.0, args.self_employed
+        )
+        print(f"{tr['total_tax_payable']:,.2f}")
+    elif args.entity == "individual":
         tr = calculate_individual_tax(
             args.year,
             args.amount,
             rrsp_contribution=args.rrsp,
             self_employed=args.self_employed,
         )
-        if args.quiet:
-            print(f"{tr.total_tax_payable:,.2f}")
-        else:
-            _print_individual_breakdown(
-                args.year,
-                args.amount,
-                tr,
-                self_employed=args.self_employed,
-            )
+        _print_individual_breakdown(
+            args.year,
+            args.amount,
+            tr,
+            self_employed=args.self_employed,
+        )
     else:
         tax_owed = calculate_corporate_tax(
             args.year,
@@ -0,0 +1,393 @@
+"""
+Line-by-line derivations of individual and corporate returns, on demand.
+
+explain_basic_return() and explain_ccpc_tax() walk the same stage methods as
+IndividualRevenue.compute_basic_return and CorporateRevenue.estimate_ccpc_tax
+and record every intermediate value as a TraceLine: each bracket slice, the
+BPA reduction factor, line 30000, the credit amounts summed into line 35000,
+and so on. The result they return is built from those same values, so it
+equals the normal calculation. Nothing here is wired into the normal path;
+it costs nothing unless called.
+
+explain_row() explains one row of batch input columns (arrays, as passed to
+the batch engines) without computing any other row. Rows the scalar path
+cannot compute are traced with the batch semantics instead of raising: a zero
+income or revenue gives a NaN/inf average rate and an income outside every
+bracket a NaN marginal rate (see batch).
+
+    rev = IndividualRevenue(2024)
+    print(rev.explain_basic_return(90_000, 0, 0, 0, 5_000, 0, False).format())
+"""
+
+import json
+import math
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from data_objects import CorporateReturn, IndividualReturn
+
+
+@dataclass(frozen=True, slots=True)
+class TraceLine:
+    """One intermediate value; line is the T1 return line number where there is one."""
+    name: str
+    value: float
+    line: Optional[str] = None
+    detail: str = ""
+
+
+class Explanation:
+    """A return plus the ordered trace lines it was derived from."""
+
+    __slots__ = ("result", "lines", "_by_name")
+
+    def __init__(self, result, lines):
+        self.result = result
+        self.lines = tuple(lines)
+        self._by_name = {line.name: line for line in self.lines}
+
+    def __getitem__(self, name):
+        return self._by_name[name]
+
+    def __contains__(self, name):
+        return name in self._by_name
+
+    def __iter__(self):
+        return iter(self.lines)
+
+    def __repr__(self):
+        return f"Explanation({type(self.result).__name__}, lines={len(self.lines)})"
+
+    def to_dict(self):
+        return {"result": asdict(self.result), "lines": [asdict(line) for line in self.lines]}
+
+    def to_json(self, indent=2):
+        """JSON of to_dict(); NaN/inf values are written as null, as batch does."""
+        return json.dumps(_json_safe(self.to_dict()), indent=indent, allow_nan=False)
+
+    def format(self):
+        """Plain-text table: line number, name, value, derivation."""
+        rows = []
+        for t in self.lines:
+            value = f"{t.value:.6f}" if t.name.endswith(("_rate", "_factor")) else f"{t.value:,.2f}"
+            rows.append(f"{t.line or '':>6}  {t.name:<32} {value:>16}  {t.detail}".rstrip())
+        return "\n".join(rows)
+
+
+class _Trace:
+    def __init__(self):
+        self.lines = []
+
+    def add(self, name, value, line=None, detail=""):
+        self.lines.append(TraceLine(name, value, line, detail))
+        return value
+
+
+def _m(x):
+    return f"${x:,.2f}"
+
+
+def _json_safe(value):
+    if isinstance(value, dict):
+        return {k: _json_safe(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_json_safe(v) for v in value]
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def _divide(numerator, denominator):
+    """numerator / denominator as float64 division: NaN or ±inf for a zero denominator."""
+    if denominator:
+        return numerator / denominator
+    if numerator == 0 or numerator != numerator:
+        return math.nan
+    return math.copysign(math.inf, numerator) * math.copysign(1.0, denominator)
+
+
+def _marginal_tax_rate(rev, taxable_income, federal_brackets, provincial_brackets):
+    """_compute_margin_tax_rate, NaN where it raises LookupError (as marginal_rate_array)."""
+    try:
+        return rev._compute_margin_tax_rate(taxable_income, federal_brackets, provincial_brackets)
+    except LookupError:
+        return math.nan
+
+
+def _bracket_slices(trace, rev, prefix, income, brackets):
+    for i, (mn, mx, rate) in enumerate(brackets, start=1):
+        amount = rev._get_taxable_amount(income, mn, mx)
+        band = f"over {_m(mn)}" if mx == float("inf") else f"in ({_m(mn)}, {_m(mx)}]"
+        trace.add(f"{prefix}_bracket_{i}", amount * rate,
+                  detail=f"{_m(amount)} of income {band} at {rate:.2%}")
+
+
+############################################
+# Individual
+############################################
+def explain_basic_return(
+    rev,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """compute_basic_return for an IndividualRevenue, with its trace."""
+    cra = rev.cra
+    t = _Trace()
+    t.add("employment_income", employment_income, "10100")
+
+    # CPP
+    earnings = min(rev.ympe, employment_income)
+    t.add("cpp_pensionable_earnings", earnings, detail=f"min(income, YMPE {_m(rev.ympe)})")
+    cpp_contribution = t.add(
+        "cpp_contribution",
+        rev.calculate_cpp(employment_income, self_employed),
+        "30800",
+        f"({_m(earnings)} - exemption {_m(rev.cpp_basic_annual_exemption)}) × {rev.cpp_rate:.2%}"
+        + (" × 2 (self-employed)" if self_employed else ""),
+    )
+    canada_employment_amount = t.add(
+        "canada_employment_amount",
+        cra.get_canada_employment_amount(employment_income),
+        "31260",
+        f"min(income, {_m(cra.get_canada_employment_amount_max())})",
+    )
+    federal_brackets = cra.get_federal_bracket_table()
+    provincial_brackets = cra.get_provincial_bracket_table()
+
+    # Income
+    total_income = t.add(
+        "total_income",
+        rev.calculate_total_income(employment_income, ucc_benefit, ei_benefits, investment_income),
+        "15000",
+        f"employment {_m(employment_income)} + UCCB {_m(ucc_benefit)} + EI {_m(ei_benefits)} "
+        f"+ investment {_m(investment_income)}",
+    )
+    employment_deductions = t.add(
+        "rrsp_deduction", rev.calculate_employment_deductions(rrsp_contribution), "20800"
+    )
+    taxable_income = t.add(
+        "taxable_income",
+        rev.calculate_net_income(total_income, employment_deductions),
+        "26000",
+        "total income - RRSP deduction",
+    )
+
+    # Tax on taxable income
+    _bracket_slices(t, rev, "federal", taxable_income, federal_brackets)
+    basic_federal_tax = t.add(
+        "basic_federal_tax",
+        rev.compute_federal_tax(taxable_income, federal_brackets),
+        "40400",
+        "sum of federal bracket slices",
+    )
+    _bracket_slices(t, rev, "provincial", taxable_income, provincial_brackets)
+    t.add(
+        "provincial_tax_before_credits",
+        rev.compute_tax(taxable_income, provincial_brackets),
+        detail="sum of provincial bracket slices",
+    )
+    provincial_bpa = cra.get_provincial_bpa()
+    t.add(
+        "provincial_bpa_credit",
+        provincial_bpa * provincial_brackets[0][2],
+        detail=f"provincial BPA {_m(provincial_bpa)} × {provincial_brackets[0][2]:.2%}",
+    )
+    provincial_tax = t.add(
+        "provincial_tax",
+        rev.compute_provincial_tax(taxable_income, provincial_brackets, provincial_bpa),
+        "42800",
+        "max(0, tax before credits - BPA credit)",
+    )
+    marginal_tax_rate = t.add(
+        "marginal_tax_rate",
+        _marginal_tax_rate(rev, taxable_income, federal_brackets, provincial_brackets),
+        detail="federal + provincial rate of the bracket holding taxable income "
+        "(NaN if no bracket holds it)",
+    )
+
+    # Non-refundable credits (mirrors compute_non_refundable_tax_credits)
+    bpa = rev.bpa
+    threshold, top = federal_brackets[3][0], federal_brackets[4][0]
+    t.add(
+        "bpa_reduction_factor",
+        rev._compute_reduction_factor(bpa, federal_brackets),
+        detail=f"additional BPA {_m(bpa.max - bpa.min)} / ({_m(top)} - {_m(threshold)})",
+    )
+    t.add(
+        "bpa_additional_amount",
+        rev._compute_additional_bpa(taxable_income, bpa, federal_brackets),
+        detail=f"reduced above {_m(threshold)} by the reduction factor",
+    )
+    basic_personal_amount = t.add(
+        "basic_personal_amount",
+        rev.compute_bpa(taxable_income, bpa, federal_brackets),
+        "30000",
+        f"minimum {_m(bpa.min)} + additional amount",
+    )
+    t.add("ei_premiums", ei_benefits, "31200", "EI amount passed to the credits")
+    income_tax_credit = t.add(
+        "basic_income_tax_credit",
+        min(taxable_income * 0.03, cra.basic_income_tax_credit),
+        detail=f"min(3% of net income, {_m(cra.basic_income_tax_credit)})",
+    )
+    medical_expense_threshold = t.add(
+        "medical_expense_threshold",
+        cra.get_medical_expense_threshold(taxable_income),
+        detail="lesser of the floor and % of net income",
+    )
+    eligible_medical_expenses = t.add(
+        "eligible_medical_expenses",
+        rev.compute_medical_expenses(medical_expenses, medical_expense_threshold),
+        "33099",
+        f"max(0, {_m(medical_expenses)} - threshold)",
+    )
+    t.add(
+        "total_credit_amounts",
+        sum([
+            basic_personal_amount,
+            cpp_contribution,
+            canada_employment_amount,
+            ei_benefits,
+            income_tax_credit,
+            eligible_medical_expenses,
+        ]),
+        "33500",
+    )
+    tax_credits = t.add(
+        "non_refundable_tax_credits",
+        rev.compute_non_refundable_tax_credits(
+            taxable_income,
+            bpa,
+            federal_brackets,
+            cpp_contribution,
+            canada_employment_amount,
+            ei_benefits,
+            medical_expenses,
+            taxable_income,
+        ),
+        "35000",
+        f"credit amounts × {cra.fed_non_refundable_tax_credit_rate:.2%}",
+    )
+
+    # Totals
+    net_federal_tax = t.add(
+        "net_federal_tax",
+        rev.compute_net_federal_tax(basic_federal_tax, tax_credits),
+        "42000",
+        "max(0, basic federal tax - non-refundable credits)",
+    )
+    total_tax_payable = t.add(
+        "total_tax_payable", net_federal_tax + provincial_tax, "43500", "federal + provincial"
+    )
+    after_tax_income = t.add(
+        "after_tax_income", employment_income - total_tax_payable, detail="income - total tax"
+    )
+    avg_tax_rate = t.add(
+        "avg_tax_rate",
+        _divide(total_tax_payable, employment_income),
+        detail="total tax / income (NaN/inf for a zero income)",
+    )
+    result = IndividualReturn(
+        employment_income=employment_income,
+        total_income=total_income,
+        taxable_income=taxable_income,
+        after_tax_income=after_tax_income,
+        rrsp_contribution=rrsp_contribution,
+        net_federal_tax=net_federal_tax,
+        provincial_tax=provincial_tax,
+        cpp_contribution=cpp_contribution,
+        total_tax_payable=total_tax_payable,
+        avg_tax_rate=avg_tax_rate,
+        marginal_tax_rate=marginal_tax_rate,
+    )
+    return Explanation(result, t.lines)
+
+
+############################################
+# Corporate
+############################################
+def explain_ccpc_tax(rev, revenue, cpp_contributions, deductions, tax_credits):
+    """estimate_ccpc_tax for a CorporateRevenue, with its trace."""
+    cra = rev.cra
+    t = _Trace()
+    t.add("revenue", revenue)
+    t.add("deductions", deductions)
+    taxable_revenue = t.add(
+        "taxable_revenue",
+        rev.calculate_ccpc_taxable_revenue(revenue, deductions),
+        detail="revenue - deductions",
+    )
+    federal_tax_rate = t.add(
+        "federal_tax_rate", cra.get_federal_corporate_tax(is_small_business=True),
+        detail="small business rate",
+    )
+    provincial_tax_rate = t.add(
+        "provincial_tax_rate", cra.get_provincial_corporate_tax(is_small_business=True),
+        detail="small business rate",
+    )
+    net_federal_tax = t.add("net_federal_tax", taxable_revenue * federal_tax_rate)
+    provincial_tax = t.add("provincial_tax", taxable_revenue * provincial_tax_rate)
+    tax_rate = t.add("tax_rate", federal_tax_rate + provincial_tax_rate,
+                     detail="federal + provincial rate")
+    for i, amount in enumerate(cpp_contributions, start=1):
+        t.add(f"cpp_contribution_{i}", amount)
+    cpp_contribution = t.add("cpp_contribution", sum(cpp_contributions),
+                             detail="sum of CPP contributions")
+    total_tax = t.add(
+        "tax_before_credits",
+        (taxable_revenue * tax_rate) + cpp_contribution,
+        detail=f"{_m(taxable_revenue)} × {tax_rate:.2%} + CPP",
+    )
+    t.add("tax_credits", tax_credits)
+    total_tax_payable = t.add(
+        "total_tax_payable",
+        rev.calculate_ccpc_tax_reduction(total_tax, tax_credits),
+        detail="tax before credits - tax credits",
+    )
+    avg_tax_rate = t.add("avg_tax_rate", _divide(total_tax_payable, revenue),
+                         detail="total tax / revenue (NaN/inf for a zero revenue)")
+    after_tax_revenue = t.add("after_tax_revenue", revenue - total_tax_payable)
+    result = CorporateReturn(
+        revenue=revenue,
+        taxable_revenue=taxable_revenue,
+        after_tax_revenue=after_tax_revenue,
+        tax_credits=tax_credits,
+        deductions=deductions,
+        tax_rate=tax_rate,
+        net_federal_tax=net_federal_tax,
+        provincial_tax=provincial_tax,
+        cpp_contribution=cpp_contribution,
+        total_tax_payable=total_tax_payable,
+        avg_tax_rate=avg_tax_rate,
+    )
+    return Explanation(result, t.lines)
+
+
+############################################
+# Batch rows
+############################################
+def _row_value(column, index):
+    """Element index of a batch column; scalars broadcast like in the batch engines."""
+    if hasattr(column, "__len__"):
+        column = column[index]
+    return column.item() if hasattr(column, "item") else column
+
+
+def explain_row(rev, index, **columns):
+    """
+    Explain row `index` of a batch for rev (IndividualRevenue or
+    CorporateRevenue), given the same keyword columns as its batch method
+    (compute_basic_return_batch or estimate_ccpc_tax_batch). Only that row is
+    computed.
+    """
+    row = {name: _row_value(column, index) for name, column in columns.items()}
+    if hasattr(rev, "estimate_ccpc_tax"):
+        cpp = row.pop("cpp_contribution")
+        return explain_ccpc_tax(rev, cpp_contributions=[cpp], **row)
+    row["self_employed"] = bool(row["self_employed"])
+    return explain_basic_return(rev, **row)
@@ -0,0 +1,445 @@
+"""
+Integer-cents fixed-point engine.
+
+Money is an int number of cents and rates are ints scaled by RATE_SCALE
+(parts per million), so every CRA rate in the config is exact. Each line of
+the calculation (a CPP contribution, the tax on a bracket, a credit, ...)
+is rounded to the nearest cent, halves up, before it is carried into the
+next line, the way a return is filled in. Results are therefore exact and
+reproducible to the cent, unlike the float path, which only rounds at the
+end.
+
+Scalar functions take and return Python ints; the *_batch functions take
+and return int64 NumPy arrays and match the scalar functions exactly. A
+batch with an amount beyond SAFE_CENTS, where a cents × rate product could
+overflow int64, is computed on Python ints (object arrays) instead.
+Scalar results are the usual IndividualReturn / CorporateReturn with money
+fields in cents (rates stay floats); batch results are dicts of columns.
+to_dollars() / batch_to_dollars() convert either back to dollar amounts.
+
+The formulas mirror IndividualRevenue.compute_basic_return and
+CorporateRevenue.estimate_ccpc_tax line for line, so the two engines agree
+within the per-line rounding.
+"""
+
+import math
+from bisect import bisect_left
+from dataclasses import fields, replace
+
+import numpy as np
+
+from columnar import CorporateReturnBatch, ReturnBatch
+from data_objects import CorporateReturn, IndividualReturn
+
+RATE_SCALE = 1_000_000
+# Largest amount (in cents, about $11.5 billion) a batch computes in int64:
+# round_div(cents × rate) doubles a product of up to RATE_SCALE × cents, and
+# a credit base can add up several amounts of that size.
+SAFE_CENTS = (2**63 - 1) // (8 * RATE_SCALE)
+# Stands in for the open-ended top bracket ceiling; far above any income in cents
+_NO_CEILING = 2**62
+_INCOME_TAX_CREDIT_RATE = 30_000  # 3% (line 108)
+
+RATE_FIELDS = frozenset({"avg_tax_rate", "marginal_tax_rate", "tax_rate"})
+
+
+############################################
+# Conversions and rounding
+############################################
+def to_cents(dollars):
+    """Dollars (int or float) to int cents, rounding to the nearest cent, halves up."""
+    if isinstance(dollars, int):
+        return dollars * 100
+    # round(.., 6) drops binary representation noise, so 1.005 -> 101 cents
+    return math.floor(round(dollars * 100, 6) + 0.5)
+
+
+def to_cents_array(dollars):
+    """Vectorized to_cents; returns an int64 array."""
+    dollars = np.asarray(dollars)
+    if dollars.dtype.kind in "iub":
+        return dollars.astype(np.int64) * 100
+    return np.floor(np.round(dollars.astype(np.float64) * 100, 6) + 0.5).astype(np.int64)
+
+
+def to_rate(rate):
+    """A config rate as an int scaled by RATE_SCALE; raises ValueError if not exact."""
+    scaled = round(rate * RATE_SCALE)
+    if abs(rate * RATE_SCALE - scaled) > 1e-6:
+        raise ValueError(f"Rate {rate} is not representable in units of 1/{RATE_SCALE}")
+    return scaled
+
+
+def round_div(numerator, denominator):
+    """numerator / denominator rounded to the nearest int, halves up (ints or int64 arrays)."""
+    return (2 * numerator + denominator) // (2 * denominator)
+
+
+def apply_rate(cents, rate):
+    """cents × rate (scaled) rounded to the nearest cent."""
+    return round_div(cents * rate, RATE_SCALE)
+
+
+def to_dollars(tr):
+    """An IndividualReturn / CorporateReturn in cents as the same return in dollars."""
+    return replace(tr, **{
+        f.name: getattr(tr, f.name) / 100
+        for f in fields(tr) if f.name not in RATE_FIELDS
+    })
+
+
+def batch_to_dollars(columns, batch_type=None):
+    """Batch result columns in cents as a ReturnBatch / CorporateReturnBatch in dollars."""
+    if batch_type is None:
+        batch_type = ReturnBatch if "employment_income" in columns else CorporateReturnBatch
+    return batch_type({
+        name: values if name in RATE_FIELDS else values / 100
+        for name, values in columns.items()
+    })
+
+
+def _int_columns(*values):
+    """
+    Broadcast scalars/sequences of cents to equally-shaped 1-D int64 arrays,
+    or to object arrays of Python ints if any amount exceeds SAFE_CENTS.
+    """
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(v, dtype=np.int64))
+                                    for v in values))
+    if any(len(c) and np.abs(c).max() > SAFE_CENTS for c in columns):
+        return [c.astype(object) for c in columns]
+    return columns
+
+
+def _result_columns(columns):
+    """Batch results as int64 cents and float64 rates, whatever dtype they were computed in."""
+    return {
+        name: np.asarray(values, dtype=np.float64 if name in RATE_FIELDS else np.int64)
+        for name, values in columns.items()
+    }
+
+
+def _rate_of(amounts, totals):
+    """amounts / totals as float64; inf or NaN where totals is 0."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.asarray(amounts, dtype=np.float64) / np.asarray(totals, dtype=np.float64)
+
+
+############################################
+# Compiled parameters
+############################################
+class IntegerBrackets:
+    """A BracketTable in cents and scaled rates, with per-bracket rounding."""
+
+    __slots__ = ("floors", "ceilings", "rates", "cumulative", "_arrays")
+
+    def __init__(self, table):
+        self.floors = tuple(to_cents(mn) for mn in table.floors)
+        self.ceilings = tuple(
+            _NO_CEILING if math.isinf(mx) else to_cents(mx) for mx in table.ceilings
+        )
+        self.rates = tuple(to_rate(r) for r in table.rates)
+        cumulative = []
+        total = 0
+        for mn, mx, rate in zip(self.floors, self.ceilings, self.rates):
+            cumulative.append(total)
+            if mx != _NO_CEILING:
+                total += apply_rate(mx - mn, rate)
+        self.cumulative = tuple(cumulative)
+        self._arrays = None
+
+    def _index(self, income):
+        return bisect_left(self.floors, income) - 1
+
+    def tax(self, income):
+        i = self._index(income)
+        if i < 0:
+            return 0
+        return self.cumulative[i] + apply_rate(min(income, self.ceilings[i]) - self.floors[i],
+                                                self.rates[i])
+
+    def marginal_rate(self, income):
+        """Scaled rate of the bracket containing income; LookupError between brackets."""
+        i = self._index(income)
+        if i < 0 or income > self.ceilings[i]:
+            raise LookupError("Income not found in tax brackets")
+        return self.rates[i]
+
+    def arrays(self):
+        if self._arrays is None:
+            self._arrays = tuple(
+                np.asarray(v, dtype=np.int64)
+                for v in (self.floors, self.ceilings, self.rates, self.cumulative)
+            )
+        return self._arrays
+
+    def tax_array(self, incomes):
+        floors, ceilings, rates, cumulative = self.arrays()
+        i = np.searchsorted(floors, incomes, side="left") - 1
+        found = i >= 0
+        j = np.maximum(i, 0)
+        tax = cumulative[j] + apply_rate(np.minimum(incomes, ceilings[j]) - floors[j], rates[j])
+        return np.where(found, tax, 0)
+
+    def marginal_rate_array(self, incomes):
+        """Scaled rates as float64; NaN where income falls outside every bracket."""
+        floors, ceilings, rates, _ = self.arrays()
+        i = np.searchsorted(floors, incomes, side="left") - 1
+        j = np.maximum(i, 0)
+        found = (i >= 0) & (incomes <= ceilings[j])
+        return np.where(found, rates[j], np.nan)
+
+
+class FixedPointParams:
+    """The CRA parameters of one tax year in cents and scaled rates."""
+
+    def __init__(self, cra):
+        self.federal = IntegerBrackets(cra.get_federal_bracket_table())
+        self.provincial = IntegerBrackets(cra.get_provincial_bracket_table())
+        self.ympe = to_cents(cra.get_ympe())
+        self.cpp_exemption = to_cents(cra.get_cpp_basic_annual_exemption())
+        self.cpp_rate = to_rate(cra.get_cpp_rate())
+        self.canada_employment_amount_max = to_cents(cra.get_canada_employment_amount_max())
+        bpa = cra.get_bpa()
+        self.bpa_min = to_cents(bpa.min)
+        self.bpa_additional = to_cents(bpa.max) - self.bpa_min
+        # additional BPA phases out between the 4th and 5th federal bracket floors
+        self.bpa_threshold = self.federal.floors[3]
+        self.bpa_phase_out_range = self.federal.floors[4] - self.federal.floors[3]
+        self.provincial_bpa_credit = apply_rate(to_cents(cra.get_provincial_bpa()),
+                                                self.provincial.rates[0])
+        self.basic_income_tax_credit = to_cents(cra.basic_income_tax_credit)
+        self.fed_credit_rate = to_rate(cra.fed_non_refundable_tax_credit_rate)
+        floor, pct_of_income = cra.get_medical_expense_threshold_params()
+        self.medical_floor = to_cents(floor)
+        self.medical_pct = to_rate(pct_of_income)
+        self.federal_corporate_rate = to_rate(cra.get_federal_corporate_tax(is_small_business=True))
+        self.provincial_corporate_rate = to_rate(
+            cra.get_provincial_corporate_tax(is_small_business=True)
+        )
+
+
+# (year, config version) -> FixedPointParams
+_PARAMS = {}
+
+
+def params(cra):
+    key = (cra.year, cra.config_version)
+    p = _PARAMS.get(key)
+    if p is None:
+        p = _PARAMS[key] = FixedPointParams(cra)
+    return p
+
+
+############################################
+# Individual
+############################################
+def _income_tax(p, taxable_income, cpp, canada_employment_amount, ei_benefits, medical_expenses):
+    """(net federal tax, provincial tax) in cents, after non-refundable credits."""
+    basic_federal_tax = p.federal.tax(taxable_income)
+    provincial_tax = max(0, p.provincial.tax(taxable_income) - p.provincial_bpa_credit)
+
+    # Non-refundable tax credits (line 35000)
+    additional_bpa = p.bpa_additional
+    if taxable_income > p.bpa_threshold:
+        additional_bpa -= round_div((taxable_income - p.bpa_threshold) * p.bpa_additional,
+                                    p.bpa_phase_out_range)
+    income_tax_credit = min(apply_rate(taxable_income, _INCOME_TAX_CREDIT_RATE),
+                            p.basic_income_tax_credit)
+    medical_threshold = min(p.medical_floor, apply_rate(taxable_income, p.medical_pct))
+    eligible_medical = max(0, medical_expenses - medical_threshold)
+    credit_base = (p.bpa_min + additional_bpa + cpp + canada_employment_amount + ei_benefits
+                   + income_tax_credit + eligible_medical)
+    tax_credits = apply_rate(credit_base, p.fed_credit_rate)
+    return max(0, basic_federal_tax - tax_credits), provincial_tax
+
+
+def _cpp(p, employment_income, self_employed):
+    cpp = apply_rate(min(p.ympe, employment_income) - p.cpp_exemption, p.cpp_rate)
+    return cpp * 2 if self_employed else cpp
+
+
+def compute_basic_return_cents(
+    rev,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """IndividualRevenue.compute_basic_return in cents for an IndividualRevenue `rev`."""
+    p = params(rev.cra)
+    cpp = _cpp(p, employment_income, self_employed)
+    canada_employment_amount = min(p.canada_employment_amount_max, employment_income)
+    total_income = employment_income + ucc_benefit + ei_benefits + investment_income
+    taxable_income = total_income - rrsp_contribution
+
+    net_federal_tax, provincial_tax = _income_tax(
+        p, taxable_income, cpp, canada_employment_amount, ei_benefits, medical_expenses
+    )
+    marginal_tax_rate = (
+        p.federal.marginal_rate(taxable_income) + p.provincial.marginal_rate(taxable_income)
+    ) / RATE_SCALE
+    total_tax_payable = net_federal_tax + provincial_tax
+    return IndividualReturn(
+        employment_income=employment_income,
+        total_income=total_income,
+        taxable_income=taxable_income,
+        after_tax_income=employment_income - total_tax_payable,
+        rrsp_contribution=rrsp_contribution,
+        net_federal_tax=net_federal_tax,
+        provincial_tax=provincial_tax,
+        cpp_contribution=cpp,
+        total_tax_payable=total_tax_payable,
+        avg_tax_rate=total_tax_payable / employment_income,
+        marginal_tax_rate=marginal_tax_rate,
+    )
+
+
+def compute_basic_return_cents_batch(
+    rev,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """
+    Vectorized compute_basic_return_cents over int64 cent columns (scalars
+    broadcast). Returns a dict of columns: int64 cents, float64 rates. Rows the
+    scalar function raises for get a NaN/inf rate instead.
+    """
+    p = params(rev.cra)
+    (
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+    ) = _int_columns(
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+    )
+    self_employed = np.broadcast_to(np.asarray(self_employed, dtype=bool), employment_income.shape)
+    cpp = apply_rate(np.minimum(p.ympe, employment_income) - p.cpp_exemption, p.cpp_rate)
+    cpp = np.where(self_employed, cpp * 2, cpp)
+    canada_employment_amount = np.minimum(p.canada_employment_amount_max, employment_income)
+    total_income = employment_income + ucc_benefit + ei_benefits + investment_income
+    taxable_income = total_income - rrsp_contribution
+
+    basic_federal_tax = p.federal.tax_array(taxable_income)
+    provincial_tax = np.maximum(0, p.provincial.tax_array(taxable_income) - p.provincial_bpa_credit)
+    marginal_tax_rate = (
+        p.federal.marginal_rate_array(taxable_income)
+        + p.provincial.marginal_rate_array(taxable_income)
+    ) / RATE_SCALE
+
+    additional_bpa = np.where(
+        taxable_income > p.bpa_threshold,
+        p.bpa_additional - round_div((taxable_income - p.bpa_threshold) * p.bpa_additional,
+                                     p.bpa_phase_out_range),
+        p.bpa_additional,
+    )
+    income_tax_credit = np.minimum(apply_rate(taxable_income, _INCOME_TAX_CREDIT_RATE),
+                                   p.basic_income_tax_credit)
+    medical_threshold = np.minimum(p.medical_floor, apply_rate(taxable_income, p.medical_pct))
+    eligible_medical = np.maximum(0, medical_expenses - medical_threshold)
+    credit_base = (p.bpa_min + additional_bpa + cpp + canada_employment_amount + ei_benefits
+                   + income_tax_credit + eligible_medical)
+    tax_credits = apply_rate(credit_base, p.fed_credit_rate)
+
+    net_federal_tax = np.maximum(0, basic_federal_tax - tax_credits)
+    total_tax_payable = net_federal_tax + provincial_tax
+    return _result_columns({
+        "employment_income": employment_income,
+        "total_income": total_income,
+        "taxable_income": taxable_income,
+        "after_tax_income": employment_income - total_tax_payable,
+        "rrsp_contribution": rrsp_contribution,
+        "net_federal_tax": net_federal_tax,
+        "provincial_tax": provincial_tax,
+        "cpp_contribution": cpp,
+        "total_tax_payable": total_tax_payable,
+        "avg_tax_rate": _rate_of(total_tax_payable, employment_income),
+        "marginal_tax_rate": marginal_tax_rate,
+    })
+
+
+def payroll_remittance_cents(rev, gross, ei_rate, ei_max_insurable):
+    """
+    Federal + provincial tax + CPP + EI in cents on employment income `gross`
+    (cents) only. ei_rate is scaled by RATE_SCALE; ei_max_insurable is in cents.
+    """
+    p = params(rev.cra)
+    cpp = _cpp(p, gross, False)
+    net_federal_tax, provincial_tax = _income_tax(
+        p, gross, cpp, min(p.canada_employment_amount_max, gross), 0, 0
+    )
+    ei = apply_rate(min(gross, ei_max_insurable), ei_rate)
+    return net_federal_tax + provincial_tax + cpp + ei
+
+
+############################################
+# Corporate
+############################################
+def estimate_ccpc_tax_cents(rev, revenue, cpp_contributions, deductions, tax_credits):
+    """
+    CorporateRevenue.estimate_ccpc_tax in cents for a CorporateRevenue `rev`.
+    Federal and provincial tax are rounded separately and the total is their sum.
+    """
+    p = params(rev.cra)
+    taxable_revenue = revenue - deductions
+    net_federal_tax = apply_rate(taxable_revenue, p.federal_corporate_rate)
+    provincial_tax = apply_rate(taxable_revenue, p.provincial_corporate_rate)
+    cpp_contribution = sum(cpp_contributions)
+    total_tax_payable = net_federal_tax + provincial_tax + cpp_contribution - tax_credits
+    return CorporateReturn(
+        revenue=revenue,
+        taxable_revenue=taxable_revenue,
+        after_tax_revenue=revenue - total_tax_payable,
+        tax_credits=tax_credits,
+        deductions=deductions,
+        tax_rate=(p.federal_corporate_rate + p.provincial_corporate_rate) / RATE_SCALE,
+        net_federal_tax=net_federal_tax,
+        provincial_tax=provincial_tax,
+        cpp_contribution=cpp_contribution,
+        total_tax_payable=total_tax_payable,
+        avg_tax_rate=total_tax_payable / revenue,
+    )
+
+
+def estimate_ccpc_tax_cents_batch(rev, revenue, cpp_contribution, deductions, tax_credits):
+    """
+    Vectorized estimate_ccpc_tax_cents; cpp_contribution is the summed CPP per
+    row. Returns a dict of columns: int64 cents, float64 rates.
+    """
+    p = params(rev.cra)
+    revenue, cpp_contribution, deductions, tax_credits = _int_columns(
+        revenue, cpp_contribution, deductions, tax_credits
+    )
+    taxable_revenue = revenue - deductions
+    net_federal_tax = apply_rate(taxable_revenue, p.federal_corporate_rate)
+    provincial_tax = apply_rate(taxable_revenue, p.provincial_corporate_rate)
+    total_tax_payable = net_federal_tax + provincial_tax + cpp_contribution - tax_credits
+    return _result_columns({
+        "revenue": revenue,
+        "taxable_revenue": taxable_revenue,
+        "after_tax_revenue": revenue - total_tax_payable,
+        "tax_credits": tax_credits,
+        "deductions": deductions,
+        "tax_rate": np.full(revenue.shape,
+                            (p.federal_corporate_rate + p.provincial_corporate_rate) / RATE_SCALE),
+        "net_federal_tax": net_federal_tax,
+        "provincial_tax": provincial_tax,
+        "cpp_contribution": cpp_contribution,
+        "total_tax_payable": total_tax_payable,
+        "avg_tax_rate": _rate_of(total_tax_payable, revenue),
+    })
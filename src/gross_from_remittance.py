@@ -5,7 +5,8 @@ Payroll remittance = federal income tax + provincial income tax (Ontario)
                     + CPP employee contribution + EI employee premium.
 
 Assumes employment income only (no RRSP, other income, or deductions).
-Uses binary search to invert the remittance function.
+Remittance is piecewise linear in gross, so it is inverted exactly from a
+per-year breakpoint table; binary search is only the fallback for flat segments.
 """
 
 import argparse
@@ -15,7 +16,9 @@ from pathlib import Path
 # Allow running as script when invoked from project root or src
 sys.path.insert(0, str(Path(__file__).resolve().parent))
 
+from cra import config_version
 from individual import IndividualRevenue
+from piecewise import fit
 
 
 # EI: rate per $100 of insurable earnings; max insurable earnings (annual)
@@ -37,23 +40,88 @@ def _ei_contribution(employment_income: float, year: int) -> float:
     return insurable * rate
 
 
+# Return fields remitted at source besides EI
+_REMITTED_FIELDS = ("net_federal_tax", "provincial_tax", "cpp_contribution")
+
+# (year, config version) -> PiecewiseLinear remittance-vs-gross table
+_REMITTANCE_TABLES = {}
+
+
 def total_payroll_remittance(gross: float, year: int) -> float:
     """
     Total payroll tax remitted to CRA for the given gross employment income and year.
     Equals federal tax + provincial tax + CPP + EI.
     """
-    rev = IndividualRevenue(year)
-    tr = rev.compute_basic_return(
-        employment_income=gross,
-        ucc_benefit=0.0,
-        ei_benefits=0.0,
-        investment_income=0.0,
-        rrsp_contribution=0.0,
-        medical_expenses=0.0,
-        self_employed=False,
+    return _payroll_remittance(IndividualRevenue(year), gross)
+
+
+def total_payroll_remittance_cents(gross_cents: int, year: int) -> int:
+    """
+    total_payroll_remittance on the integer-cents engine: gross and the result
+    are int cents, rounded to the cent at every line (see fixed_point).
+    """
+    from fixed_point import payroll_remittance_cents, to_cents, to_rate
+
+    if year not in _EI_BY_YEAR:
+        raise ValueError(f"EI not configured for year {year}. Supported: {list(_EI_BY_YEAR)}")
+    cfg = _EI_BY_YEAR[year]
+    return payroll_remittance_cents(
+        IndividualRevenue(year),
+        gross_cents,
+        to_rate(cfg["rate_per_100"] / 100.0),
+        to_cents(cfg["max_insurable"]),
     )
-    ei = _ei_contribution(gross, year)
-    return tr.net_federal_tax + tr.provincial_tax + tr.cpp_contribution + ei
+
+
+def _payroll_remittance(rev: IndividualRevenue, gross: float) -> float:
+    """
+    Remittance through the return projection (see projection), which skips the
+    marginal and average rates: they raise for a zero gross or an income that
+    falls between two brackets.
+    """
+    tr = rev.compute_basic_return_fields(_REMITTED_FIELDS, gross, 0.0, 0.0, 0.0, 0.0, 0.0, False)
+    ei = _ei_contribution(gross, rev.year)
+    return tr["net_federal_tax"] + tr["provincial_tax"] + tr["cpp_contribution"] + ei
+
+
+def remittance_breakpoints(rev: IndividualRevenue, high: float) -> list[float]:
+    """
+    Gross incomes where the remittance function can change slope: bracket floors
+    and ceilings, YMPE, EI max insurable earnings, BPA phase-out bounds and the
+    Canada employment amount / income tax credit caps. Kinks from the zero
+    floors on federal and provincial tax are located when the table is fitted.
+    """
+    cra = rev.cra
+    fed = cra.get_federal_bracket_table()
+    prov = cra.get_provincial_bracket_table()
+    points = [0.0, high]
+    points += fed.floors + fed.ceilings + prov.floors + prov.ceilings
+    points += [
+        rev.ympe,
+        _EI_BY_YEAR[rev.year]["max_insurable"],
+        fed[3][0],
+        fed[4][0],
+        cra.get_canada_employment_amount_max(),
+        cra.basic_income_tax_credit / 0.03,
+    ]
+    return [x for x in points if 0.0 <= x <= high]
+
+
+def remittance_table(year: int, high: float = 1_000_000.0):
+    """
+    PiecewiseLinear table of total payroll remittance as a function of gross
+    for the year, cached per config version. Beyond `high` the top segment is
+    extended linearly.
+    """
+    if year not in _EI_BY_YEAR:
+        raise ValueError(f"EI not configured for year {year}. Supported: {list(_EI_BY_YEAR)}")
+    key = (year, config_version(), high)
+    table = _REMITTANCE_TABLES.get(key)
+    if table is None:
+        rev = IndividualRevenue(year)
+        table = fit(lambda g: _payroll_remittance(rev, g), remittance_breakpoints(rev, high))
+        _REMITTANCE_TABLES[key] = table
+    return table
 
 
 def gross_from_remittance(
@@ -66,19 +134,39 @@ def gross_from_remittance(
     max_iter: int = 100,
 ) -> float:
     """
-    Estimate gross employment income that yields the given total payroll remittance.
+    Gross employment income that yields the given total payroll remittance.
 
-    Uses binary search. Assumes remittance is increasing in gross (no RRSP/other inputs).
+    Solves the linear segment of the year's remittance table that contains the
+    target; the table covers every gross (its top segment extends past its last
+    knot), so the exact answer is not limited to any range. low, high, tol and
+    max_iter apply only to the binary search fallback, used when the target lies
+    on a flat segment: it searches between `low` and `high` to within `tol`.
     """
     if total_remitted <= 0:
         return 0.0
 
+    gross = remittance_table(year).inverse(total_remitted)
+    if gross is not None:
+        return round(gross, 2)
+    return _bisect_gross(total_remitted, year, low=low, high=high, tol=tol, max_iter=max_iter)
+
+
+def _bisect_gross(
+    total_remitted: float,
+    year: int,
+    *,
+    low: float,
+    high: float,
+    tol: float,
+    max_iter: int,
+) -> float:
+    """Binary search for gross; assumes remittance is increasing in gross."""
     rev = IndividualRevenue(year)
     for _ in range(max_iter):
         mid = (low + high) / 2.0
         if mid <= 0:
             return 0.0
-        rem = total_payroll_remittance(mid, year)
+        rem = _payroll_remittance(rev, mid)
         if abs(rem - total_remitted) <= tol:
             return round(mid, 2)
         if rem < total_remitted:
@@ -1,3 +1,4 @@
+from brackets import BracketTable
 from cra import CRA
 from data_objects import IndividualReturn
 
@@ -30,8 +31,8 @@ class IndividualRevenue:
         canada_employment_amount = self.cra.get_canada_employment_amount(
             employment_income
         )
-        federal_tax_brackets = self.cra.get_federal_tax_brackets()
-        provincial_tax_brackets = self.cra.get_provincial_tax_brackets()
+        federal_tax_brackets = self.cra.get_federal_bracket_table()
+        provincial_tax_brackets = self.cra.get_provincial_bracket_table()
         # ----------------------------------------------------------------------
         # Compute income
         total_income = self.calculate_total_income(
@@ -82,6 +83,206 @@ class IndividualRevenue:
             marginal_tax_rate=marginal_tax_rate,
         )
 
+    def compute_basic_return_batch(
+        self,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """
+        Vectorized compute_basic_return over column arrays (scalars broadcast).
+        Returns a columnar ReturnBatch.
+        """
+        from batch import compute_basic_return_batch
+
+        return compute_basic_return_batch(
+            self,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
+    def compute_basic_return_fields(
+        self,
+        fields,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """
+        Only the named return fields (e.g. ("total_tax_payable",)) as a dict,
+        computing just the stages that feed them (see projection).
+        """
+        from projection import compute_basic_return_fields
+
+        return compute_basic_return_fields(
+            self,
+            fields,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
+    def compute_basic_return_fields_batch(
+        self,
+        fields,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """Vectorized compute_basic_return_fields: a dict of float64 columns."""
+        from projection import compute_basic_return_fields_batch
+
+        return compute_basic_return_fields_batch(
+            self,
+            fields,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
+    def explain_basic_return(
+        self,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """
+        compute_basic_return with a line-by-line trace: an Explanation whose
+        result is the IndividualReturn and whose lines hold every intermediate
+        value (see explain). compute_basic_return itself records nothing.
+        """
+        from explain import explain_basic_return
+
+        return explain_basic_return(
+            self,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
+    def compile_return(
+        self,
+        variable="employment_income",
+        *,
+        employment_income=0.0,
+        ucc_benefit=0.0,
+        ei_benefits=0.0,
+        investment_income=0.0,
+        rrsp_contribution=0.0,
+        medical_expenses=0.0,
+        self_employed=False,
+        low=0.0,
+        high=None,
+    ):
+        """
+        Compile compute_basic_return, with every input but `variable`
+        ("employment_income" or "rrsp_contribution") fixed, into a
+        CompiledReturn: total tax, after-tax income and marginal rate as
+        piecewise-linear functions evaluated with one bisect (see compiled_return).
+        """
+        from compiled_return import compile_return
+
+        return compile_return(
+            self,
+            variable,
+            employment_income=employment_income,
+            ucc_benefit=ucc_benefit,
+            ei_benefits=ei_benefits,
+            investment_income=investment_income,
+            rrsp_contribution=rrsp_contribution,
+            medical_expenses=medical_expenses,
+            self_employed=self_employed,
+            low=low,
+            high=high,
+        )
+
+    def compute_basic_return_cents(
+        self,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """
+        compute_basic_return on the integer-cents engine: amounts in and out are
+        int cents, rounded to the cent at every line (see fixed_point).
+        """
+        from fixed_point import compute_basic_return_cents
+
+        return compute_basic_return_cents(
+            self,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
+    def compute_basic_return_cents_batch(
+        self,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        """
+        Vectorized compute_basic_return_cents over int64 cent columns. Returns a
+        dict of columns (int64 cents, float64 rates).
+        """
+        from fixed_point import compute_basic_return_cents_batch
+
+        return compute_basic_return_cents_batch(
+            self,
+            employment_income,
+            ucc_benefit,
+            ei_benefits,
+            investment_income,
+            rrsp_contribution,
+            medical_expenses,
+            self_employed,
+        )
+
     def print_return_summary(self, tr: IndividualReturn):
         print("-" * 40)
         print(f"Income & Deductions")
@@ -188,6 +389,8 @@ class IndividualRevenue:
         return taxes
 
     def compute_tax(self, income, brackets):
+        if isinstance(brackets, BracketTable):
+            return brackets.tax(income)
         return sum(self._compute_bracket_taxes(income, brackets))
 
     def compute_federal_tax(self, income, fed_brackets):
@@ -207,6 +410,8 @@ class IndividualRevenue:
         return max(0.0, gross - credit)
 
     def get_marginal_tax_rate(self, income, brackets):
+        if isinstance(brackets, BracketTable):
+            return brackets.marginal_rate(income)
         for mn, mx, rate in brackets:
             if mn < income <= mx:
                 return rate
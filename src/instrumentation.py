@@ -0,0 +1,110 @@
+"""
+Opt-in per-stage timing for IndividualRevenue.compute_basic_return.
+
+enable() swaps each stage method (CPP, employment amount, bracket fetch,
+federal/provincial tax, marginal rate, non-refundable credits, net federal tax)
+plus CRA construction and config loading for a thin timing wrapper; disable()
+removes the wrappers. Nothing is wrapped while disabled, so the normal path
+pays no overhead at all. The timers are a patching layer, so they combine
+with memo's cache in either order.
+
+    import instrumentation
+    with instrumentation.instrumented():
+        rev.compute_basic_return(...)
+    print(instrumentation.to_json())
+"""
+
+import json
+from contextlib import contextmanager
+from functools import partial, wraps
+from time import perf_counter
+
+import patching
+from cra import CRA, ConfigRegistry, get_config_registry
+from individual import IndividualRevenue
+
+# stage name -> methods timed under it
+STAGES = {
+    "compute_basic_return": [(IndividualRevenue, "compute_basic_return")],
+    "cpp": [(IndividualRevenue, "calculate_cpp")],
+    "employment_amount": [(CRA, "get_canada_employment_amount")],
+    "bracket_fetch": [
+        (CRA, "get_federal_bracket_table"),
+        (CRA, "get_provincial_bracket_table"),
+    ],
+    "federal_tax": [(IndividualRevenue, "compute_federal_tax")],
+    "provincial_tax": [(IndividualRevenue, "compute_provincial_tax")],
+    "marginal_rate": [(IndividualRevenue, "_compute_margin_tax_rate")],
+    "non_refundable_credits": [(IndividualRevenue, "compute_non_refundable_tax_credits")],
+    "net_federal_tax": [(IndividualRevenue, "compute_net_federal_tax")],
+    "cra_construct": [(CRA, "__init__")],
+    "config_load": [(ConfigRegistry, "_refresh")],
+}
+
+# stage -> [calls, cumulative seconds]
+_stats = {stage: [0, 0.0] for stage in STAGES}
+
+
+def _timed(stage, fn):
+    stat = _stats[stage]
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            stat[0] += 1
+            stat[1] += perf_counter() - start
+
+    return wrapper
+
+
+def is_enabled():
+    return patching.is_installed(__name__)
+
+
+def enable():
+    """Start timing every stage. Counters keep accumulating until reset()."""
+    for stage, methods in STAGES.items():
+        for cls, name in methods:
+            patching.install(__name__, cls, name, partial(_timed, stage))
+
+
+def disable():
+    """Remove the timing wrappers."""
+    patching.uninstall(__name__)
+
+
+def reset():
+    for stat in _stats.values():
+        stat[0] = 0
+        stat[1] = 0.0
+
+
+@contextmanager
+def instrumented(reset_counters=True):
+    """Enable timing for the duration of a with-block."""
+    if reset_counters:
+        reset()
+    enable()
+    try:
+        yield
+    finally:
+        disable()
+
+
+def report():
+    """Per-stage call counts and cumulative/mean time, plus config registry counters."""
+    stages = {}
+    for stage, (calls, seconds) in _stats.items():
+        stages[stage] = {
+            "calls": calls,
+            "total_seconds": seconds,
+            "mean_us": seconds / calls * 1e6 if calls else 0.0,
+        }
+    return {"stages": stages, "config_registry": get_config_registry().stats()}
+
+
+def to_json(indent=2):
+    return json.dumps(report(), indent=indent)
@@ -0,0 +1,170 @@
+"""
+Opt-in LRU memoization of individual and corporate returns.
+
+enable() puts a bounded LRU cache in front of
+IndividualRevenue.compute_basic_return and CorporateRevenue.estimate_ccpc_tax;
+disable() restores the original methods. Entries are keyed on the tax year, the
+CRA config version hash and the normalized inputs, so a repeated row costs a
+dictionary lookup and a config change can never serve a stale return. Returns
+are frozen dataclasses and are shared between hits.
+
+The cache is a patching layer, like instrumentation's timers, so the two can
+be enabled and disabled in any order.
+"""
+
+from collections import OrderedDict
+from functools import wraps
+
+import patching
+from corporate import CorporateRevenue
+from individual import IndividualRevenue
+
+DEFAULT_MAXSIZE = 100_000
+
+
+class LRUCache:
+    """Bounded mapping that evicts the least recently used entry."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Cached value for key, or None on a miss."""
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+individual_cache = LRUCache()
+corporate_cache = LRUCache()
+
+
+def _memoize_individual(fn):
+    @wraps(fn)
+    def compute_basic_return(
+        self,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    ):
+        key = (
+            self.year,
+            self.cra.config_version,
+            float(employment_income),
+            float(ucc_benefit),
+            float(ei_benefits),
+            float(investment_income),
+            float(rrsp_contribution),
+            float(medical_expenses),
+            bool(self_employed),
+        )
+        tr = individual_cache.get(key)
+        if tr is None:
+            tr = fn(
+                self,
+                employment_income,
+                ucc_benefit,
+                ei_benefits,
+                investment_income,
+                rrsp_contribution,
+                medical_expenses,
+                self_employed,
+            )
+            individual_cache.put(key, tr)
+        return tr
+
+    return compute_basic_return
+
+
+def _memoize_corporate(fn):
+    @wraps(fn)
+    def estimate_ccpc_tax(self, revenue, cpp_contributions, deductions, tax_credits):
+        key = (
+            self.year,
+            self.cra.config_version,
+            float(revenue),
+            tuple(float(c) for c in cpp_contributions),
+            float(deductions),
+            float(tax_credits),
+        )
+        tr = corporate_cache.get(key)
+        if tr is None:
+            tr = fn(self, revenue, cpp_contributions, deductions, tax_credits)
+            corporate_cache.put(key, tr)
+        return tr
+
+    return estimate_ccpc_tax
+
+
+_TARGETS = {
+    (IndividualRevenue, "compute_basic_return"): _memoize_individual,
+    (CorporateRevenue, "estimate_ccpc_tax"): _memoize_corporate,
+}
+
+
+def is_enabled():
+    return patching.is_installed(__name__)
+
+
+def enable(maxsize=DEFAULT_MAXSIZE):
+    """Start memoizing; changing maxsize clears the caches."""
+    for cache in (individual_cache, corporate_cache):
+        if cache.maxsize != maxsize:
+            cache.clear()
+            cache.maxsize = maxsize
+    for (cls, name), memoize in _TARGETS.items():
+        patching.install(__name__, cls, name, memoize)
+
+
+def disable(clear=True):
+    """Remove the caches from the methods (and by default drop cached returns)."""
+    patching.uninstall(__name__)
+    if clear:
+        individual_cache.clear()
+        corporate_cache.clear()
+
+
+def stats():
+    return {
+        "individual": individual_cache.stats(),
+        "corporate": corporate_cache.stats(),
+    }
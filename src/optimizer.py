@@ -0,0 +1,238 @@
+"""
+Salary / RRSP split optimizer for the owner-manager scenario in taxcalc.py.
+
+CCPC revenue pays a salary to the primary earner and to the spouse (who also
+receives the UCCB); what is left is taxed in the corporation, which also pays
+both CPP contributions. Every household total is a per-person term plus a
+constant, so each person's (salary, RRSP) candidates are evaluated on their
+own with the vectorized batch engine and only then combined pairwise.
+
+Candidates are pruned twice before combining:
+- salaries are a coarse grid plus the exact points where a person's tax
+  changes slope, since a piecewise-linear objective peaks at its kinks: the
+  known breakpoints (bracket floors shifted by UCCB and RRSP, YMPE, BPA
+  phase-out bounds, credit caps) plus the kinks where federal and provincial
+  tax are clamped at zero, located by fitting the tax with piecewise.fit;
+- candidates beaten on objective, disbursement and salary by another
+  candidate of the same person are dropped.
+"""
+
+import argparse
+
+import numpy as np
+
+from corporate import CorporateRevenue
+from data_objects import HouseholdSplit
+from individual import IndividualRevenue
+from piecewise import fit
+
+OBJECTIVES = ("total_tax", "after_tax")
+
+
+def grid_axis(bounds, step):
+    """Grid over [lo, hi] step apart, inclusive of both ends (just the ends if step is 0)."""
+    lo, hi = bounds
+    if hi < lo:
+        raise ValueError(f"Invalid range {bounds}: upper bound is below lower bound")
+    if hi == lo or not step:
+        return np.unique(np.array([lo, hi], dtype=np.float64))
+    return np.unique(np.append(np.arange(lo, hi, step, dtype=np.float64), hi))
+
+
+def salary_breakpoints(rev: IndividualRevenue, yearly_uccb=0.0, rrsp=0.0):
+    """Salaries at which the individual's tax can change slope for a given UCCB and RRSP."""
+    cra = rev.cra
+    fed = cra.get_federal_bracket_table()
+    prov = cra.get_provincial_bracket_table()
+    taxable_points = [
+        x for x in fed.floors + fed.ceilings + prov.floors + prov.ceilings if x != float("inf")
+    ]
+    taxable_points.append(cra.basic_income_tax_credit / 0.03)
+    salaries = [t - yearly_uccb + rrsp for t in taxable_points]
+    salaries += [rev.ympe, cra.get_canada_employment_amount_max()]
+    return np.asarray(salaries, dtype=np.float64)
+
+
+def salary_kinks(rev: IndividualRevenue, salary_bounds, yearly_uccb=0.0, rrsp=0.0):
+    """
+    Every salary in salary_bounds at which the individual's tax changes slope:
+    salary_breakpoints plus the zero-clamp kinks of federal and provincial tax,
+    from a piecewise-linear fit of total tax payable against salary.
+    """
+    lo, hi = salary_bounds
+    bps = salary_breakpoints(rev, yearly_uccb, rrsp)
+    bps = np.append(bps[(bps > lo) & (bps < hi)], (lo, hi))
+    if hi == lo:
+        return np.unique(bps)
+
+    def tax(salary):
+        return rev.compute_basic_return_fields(
+            ("total_tax_payable",), salary, yearly_uccb, 0.0, 0.0, rrsp, 0.0, False
+        )["total_tax_payable"]
+
+    return np.asarray(fit(tax, bps.tolist()).xs, dtype=np.float64)
+
+
+def _candidates(rev, salary_bounds, rrsp_values, salary_step, yearly_uccb):
+    """(salary, rrsp) candidate pairs: salary grid plus kinks, for every RRSP value."""
+    grid = grid_axis(salary_bounds, salary_step)
+    salaries, rrsps = [], []
+    for rrsp in rrsp_values:
+        s = np.union1d(grid, salary_kinks(rev, salary_bounds, yearly_uccb, rrsp))
+        salaries.append(s)
+        rrsps.append(np.full(s.shape, rrsp))
+    return np.concatenate(salaries), np.concatenate(rrsps)
+
+
+def _pareto(objective, disbursement, salary, block=1024):
+    """Indices of candidates not dominated on (objective, disbursement, salary)."""
+    order = np.lexsort((salary, disbursement, objective))
+    d, s = disbursement[order], salary[order]
+    index = np.arange(len(order))
+    dominated = np.zeros(len(order), dtype=bool)
+    # In objective order a candidate is dominated when an earlier one is no
+    # worse on disbursement and salary; compare a block of rows at a time.
+    for lo in range(0, len(order), block):
+        hi = min(lo + block, len(order))
+        rows = slice(lo, hi)
+        dominated[rows] = (
+            (index[None, :hi] < index[rows, None])
+            & (d[None, :hi] <= d[rows, None])
+            & (s[None, :hi] <= s[rows, None])
+        ).any(axis=1)
+    return order[~dominated]
+
+
+def optimize_household_split(
+    year,
+    revenue,
+    *,
+    primary_salary,
+    spouse_salary,
+    primary_rrsp=(0.0, 0.0),
+    spouse_rrsp=(0.0, 0.0),
+    yearly_uccb=0.0,
+    salary_step=1000.0,
+    rrsp_step=1000.0,
+    objective="total_tax",
+    mrr=None,
+    months=12,
+) -> HouseholdSplit:
+    """
+    Best split of CCPC revenue between two salaries and RRSP contributions.
+
+    Salary and RRSP arguments are (low, high) bounds. objective is "total_tax"
+    (minimize personal + corporate tax, which also maximizes total after-tax
+    income including the corporation) or "after_tax" (maximize the couple's
+    after-tax income). If mrr is given, the monthly disbursement (after-tax
+    income + tax + RRSP, over `months`) must not exceed it. Salaries never
+    exceed revenue in total. Raises ValueError if no candidate is feasible.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}. Must be one of {OBJECTIVES}")
+    rev = IndividualRevenue(year)
+    corp = CorporateRevenue(year)
+    corp_rate = corp.cra.get_federal_corporate_tax() + corp.cra.get_provincial_corporate_tax()
+
+    people = []
+    for salary_bounds, rrsp_bounds, uccb in (
+        (primary_salary, primary_rrsp, 0.0),
+        (spouse_salary, spouse_rrsp, yearly_uccb),
+    ):
+        salary, rrsp = _candidates(
+            rev, salary_bounds, grid_axis(rrsp_bounds, rrsp_step), salary_step, uccb
+        )
+        affordable = salary <= revenue
+        salary, rrsp = salary[affordable], rrsp[affordable]
+        tr = rev.compute_basic_return_batch(salary, uccb, 0.0, 0.0, rrsp, 0.0, False)
+        tax, cpp = tr["total_tax_payable"], tr["cpp_contribution"]
+        # Per-person share of the corporate tax: CPP paid less tax saved on the salary
+        corp_share = cpp - salary * corp_rate
+        if objective == "total_tax":
+            score = tax + corp_share
+        else:
+            score = tax - salary
+        disbursement = salary + rrsp + corp_share
+        keep = _pareto(score, disbursement, salary)
+        people.append((salary[keep], rrsp[keep], tax[keep], cpp[keep], score[keep], disbursement[keep]))
+
+    (sa, ra, ta, ca, ha, da), (sb, rb, tb, cb, hb, db) = people
+    score = ha[:, None] + hb[None, :]
+    feasible = sa[:, None] + sb[None, :] <= revenue
+    if mrr is not None:
+        monthly = (da[:, None] + db[None, :] + revenue * corp_rate) / months
+        feasible &= monthly <= mrr
+    if not feasible.any():
+        raise ValueError("No salary/RRSP split satisfies the constraints")
+    i, j = np.unravel_index(np.argmin(np.where(feasible, score, np.inf)), score.shape)
+
+    corp_tax = (revenue - sa[i] - sb[j]) * corp_rate + ca[i] + cb[j]
+    total_tax = ta[i] + tb[j] + corp_tax
+    household_after_tax = (sa[i] - ta[i]) + (sb[j] - tb[j])
+    return HouseholdSplit(
+        primary_salary=float(sa[i]),
+        spouse_salary=float(sb[j]),
+        primary_rrsp=float(ra[i]),
+        spouse_rrsp=float(rb[j]),
+        total_tax=float(total_tax),
+        household_after_tax=float(household_after_tax),
+        total_after_tax=float(household_after_tax + (revenue - sa[i] - sb[j]) - corp_tax),
+        monthly_disbursement=float((household_after_tax + total_tax + ra[i] + rb[j]) / months),
+    )
+
+
+def print_split_summary(split: HouseholdSplit):
+    print("-" * 40)
+    print("Optimal split")
+    print(f"  Primary salary:\t\t${split.primary_salary:,.2f}")
+    print(f"  Spouse salary:\t\t${split.spouse_salary:,.2f}")
+    print(f"  Primary RRSP:\t\t\t${split.primary_rrsp:,.2f}")
+    print(f"  Spouse RRSP:\t\t\t${split.spouse_rrsp:,.2f}")
+    print()
+    print(f"Total tax (personal+corp):\t${split.total_tax:,.2f}")
+    print(f"Household after-tax income:\t${split.household_after_tax:,.2f}")
+    print(f"Total after-tax (incl corp):\t${split.total_after_tax:,.2f}")
+    print(f"Monthly disbursement:\t\t${split.monthly_disbursement:,.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Find the salary/RRSP split of CCPC revenue that minimizes tax."
+    )
+    parser.add_argument("year", type=int, help="Tax year (e.g. 2024)")
+    parser.add_argument("revenue", type=float, help="Annual CCPC revenue in dollars")
+    parser.add_argument("--max-salary", type=float, default=None,
+                        help="Upper bound on each salary (default: revenue)")
+    parser.add_argument("--max-rrsp", type=float, default=0.0,
+                        help="Upper bound on each RRSP contribution (default: 0)")
+    parser.add_argument("--monthly-uccb", type=float, default=0.0,
+                        help="Monthly UCCB received by the spouse")
+    parser.add_argument("--mrr", type=float, default=None,
+                        help="Monthly recurring revenue ceiling on disbursements")
+    parser.add_argument("--months", type=float, default=12,
+                        help="Months the disbursement is spread over (default: 12)")
+    parser.add_argument("--step", type=float, default=1000.0,
+                        help="Salary and RRSP grid step (default: 1000)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="total_tax")
+    args = parser.parse_args()
+
+    max_salary = args.revenue if args.max_salary is None else args.max_salary
+    split = optimize_household_split(
+        args.year,
+        args.revenue,
+        primary_salary=(0.0, max_salary),
+        spouse_salary=(0.0, max_salary),
+        primary_rrsp=(0.0, args.max_rrsp),
+        spouse_rrsp=(0.0, args.max_rrsp),
+        yearly_uccb=args.monthly_uccb * 12,
+        salary_step=args.step,
+        rrsp_step=args.step,
+        objective=args.objective,
+        mrr=args.mrr,
+        months=args.months,
+    )
+    print_split_summary(split)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Multi-core execution of the batch tax calculators.
+
+Column data never goes through the process pool's pipe. Inputs and results
+live in SharedColumns blocks (multiprocessing.shared_memory): the parent
+fills the input block, each worker attaches to both blocks by name and
+computes its slice of the rows in place, and only the block names and row
+offsets are pickled. The results come back as arrays over the output block
+itself, so a run holds one copy of its inputs and one of its results
+however many workers there are. Each worker loads the CRA config (and
+compiles the bracket tables) for the requested years once, at startup.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+from functools import partial
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from columnar import CorporateReturnBatch, ReturnBatch
+from corporate import CorporateRevenue
+from individual import IndividualRevenue
+
+# Input columns of BatchExecutor.compute, named like the batch calculators' arguments
+INPUT_COLUMNS = {
+    "individual": (
+        "employment_income",
+        "ucc_benefit",
+        "ei_benefits",
+        "investment_income",
+        "rrsp_contribution",
+        "medical_expenses",
+        "self_employed",
+    ),
+    "corporation": ("revenue", "cpp_contribution", "deductions", "tax_credits"),
+}
+_RETURN_FIELDS = {
+    "individual": ReturnBatch.FIELDS,
+    "corporation": CorporateReturnBatch.FIELDS,
+}
+
+# Per-process calculators, populated by _init_worker
+_WORKER_REVENUE = {}
+
+
+def _init_worker(years):
+    for year in years:
+        _WORKER_REVENUE[("individual", year)] = IndividualRevenue(year)
+        _WORKER_REVENUE[("corporation", year)] = CorporateRevenue(year)
+
+
+def worker_revenue(entity, year):
+    """
+    The IndividualRevenue / CorporateRevenue for year, preloaded when this
+    process started as a BatchExecutor worker (else built once and kept).
+    """
+    rev = _WORKER_REVENUE.get((entity, year))
+    if rev is None:
+        rev = IndividualRevenue(year) if entity == "individual" else CorporateRevenue(year)
+        _WORKER_REVENUE[(entity, year)] = rev
+    return rev
+
+
+class SharedColumns:
+    """
+    Named float64 columns of equal length in one shared memory block, laid
+    out one column after another (like a binary_io column file).
+
+    Arrays taken from a block (columns, block[name]) keep it mapped, so they
+    stay valid after the block object itself is dropped; the memory is
+    released once the last array is gone and the creator has called
+    unlink(). Pass `spec` to another process and attach() it there.
+    """
+
+    __slots__ = ("names", "rows", "_shm")
+
+    def __init__(self, shm, names, rows):
+        self._shm = shm
+        self.names = tuple(names)
+        self.rows = rows
+
+    @classmethod
+    def create(cls, names, rows):
+        """A new zero-filled block of `rows` rows for each name."""
+        names = tuple(names)
+        if len(set(names)) != len(names):
+            raise ValueError(f"Duplicate column names: {names}")
+        # a shared memory block cannot be empty
+        size = max(1, len(names) * rows * 8)
+        return cls(SharedMemory(create=True, size=size), names, rows)
+
+    @classmethod
+    def attach(cls, spec):
+        """Open the block described by another block's spec."""
+        name, names, rows = spec
+        return cls(SharedMemory(name=name), names, rows)
+
+    @property
+    def spec(self):
+        """(shared memory name, column names, rows): all a worker needs to attach."""
+        return self._shm.name, self.names, self.rows
+
+    def __buffer__(self, flags):
+        return self._shm.buf
+
+    def __len__(self):
+        return self.rows
+
+    def data(self):
+        """The block as a (columns × rows) float64 array."""
+        count = len(self.names) * self.rows
+        return np.frombuffer(self, dtype=np.float64, count=count).reshape(
+            len(self.names), self.rows
+        )
+
+    @property
+    def columns(self):
+        """{name: float64 array view}."""
+        return dict(zip(self.names, self.data()))
+
+    def __getitem__(self, name):
+        return self.data()[self.names.index(name)]
+
+    def unlink(self):
+        """Remove the block's name (creator only); mapped arrays stay valid."""
+        self._shm.unlink()
+
+
+def _compute_slice(entity, year, fields, inputs_spec, outputs_spec, bounds):
+    """Compute rows [start, stop) of an input block into an output block."""
+    start, stop = bounds
+    inputs = SharedColumns.attach(inputs_spec).columns
+    outputs = SharedColumns.attach(outputs_spec).columns
+    columns = {name: inputs[name][start:stop] for name in INPUT_COLUMNS[entity]}
+    rev = worker_revenue(entity, year)
+    if entity == "individual":
+        columns["self_employed"] = columns["self_employed"] != 0
+        if fields == ReturnBatch.FIELDS:
+            results = rev.compute_basic_return_batch(**columns)
+        else:
+            results = rev.compute_basic_return_fields_batch(fields, **columns)
+    elif fields == CorporateReturnBatch.FIELDS:
+        results = rev.estimate_ccpc_tax_batch(**columns)
+    else:
+        results = rev.estimate_ccpc_tax_fields_batch(fields, **columns)
+    for name in fields:
+        outputs[name][start:stop] = results[name]
+
+
+class BatchExecutor:
+    """
+    Process pool around the individual and corporate batch calculators.
+
+    workers defaults to os.cpu_count(); chunk_size is the number of rows a
+    worker computes per task. Use as a context manager, or call close().
+    """
+
+    def __init__(self, years, workers=None, chunk_size=100_000):
+        self.years = tuple(years)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.years,),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._pool.shutdown()
+
+    def imap(self, fn, items):
+        """
+        Ordered map of a picklable fn over items with at most 2 × workers
+        tasks in flight, so items can come from a stream.
+        """
+        pending = deque()
+        for item in items:
+            pending.append(self._pool.submit(fn, item))
+            if len(pending) >= 2 * self.workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def compute(self, entity, year, inputs, fields=None):
+        """
+        Compute a SharedColumns block of INPUT_COLUMNS[entity] (self_employed
+        as 0/1) in the pool. Returns an unlinked SharedColumns of the result
+        fields (default: every return field), computed in place by the workers.
+        """
+        fields = _RETURN_FIELDS[entity] if fields is None else tuple(fields)
+        outputs = SharedColumns.create(fields, inputs.rows)
+        try:
+            task = partial(_compute_slice, entity, year, fields, inputs.spec, outputs.spec)
+            bounds = [
+                (a, min(a + self.chunk_size, inputs.rows))
+                for a in range(0, inputs.rows, self.chunk_size)
+            ]
+            futures = [self._pool.submit(task, b) for b in bounds]
+            wait(futures)
+            for future in futures:
+                future.result()
+        finally:
+            outputs.unlink()
+        return outputs
+
+    def _compute_arrays(self, entity, year, columns):
+        names = INPUT_COLUMNS[entity]
+        arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(columns[n])) for n in names))
+        inputs = SharedColumns.create(names, arrays[0].shape[0])
+        try:
+            for column, values in zip(inputs.data(), arrays):
+                column[:] = values
+            return self.compute(entity, year, inputs)
+        finally:
+            inputs.unlink()
+
+    def individual(
+        self,
+        year,
+        employment_income,
+        ucc_benefit=0.0,
+        ei_benefits=0.0,
+        investment_income=0.0,
+        rrsp_contribution=0.0,
+        medical_expenses=0.0,
+        self_employed=False,
+    ):
+        """
+        Parallel IndividualRevenue.compute_basic_return_batch; a ReturnBatch in
+        input order whose columns are views of the shared result block.
+        """
+        columns = {
+            "employment_income": employment_income,
+            "ucc_benefit": ucc_benefit,
+            "ei_benefits": ei_benefits,
+            "investment_income": investment_income,
+            "rrsp_contribution": rrsp_contribution,
+            "medical_expenses": medical_expenses,
+            "self_employed": self_employed,
+        }
+        return ReturnBatch(self._compute_arrays("individual", year, columns).columns)
+
+    def corporate(self, year, revenue, cpp_contribution=0.0, deductions=0.0, tax_credits=0.0):
+        """
+        Parallel CorporateRevenue.estimate_ccpc_tax_batch; a CorporateReturnBatch
+        in input order whose columns are views of the shared result block.
+        """
+        columns = {
+            "revenue": revenue,
+            "cpp_contribution": cpp_contribution,
+            "deductions": deductions,
+            "tax_credits": tax_credits,
+        }
+        return CorporateReturnBatch(self._compute_arrays("corporation", year, columns).columns)
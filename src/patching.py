@@ -0,0 +1,53 @@
+"""
+Stackable method wrappers for the opt-in layers (memo, instrumentation).
+
+Each layer wraps class methods through install() and takes its wrappers
+off again with uninstall(). Per method the original function and the list of
+layers wrapping it are kept, and the installed method is always rebuilt from
+the original, so layers can be enabled and disabled in any order without one
+clobbering another or leaving a wrapper behind.
+"""
+
+# (cls, name) -> (original function, [(owner, wrap), ...] innermost first)
+_methods = {}
+
+
+def _rebuild(cls, name):
+    original, layers = _methods[(cls, name)]
+    fn = original
+    for _, wrap in layers:
+        fn = wrap(fn)
+    setattr(cls, name, fn)
+
+
+def install(owner, cls, name, wrap):
+    """
+    Wrap cls.name with wrap(fn) on behalf of owner (any hashable tag), outside
+    the layers already installed. Installing the same owner twice is a no-op.
+    """
+    key = (cls, name)
+    if key not in _methods:
+        _methods[key] = (cls.__dict__[name], [])
+    layers = _methods[key][1]
+    if any(o == owner for o, _ in layers):
+        return
+    layers.append((owner, wrap))
+    _rebuild(cls, name)
+
+
+def uninstall(owner):
+    """Remove every wrapper installed by owner, keeping the other layers."""
+    for (cls, name), (original, layers) in list(_methods.items()):
+        remaining = [(o, wrap) for o, wrap in layers if o != owner]
+        if len(remaining) == len(layers):
+            continue
+        layers[:] = remaining
+        if layers:
+            _rebuild(cls, name)
+        else:
+            setattr(cls, name, original)
+            del _methods[(cls, name)]
+
+
+def is_installed(owner):
+    return any(o == owner for _, layers in _methods.values() for o, _ in layers)
@@ -1,6 +1,25 @@
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
+# Late-remittance penalty by days late: (max days late, rate); beyond the last tier
+# the final rate applies. Source: CRA payroll penalties for late remittances.
+_LATE_REMITTANCE_PENALTY_TIERS = (
+    (3, 0.03),
+    (5, 0.05),
+    (7, 0.07),
+)
+_LATE_REMITTANCE_PENALTY_MAX = 0.10
+
+# Annual interest rate on overdue amounts, by (year, quarter); compounded daily.
+# Source: CRA prescribed interest rates (overdue taxes, penalties and remittances)
+_OVERDUE_INTEREST_BY_QUARTER = {
+    (2023, 1): 0.08, (2023, 2): 0.09, (2023, 3): 0.09, (2023, 4): 0.10,
+    (2024, 1): 0.10, (2024, 2): 0.10, (2024, 3): 0.10, (2024, 4): 0.09,
+    (2025, 1): 0.08, (2025, 2): 0.07, (2025, 3): 0.07, (2025, 4): 0.07,
+}
+
 
 @dataclass
 class Tax:
@@ -8,6 +27,7 @@ class Tax:
     monthly_fed_tax: float
     total_owed: float
     penalty: float
+    tax_plus_penalty: float = 0.0
 
 
 def main():
@@ -117,6 +137,17 @@ def run_scenario(craig_monthly_fed_tax, miki_monthly_fed_tax):
 
 
 def calcuate_tax_owing(name, num_months_late, monthly_fed_tax):
+    t = compute_tax_owing(name, num_months_late, monthly_fed_tax)
+    print(name)
+    print(f"\tMonth tax owed:\t\t\t\t{monthly_fed_tax:.2f}")
+    print(f"\tMonth tax + penalty:\t\t{t.tax_plus_penalty:.2f}")
+    print(f"\ttax + penalty + interest:\t{t.total_owed:.2f}")
+    print(f"\tTotal Penalty:\t\t\t\t{(t.penalty):.2f}")
+    return t
+
+
+def compute_tax_owing(name, num_months_late, monthly_fed_tax):
+    """Flat 10% penalty plus 9% interest compounded daily for num_months_late months."""
     penalty_rate = 0.10
     penalty = monthly_fed_tax * penalty_rate
     tax_plus_penalty = monthly_fed_tax + penalty
@@ -129,13 +160,7 @@ def calcuate_tax_owing(name, num_months_late, monthly_fed_tax):
     t = (num_months_late / 12)
     total_owed = calculate_compound_interest(P, r, n, t)
     total_penalty = total_owed - monthly_fed_tax
-    print(name)
-    print(f"\tMonth tax owed:\t\t\t\t{monthly_fed_tax:.2f}")
-    print(f"\tMonth tax + penalty:\t\t{tax_plus_penalty:.2f}")
-    print(f"\ttax + penalty + interest:\t{total_owed:.2f}")
-    print(f"\tTotal Penalty:\t\t\t\t{(total_penalty):.2f}")
-
-    t = Tax(name, monthly_fed_tax, total_owed, total_penalty)
+    t = Tax(name, monthly_fed_tax, total_owed, total_penalty, tax_plus_penalty)
     return t
 
 
@@ -144,5 +169,120 @@ def calculate_compound_interest(P, r, n, t):
     return A
 
 
+# ##########################################################################################
+# Vectorized late-remittance engine
+# ##########################################################################################
+
+@dataclass(frozen=True)
+class LateRemittanceCharges:
+    """Per-remittance results; every field is an array aligned with the input ledger."""
+    amount: np.ndarray
+    days_late: np.ndarray
+    penalty: np.ndarray
+    interest: np.ndarray
+    total_owed: np.ndarray
+
+
+def _quarter_of(days):
+    months = days.astype("datetime64[M]").astype(np.int64)
+    return months // 12 + 1970, months % 12 // 3 + 1
+
+
+class InterestTable:
+    """
+    Cumulative daily-compounding factors over a date range.
+
+    Day k accrues interest at the rate of the quarter it falls in, so the growth
+    of an amount owed from day i to day j is exp(C[j] - C[i]) where C is the
+    running sum of log(1 + rate / 365). Building the table is O(days); each
+    lookup afterwards is O(1).
+    """
+
+    def __init__(self, start, end, rates=None):
+        rates = _OVERDUE_INTEREST_BY_QUARTER if rates is None else rates
+        self.start = np.datetime64(start, "D")
+        self.end = np.datetime64(end, "D")
+        days = np.arange(self.start, self.end, dtype="datetime64[D]")
+        years, quarters = _quarter_of(days)
+        missing = {
+            (int(y), int(q)) for y, q in set(zip(years.tolist(), quarters.tolist()))
+            if (y, q) not in rates
+        }
+        if missing:
+            raise ValueError(f"No overdue interest rate for quarters {sorted(missing)}")
+        lookup = np.array([rates[(y, q)] for y, q in zip(years.tolist(), quarters.tolist())])
+        self._log_factors = np.concatenate(([0.0], np.cumsum(np.log1p(lookup / 365))))
+
+    def growth(self, from_dates, to_dates):
+        """Compounding factor from each from_date to the matching to_date."""
+        i = (np.asarray(from_dates, dtype="datetime64[D]") - self.start).astype(np.int64)
+        j = (np.asarray(to_dates, dtype="datetime64[D]") - self.start).astype(np.int64)
+        if i.min(initial=0) < 0 or j.max(initial=0) >= len(self._log_factors):
+            raise ValueError(f"Dates outside interest table range {self.start}..{self.end}")
+        return np.exp(self._log_factors[j] - self._log_factors[i])
+
+
+def late_remittance_penalty_rate(days_late, tiers=_LATE_REMITTANCE_PENALTY_TIERS,
+                                 max_rate=_LATE_REMITTANCE_PENALTY_MAX):
+    """Penalty rate for each days_late value (0 when on time)."""
+    days_late = np.asarray(days_late)
+    limits = np.array([d for d, _ in tiers])
+    rates = np.append([r for _, r in tiers], max_rate)
+    rate = rates[np.searchsorted(limits, days_late, side="left")]
+    return np.where(days_late > 0, rate, 0.0)
+
+
+def late_remittance_charges(amounts, due_dates, payment_dates, rates=None, interest_table=None):
+    """
+    Penalty, interest and total owed for a ledger of remittances.
+
+    amounts, due_dates and payment_dates are aligned arrays (dates as anything
+    numpy.datetime64 accepts). The penalty depends on how many days late the
+    payment was; interest compounds daily on amount + penalty at the overdue
+    rate of each quarter from the due date to the payment date.
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    due = np.asarray(due_dates, dtype="datetime64[D]")
+    paid = np.asarray(payment_dates, dtype="datetime64[D]")
+    days_late = np.maximum((paid - due).astype(np.int64), 0)
+    if not due.size:
+        return LateRemittanceCharges(
+            amount=amounts,
+            days_late=days_late,
+            penalty=np.zeros_like(amounts),
+            interest=np.zeros_like(amounts),
+            total_owed=np.zeros_like(amounts),
+        )
+    late_paid = np.maximum(paid, due)
+    if interest_table is None:
+        interest_table = InterestTable(due.min(), late_paid.max() + 1, rates)
+    penalty = amounts * late_remittance_penalty_rate(days_late)
+    owed = amounts + penalty
+    total_owed = owed * interest_table.growth(due, late_paid)
+    return LateRemittanceCharges(
+        amount=amounts,
+        days_late=days_late,
+        penalty=penalty,
+        interest=total_owed - owed,
+        total_owed=total_owed,
+    )
+
+
+def print_late_remittance_charges(charges: LateRemittanceCharges, labels=None):
+    labels = labels if labels is not None else range(1, len(charges.amount) + 1)
+    print("Remittance\tAmount\t\tDays late\tPenalty\t\tInterest\tTotal owed")
+    for label, amount, days, penalty, interest, total in zip(
+        labels, charges.amount, charges.days_late, charges.penalty, charges.interest,
+        charges.total_owed,
+    ):
+        print(f"{label}\t\t{amount:,.2f}\t{days}\t\t{penalty:,.2f}\t\t{interest:,.2f}"
+              f"\t\t{total:,.2f}")
+    print("-" * 80)
+    print(f"Total original:\t\t${charges.amount.sum():,.2f}")
+    print(f"Total penalty:\t\t${charges.penalty.sum():,.2f}")
+    print(f"Total interest:\t\t${charges.interest.sum():,.2f}")
+    print(f"Total owed:\t\t\t${charges.total_owed.sum():,.2f}")
+
+
 if __name__ == "__main__":
     main()
@@ -1,28 +1,201 @@
+"""
+Per-pay-period payroll withholding: federal and Ontario income tax, CPP and EI.
+
+Income tax uses the annualization method: each period's pay is multiplied by
+the number of pay periods, the annual tax on that amount is computed with the
+batch engine, and the result is divided back by the number of periods. CPP
+and EI are computed per period and capped on a year-to-date basis, so
+contributions stop once the employee reaches the YMPE or EI max insurable
+earnings for the year.
+
+Everything runs on 2-D arrays (employees x pay periods), so a whole payroll
+year for thousands of employees is a single vectorized pass.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# Allow running as script when invoked from project root or src
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from gross_from_remittance import _EI_BY_YEAR
+from individual import IndividualRevenue
+
+PAY_PERIODS = {
+    "weekly": 52,
+    "biweekly": 26,
+    "semimonthly": 24,
+    "monthly": 12,
+}
+
+
+@dataclass(frozen=True)
+class PayrollDeductions:
+    """Per-period deductions; every field is an (employees x periods) array."""
+    gross_pay: np.ndarray
+    federal_tax: np.ndarray
+    provincial_tax: np.ndarray
+    cpp: np.ndarray
+    ei: np.ndarray
+
+    @property
+    def remittance(self):
+        """Amount remitted to CRA each period (employee share)."""
+        return self.federal_tax + self.provincial_tax + self.cpp + self.ei
+
+    @property
+    def net_pay(self):
+        return self.gross_pay - self.remittance
+
+    def annual_totals(self):
+        """Per-employee totals over all periods, as a dict of 1-D arrays."""
+        return {
+            "gross_pay": self.gross_pay.sum(axis=1),
+            "federal_tax": self.federal_tax.sum(axis=1),
+            "provincial_tax": self.provincial_tax.sum(axis=1),
+            "cpp": self.cpp.sum(axis=1),
+            "ei": self.ei.sum(axis=1),
+            "remittance": self.remittance.sum(axis=1),
+        }
+
+
+def periods_per_year(frequency):
+    if frequency not in PAY_PERIODS:
+        raise ValueError(f"Invalid pay frequency. Must be one of {list(PAY_PERIODS)}")
+    return PAY_PERIODS[frequency]
+
+
+def _ytd_capped(per_period, annual_max, ytd_start):
+    """Per-period contributions after capping the running year-to-date total at annual_max."""
+    cumulative = np.cumsum(per_period, axis=1) + ytd_start[:, None]
+    capped = np.minimum(cumulative, annual_max)
+    return np.diff(capped, axis=1, prepend=np.minimum(ytd_start, annual_max)[:, None])
+
+
+def _pay_matrix(gross_pay, periods):
+    """Accept a scalar, one pay amount per employee, or an (employees x periods) matrix."""
+    gross_pay = np.asarray(gross_pay, dtype=np.float64)
+    if gross_pay.ndim == 0:
+        gross_pay = gross_pay.reshape(1)
+    if gross_pay.ndim == 1:
+        return np.repeat(gross_pay[:, None], periods, axis=1)
+    if gross_pay.ndim != 2 or gross_pay.shape[1] != periods:
+        raise ValueError(
+            f"gross_pay must be an (employees x {periods}) matrix for this pay frequency, "
+            f"got shape {gross_pay.shape}"
+        )
+    return gross_pay
+
+
+def annualized_income_tax(rev, pay, periods):
+    """(federal, provincial) income tax per period on pay, by the annualization method."""
+    pay = np.asarray(pay, dtype=np.float64)
+    annual = rev.compute_basic_return_fields_batch(
+        ("net_federal_tax", "provincial_tax"), (pay * periods).ravel(), 0.0, 0.0, 0.0, 0.0, 0.0,
+        False
+    )
+    federal_tax = annual["net_federal_tax"].reshape(pay.shape) / periods
+    provincial_tax = annual["provincial_tax"].reshape(pay.shape) / periods
+    return federal_tax, provincial_tax
+
+
+def payroll_deductions(year, gross_pay, frequency="biweekly", ytd_cpp=0.0, ytd_ei=0.0,
+                       use_tables=False, verify=False):
+    """
+    Withholding for every employee and pay period of a year.
+
+    gross_pay is a scalar, a per-employee pay amount (repeated every period) or
+    an (employees x periods) matrix of pay. ytd_cpp / ytd_ei are contributions
+    already made this year before the first period (scalar or per employee).
+    With use_tables, income tax is looked up in the precomputed payroll table
+    for the year and frequency (see payroll_tables); verify also checks every
+    lookup against the exact formula.
+    """
+    periods = periods_per_year(frequency)
+    if year not in _EI_BY_YEAR:
+        raise ValueError(f"EI not configured for year {year}. Supported: {list(_EI_BY_YEAR)}")
+    pay = _pay_matrix(gross_pay, periods)
+    n_employees = pay.shape[0]
+    rev = IndividualRevenue(year)
+
+    # CPP: (pay - exemption/periods) x rate, capped at the annual maximum year-to-date
+    max_cpp = (rev.ympe - rev.cpp_basic_annual_exemption) * rev.cpp_rate
+    cpp = np.maximum(0.0, pay - rev.cpp_basic_annual_exemption / periods) * rev.cpp_rate
+    cpp = _ytd_capped(cpp, max_cpp, np.broadcast_to(np.asarray(ytd_cpp, float), n_employees))
+
+    # EI: pay x rate, capped at the annual maximum premium year-to-date
+    ei_cfg = _EI_BY_YEAR[year]
+    ei_rate = ei_cfg["rate_per_100"] / 100.0
+    ei = _ytd_capped(
+        pay * ei_rate,
+        ei_cfg["max_insurable"] * ei_rate,
+        np.broadcast_to(np.asarray(ytd_ei, float), n_employees),
+    )
+
+    # Income tax: annualize each period's pay, tax it, de-annualize
+    if use_tables:
+        from payroll_tables import get_table
+
+        federal_tax, provincial_tax = get_table(year, frequency).lookup(pay, verify=verify)
+    else:
+        federal_tax, provincial_tax = annualized_income_tax(rev, pay, periods)
+    return PayrollDeductions(
+        gross_pay=pay,
+        federal_tax=federal_tax,
+        provincial_tax=provincial_tax,
+        cpp=cpp,
+        ei=ei,
+    )
 
 
 def main():
-    pass
+    parser = argparse.ArgumentParser(
+        description="Per-pay-period payroll deductions (federal, Ontario, CPP, EI)."
+    )
+    parser.add_argument("salary", type=float, help="Annual salary in dollars")
+    parser.add_argument("year", type=int, nargs="?", default=2024, help="Tax year (default: 2024)")
+    parser.add_argument(
+        "--frequency",
+        choices=list(PAY_PERIODS),
+        default="biweekly",
+        help="Pay frequency (default: biweekly)",
+    )
+    parser.add_argument(
+        "--tables",
+        action="store_true",
+        help="Look income tax up in the precomputed payroll tables",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="With --tables, check every lookup against the exact formula",
+    )
+    args = parser.parse_args()
 
+    periods = periods_per_year(args.frequency)
+    d = payroll_deductions(args.year, args.salary / periods, args.frequency,
+                           use_tables=args.tables, verify=args.verify)
+    print(f"Year: {args.year}  Salary: ${args.salary:,.2f}  Pay: {args.frequency} ({periods} periods)")
+    print()
+    print("Period\tGross\t\tFed Tax\t\tProv Tax\tCPP\t\tEI\t\tNet Pay")
+    for p in range(periods):
+        print(
+            f"{p + 1}\t{d.gross_pay[0, p]:,.2f}\t{d.federal_tax[0, p]:,.2f}\t"
+            f"{d.provincial_tax[0, p]:,.2f}\t\t{d.cpp[0, p]:,.2f}\t\t{d.ei[0, p]:,.2f}\t\t"
+            f"{d.net_pay[0, p]:,.2f}"
+        )
+    totals = {k: v[0] for k, v in d.annual_totals().items()}
+    print("-" * 80)
+    print(f"Total federal tax:    ${totals['federal_tax']:,.2f}")
+    print(f"Total provincial tax: ${totals['provincial_tax']:,.2f}")
+    print(f"Total CPP:            ${totals['cpp']:,.2f}")
+    print(f"Total EI:             ${totals['ei']:,.2f}")
+    print(f"Total remitted:       ${totals['remittance']:,.2f}")
 
-if __name__ == "__main__":
-    year = 2023
-    # income = 50000
-    income = 100000
-    monthly_uccb = 217
-    yearly_uccb = monthly_uccb * 12
-    rrsp_contribution = 0.0
-    ei_benefits = 0.0
-    investment_income = 0.0
-    medical_expenses = 0.0
-    verbose = False
-    self_employed = False
-    # main_individual(year, income, yearly_uccb, ei_benefits, investment_income,
-    #      rrsp_contribution, medical_expenses, self_employed)
-
-    # # ----------
-    # revenue = 50000
-    # deductions = 0
-    # tax_credits = 0
-    # main_corporate(revenue, deductions, tax_credits)
 
+if __name__ == "__main__":
     main()
@@ -0,0 +1,261 @@
+"""
+Precomputed payroll deduction tables, in the spirit of CRA's Payroll
+Deductions Tables (T4032).
+
+A table holds the federal and provincial income tax withheld per pay period
+for every pay amount on a fixed grid (step dollars apart) from zero up to a
+maximum, for one tax year, pay frequency and claim code. Withholding for any
+pay is then an index computation plus a linear interpolation between two grid
+points, O(1) per payment, instead of a full return calculation. Pays above the
+table fall back to the exact formula.
+
+Tables are built from the CRA parameters with the annualization method of
+payroll_remittance and cached on disk per config version, so a config change
+builds new tables. Interpolation is exact wherever the tax is linear between
+two grid points; in a band containing a bracket or credit kink it is at most a
+few cents at the default $1 step, shrinking in proportion to the step.
+verify() / lookup(verify=True) check lookups against the exact formula.
+
+Only claim code 1 (basic personal amount) is modelled: the return engine has
+no other TD1 personal amounts.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Allow running as script when invoked from project root or src
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np
+
+from cra import config_version
+from individual import IndividualRevenue
+from payroll_remittance import PAY_PERIODS, annualized_income_tax, periods_per_year
+
+CLAIM_CODES = (1,)
+DEFAULT_STEP = 1.0
+DEFAULT_MAX_ANNUAL = 1_000_000.0
+DEFAULT_TOLERANCE = 0.05
+
+_CACHE_DIR = Path(__file__).resolve().parent.parent / "data" / "payroll_tables"
+
+# (year, frequency, claim code, step, max annual, config version) -> PayrollTable
+_TABLES = {}
+
+
+class PayrollTable:
+    """Per-period income tax withheld at pay = 0, step, 2 * step, ..."""
+
+    __slots__ = ("year", "frequency", "claim_code", "step", "config_version",
+                 "federal_tax", "provincial_tax")
+
+    def __init__(self, year, frequency, claim_code, step, config_version, federal_tax,
+                 provincial_tax):
+        self.year = year
+        self.frequency = frequency
+        self.claim_code = claim_code
+        self.step = step
+        self.config_version = config_version
+        self.federal_tax = federal_tax
+        self.provincial_tax = provincial_tax
+
+    @property
+    def periods(self):
+        return PAY_PERIODS[self.frequency]
+
+    @property
+    def max_pay(self):
+        """Largest pay per period covered by the table."""
+        return (len(self.federal_tax) - 1) * self.step
+
+    def __len__(self):
+        return len(self.federal_tax)
+
+    def __repr__(self):
+        return (f"PayrollTable(year={self.year}, frequency={self.frequency!r}, "
+                f"claim_code={self.claim_code}, step={self.step}, rows={len(self)})")
+
+    @classmethod
+    def build(cls, year, frequency, claim_code=1, step=DEFAULT_STEP,
+              max_annual=DEFAULT_MAX_ANNUAL):
+        if claim_code not in CLAIM_CODES:
+            raise ValueError(f"Unsupported claim code {claim_code}. Must be one of {CLAIM_CODES}")
+        periods = periods_per_year(frequency)
+        rev = IndividualRevenue(year)
+        pay = np.arange(int(np.ceil(max_annual / periods / step)) + 1) * step
+        federal_tax, provincial_tax = annualized_income_tax(rev, pay, periods)
+        return cls(year, frequency, claim_code, step, rev.cra.config_version, federal_tax,
+                   provincial_tax)
+
+    ############################################
+    # Disk cache
+    ############################################
+    def save(self, path):
+        """Write the table as .npz, its metadata as a JSON string (no pickled objects)."""
+        meta = {
+            "year": self.year,
+            "frequency": self.frequency,
+            "claim_code": self.claim_code,
+            "step": self.step,
+            "config_version": self.config_version,
+        }
+        np.savez(
+            path,
+            meta=np.array(json.dumps(meta)),
+            federal_tax=self.federal_tax,
+            provincial_tax=self.provincial_tax,
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a table written by save(); raises ValueError for anything else."""
+        with np.load(path, allow_pickle=False) as f:
+            meta = json.loads(f["meta"].item())
+            return cls(meta["year"], meta["frequency"], meta["claim_code"], meta["step"],
+                       meta["config_version"], f["federal_tax"], f["provincial_tax"])
+
+    ############################################
+    # Lookup
+    ############################################
+    def exact(self, pay):
+        """(federal, provincial) tax per period from the full formula."""
+        return annualized_income_tax(IndividualRevenue(self.year), pay, self.periods)
+
+    def lookup(self, pay, verify=False, tolerance=DEFAULT_TOLERANCE):
+        """
+        (federal, provincial) tax per period for pay (scalar or array), by
+        interpolating between the two surrounding grid points. With verify, every
+        result is checked against exact() and a ValueError is raised if any
+        differs by more than tolerance dollars.
+        """
+        shape = np.shape(pay)
+        pay = np.atleast_1d(np.asarray(pay, dtype=np.float64))
+        position = pay / self.step
+        i = np.clip(position.astype(np.int64), 0, len(self) - 2)
+        fraction = position - i
+        federal = self.federal_tax[i] + fraction * (self.federal_tax[i + 1] - self.federal_tax[i])
+        provincial = (self.provincial_tax[i]
+                      + fraction * (self.provincial_tax[i + 1] - self.provincial_tax[i]))
+        outside = (pay < 0) | (pay > self.max_pay)
+        if outside.any():
+            exact_federal, exact_provincial = self.exact(pay[outside])
+            federal[outside] = exact_federal
+            provincial[outside] = exact_provincial
+        if verify:
+            error = _max_error((federal, provincial), self.exact(pay))
+            if error > tolerance:
+                raise ValueError(
+                    f"Payroll table lookup differs from the exact formula by ${error:.4f} "
+                    f"(tolerance ${tolerance})"
+                )
+        return federal.reshape(shape), provincial.reshape(shape)
+
+    def verify(self, pay=None, tolerance=DEFAULT_TOLERANCE):
+        """
+        Compare lookups with the exact formula. By default checks the midpoint of
+        every grid band, where interpolation error peaks. Returns a report dict.
+        """
+        if pay is None:
+            pay = (np.arange(len(self) - 1) + 0.5) * self.step
+        pay = np.asarray(pay, dtype=np.float64)
+        looked_up = self.lookup(pay)
+        exact = self.exact(pay)
+        errors = np.maximum(*(np.abs(a - b) for a, b in zip(looked_up, exact)))
+        worst = int(np.argmax(errors)) if len(errors) else 0
+        return {
+            "checked": int(pay.size),
+            "max_error": float(errors.max()) if len(errors) else 0.0,
+            "max_error_pay": float(pay.ravel()[worst]) if len(errors) else None,
+            "over_tolerance": int((errors > tolerance).sum()),
+            "tolerance": tolerance,
+        }
+
+
+def _max_error(looked_up, exact):
+    return max(float(np.max(np.abs(a - b), initial=0.0)) for a, b in zip(looked_up, exact))
+
+
+def _cache_path(cache_dir, year, frequency, claim_code, step, max_annual, version):
+    return Path(cache_dir) / (
+        f"{year}-{frequency}-cc{claim_code}-{step:g}-{max_annual:g}-{version[:16]}.npz"
+    )
+
+
+def get_table(year, frequency="biweekly", claim_code=1, step=DEFAULT_STEP,
+              max_annual=DEFAULT_MAX_ANNUAL, cache_dir=_CACHE_DIR):
+    """
+    The payroll table for (year, frequency, claim code), from memory, then the
+    on-disk cache, else built and saved. Cached tables are keyed by config
+    version; failing to write the cache is not an error.
+    """
+    version = config_version()
+    key = (year, frequency, claim_code, step, max_annual, version)
+    table = _TABLES.get(key)
+    if table is not None:
+        return table
+    path = _cache_path(cache_dir, year, frequency, claim_code, step, max_annual, version)
+    try:
+        table = PayrollTable.load(path)
+    except (OSError, ValueError, KeyError):
+        table = PayrollTable.build(year, frequency, claim_code, step, max_annual)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            table.save(path)
+        except OSError:
+            pass
+    _TABLES[key] = table
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build (or load) a payroll deductions table and optionally verify it."
+    )
+    parser.add_argument("year", type=int, help="Tax year")
+    parser.add_argument(
+        "--frequency",
+        choices=list(PAY_PERIODS),
+        default="biweekly",
+        help="Pay frequency (default: biweekly)",
+    )
+    parser.add_argument(
+        "--claim-code",
+        type=int,
+        choices=CLAIM_CODES,
+        default=1,
+        help="TD1 claim code (default: 1)",
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        default=DEFAULT_STEP,
+        help=f"Pay granularity per period in dollars (default: {DEFAULT_STEP:g})",
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Check the lookup at every grid band against the exact formula",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help=f"Allowed lookup error in dollars for --verify (default: {DEFAULT_TOLERANCE})",
+    )
+    args = parser.parse_args()
+
+    table = get_table(args.year, args.frequency, args.claim_code, args.step)
+    print(f"{table!r}: pay per period 0 to ${table.max_pay:,.2f}")
+    if args.verify:
+        report = table.verify(tolerance=args.tolerance)
+        print(f"Checked {report['checked']:,} lookups; max error ${report['max_error']:.6f} "
+              f"at pay ${report['max_error_pay']:,.2f}; {report['over_tolerance']} over "
+              f"${report['tolerance']}")
+        if report["over_tolerance"]:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
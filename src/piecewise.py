@@ -0,0 +1,131 @@
+"""
+Exact piecewise-linear representations of the tax formulas.
+
+With every input but one held fixed, the return computed by IndividualRevenue
+is piecewise linear in the remaining input: the kinks sit at bracket floors,
+YMPE, EI max insurable earnings, the BPA phase-out bounds and credit caps, plus
+wherever a max(0, ...) clamp kicks in. fit() turns a scalar function and its
+known breakpoints into a PiecewiseLinear knot table, locating any clamp kinks
+between breakpoints numerically, so evaluation and inversion become a bisect
+plus one multiply-add.
+"""
+
+from bisect import bisect_left, bisect_right
+
+_MAX_DEPTH = 48
+
+
+class PiecewiseLinear:
+    """
+    Continuous piecewise-linear function given by knots xs (ascending) and ys.
+    The first and last segments extend linearly beyond the knot range.
+    """
+
+    __slots__ = ("xs", "ys", "slopes")
+
+    def __init__(self, xs, ys):
+        if len(xs) < 2 or len(xs) != len(ys):
+            raise ValueError("PiecewiseLinear needs at least two (x, y) knots")
+        self.xs = tuple(xs)
+        self.ys = tuple(ys)
+        self.slopes = tuple(
+            (y1 - y0) / (x1 - x0)
+            for x0, x1, y0, y1 in zip(self.xs, self.xs[1:], self.ys, self.ys[1:])
+        )
+
+    def __len__(self):
+        return len(self.slopes)
+
+    def segment(self, x):
+        """Index of the segment containing x."""
+        i = bisect_right(self.xs, x) - 1
+        return min(max(i, 0), len(self.slopes) - 1)
+
+    def __call__(self, x):
+        i = self.segment(x)
+        return self.ys[i] + (x - self.xs[i]) * self.slopes[i]
+
+    def slope(self, x):
+        return self.slopes[self.segment(x)]
+
+    def inverse(self, y):
+        """
+        Smallest x with f(x) == y, for a non-decreasing function.
+        Returns None when y falls on a flat segment (no unique solution).
+        """
+        i = bisect_left(self.ys, y) - 1
+        i = min(max(i, 0), len(self.slopes) - 1)
+        slope = self.slopes[i]
+        if slope <= 0:
+            return None
+        return self.xs[i] + (y - self.ys[i]) / slope
+
+    def arrays(self):
+        """(xs, ys, slopes) as float64 NumPy arrays."""
+        import numpy as np
+
+        return (
+            np.asarray(self.xs, dtype=np.float64),
+            np.asarray(self.ys, dtype=np.float64),
+            np.asarray(self.slopes, dtype=np.float64),
+        )
+
+    def evaluate_array(self, values):
+        """Vectorized __call__."""
+        import numpy as np
+
+        xs, ys, slopes = self.arrays()
+        values = np.asarray(values, dtype=np.float64)
+        i = np.clip(np.searchsorted(xs, values, side="right") - 1, 0, len(slopes) - 1)
+        return ys[i] + (values - xs[i]) * slopes[i]
+
+
+def _is_linear(fn, a, fa, b, fb, tol):
+    for t in (1 / 3, 2 / 3):
+        x = a + (b - a) * t
+        if abs(fn(x) - (fa + (fb - fa) * t)) > tol:
+            return False
+    return True
+
+
+def _kinks(fn, a, fa, b, fb, tol, depth=0):
+    """Knots strictly inside (a, b) needed to make fn linear between them."""
+    if depth >= _MAX_DEPTH or _is_linear(fn, a, fa, b, fb, tol):
+        return []
+    # Assume a single kink: intersect the lines through each end of the segment.
+    h = (b - a) / 64
+    left_slope = (fn(a + h) - fa) / h
+    right_slope = (fb - fn(b - h)) / h
+    if left_slope != right_slope:
+        k = (fb - fa + left_slope * a - right_slope * b) / (left_slope - right_slope)
+        if a < k < b:
+            fk = fn(k)
+            if abs(fk - (fa + left_slope * (k - a))) <= tol:
+                return (
+                    _kinks(fn, a, fa, k, fk, tol, depth + 1)
+                    + [(k, fk)]
+                    + _kinks(fn, k, fk, b, fb, tol, depth + 1)
+                )
+    m = (a + b) / 2
+    fm = fn(m)
+    return (
+        _kinks(fn, a, fa, m, fm, tol, depth + 1)
+        + [(m, fm)]
+        + _kinks(fn, m, fm, b, fb, tol, depth + 1)
+    )
+
+
+def fit(fn, breakpoints, tol=1e-7):
+    """
+    Build the PiecewiseLinear for a continuous scalar function from its known
+    breakpoints. The first and last breakpoints bound the knot table; kinks
+    between breakpoints (e.g. from max(0, ...) clamps) are found numerically.
+    """
+    xs = sorted(set(breakpoints))
+    knots = [(xs[0], fn(xs[0]))]
+    for b in xs[1:]:
+        a, fa = knots[-1]
+        fb = fn(b)
+        knots.extend(_kinks(fn, a, fa, b, fb, tol))
+        knots.append((b, fb))
+    return PiecewiseLinear([x for x, _ in knots], [y for _, y in knots])
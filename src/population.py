@@ -0,0 +1,236 @@
+"""
+Seeded synthetic taxpayer populations for load testing.
+
+generate_population() draws individual or corporate batch inputs from
+simple, plausible distributions (no real taxpayer data) and streams them as
+CSV, JSONL or a binary column file (.taxcol) with the columns the batch
+subcommand reads (see binary_io.INPUT_COLUMNS):
+
+- individuals: log-normal employment income (a share with none),
+  self-employed share, RRSP contributions capped at 18% of income, UCCB,
+  EI benefits, investment income and medical expenses, each received by a
+  share of the population;
+- corporations: log-normal revenue, the summed CPP of one or two
+  owner-employees, deductions and tax credits.
+
+Rows are drawn in fixed blocks, each from its own generator seeded with
+(seed, block number), so a seed always produces the same rows, and a
+smaller population is a prefix of a larger one. Amounts are rounded to the
+cent, so every format holds the same values.
+
+    python src/driver.py generate individual 10000000 --output people.taxcol
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+import batch_io
+import binary_io
+from cra import get_config_registry
+
+# Rows drawn per generator (and written per chunk)
+BLOCK_ROWS = 1 << 16
+
+# Individuals: (share of the population receiving it, median when received)
+NO_INCOME_SHARE = 0.05
+INCOME_MEDIAN = 52_000.0
+INCOME_SIGMA = 0.75
+SELF_EMPLOYED_SHARE = 0.12
+RRSP_SHARE = 0.25
+RRSP_MAX_RATE = 0.18
+RRSP_LIMIT = 31_560.0
+UCC_BENEFIT = (0.15, 4_000.0)
+EI_BENEFITS = (0.06, 9_000.0)
+INVESTMENT_INCOME = (0.30, 1_500.0)
+MEDICAL_EXPENSES = (0.20, 1_200.0)
+
+# Corporations
+REVENUE_MEDIAN = 250_000.0
+REVENUE_SIGMA = 1.0
+SECOND_OWNER_SHARE = 0.4
+OWNER_CPP_MAX = 8_000.0
+DEDUCTIONS = (0.6, 0.2)  # share with deductions, highest fraction of revenue
+TAX_CREDITS = (0.1, 5_000.0)  # share with credits, highest amount
+
+
+def _occasional(rng, n, share, median, sigma=1.0):
+    """Log-normal amounts around median for a random `share` of n rows, else 0."""
+    amounts = rng.lognormal(np.log(median), sigma, n)
+    return np.where(rng.random(n) < share, amounts, 0.0)
+
+
+def _individuals(rng, n, years):
+    income = rng.lognormal(np.log(INCOME_MEDIAN), INCOME_SIGMA, n)
+    income[rng.random(n) < NO_INCOME_SHARE] = 0.0
+    rrsp = np.minimum(income * rng.uniform(0.0, RRSP_MAX_RATE, n), RRSP_LIMIT)
+    return {
+        "year": rng.choice(years, n),
+        "income": income,
+        "ucc_benefit": _occasional(rng, n, *UCC_BENEFIT, sigma=0.5),
+        "ei_benefits": _occasional(rng, n, *EI_BENEFITS, sigma=0.5),
+        "investment_income": _occasional(rng, n, *INVESTMENT_INCOME),
+        "rrsp_contribution": np.where(rng.random(n) < RRSP_SHARE, rrsp, 0.0),
+        "medical_expenses": _occasional(rng, n, *MEDICAL_EXPENSES),
+        "self_employed": (rng.random(n) < SELF_EMPLOYED_SHARE).astype(np.float64),
+    }
+
+
+def _corporations(rng, n, years):
+    revenue = rng.lognormal(np.log(REVENUE_MEDIAN), REVENUE_SIGMA, n)
+    owners = 1 + (rng.random(n) < SECOND_OWNER_SHARE)
+    deductions_share, deductions_rate = DEDUCTIONS
+    credits_share, credits_max = TAX_CREDITS
+    return {
+        "year": rng.choice(years, n),
+        "revenue": revenue,
+        "cpp_contributions": rng.uniform(0.0, OWNER_CPP_MAX, n) * owners,
+        "deductions": np.where(
+            rng.random(n) < deductions_share, revenue * rng.uniform(0.0, deductions_rate, n), 0.0
+        ),
+        "tax_credits": np.where(
+            rng.random(n) < credits_share, rng.uniform(0.0, credits_max, n), 0.0
+        ),
+    }
+
+
+_GENERATORS = {"individual": _individuals, "corporation": _corporations}
+
+
+def population_chunks(entity, rows, seed=0, years=None):
+    """
+    Yield {column: float64 array} blocks of BLOCK_ROWS rows (the last one
+    shorter) making up `rows` rows, columns in binary_io.INPUT_COLUMNS order.
+    years defaults to every configured tax year.
+    """
+    if entity not in _GENERATORS:
+        raise ValueError(f"Unknown entity {entity!r}. Must be one of {list(_GENERATORS)}")
+    if rows < 0:
+        raise ValueError(f"rows must be non-negative, got {rows}")
+    if years is None:
+        years = get_config_registry().years()
+    years = np.asarray([int(y) for y in years], dtype=np.float64)
+    for block, start in enumerate(range(0, rows, BLOCK_ROWS)):
+        rng = np.random.default_rng([seed, block])
+        columns = _GENERATORS[entity](rng, BLOCK_ROWS, years)
+        n = min(BLOCK_ROWS, rows - start)
+        yield {
+            name: np.round(columns[name][:n], 2) for name in binary_io.INPUT_COLUMNS[entity]
+        }
+
+
+def _text_row_format(entity, fmt):
+    names = binary_io.INPUT_COLUMNS[entity]
+    formats = {"year": "%d", "self_employed": "%s"}
+    if fmt == "csv":
+        return ",".join(formats.get(name, "%.2f") for name in names) + "\r\n"
+    # the JSON RecordWriter writes: default separators, lowercase booleans
+    fields = ", ".join(f'"{name}": {formats.get(name, "%.2f")}' for name in names)
+    return "{" + fields + "}\n"
+
+
+def _write_text(stream, entity, fmt, chunks):
+    row = _text_row_format(entity, fmt)
+    names = binary_io.INPUT_COLUMNS[entity]
+    if fmt == "csv":
+        stream.write(",".join(names) + "\r\n")
+    flags = np.array(["false", "true"])
+    for columns in chunks:
+        values = [
+            flags[columns[name].astype(np.intp)].tolist() if name == "self_employed"
+            else columns[name].tolist()
+            for name in names
+        ]
+        stream.write("".join(map(row.__mod__, zip(*values))))
+    stream.flush()
+
+
+def _write_binary(path, entity, chunks, rows):
+    names = binary_io.INPUT_COLUMNS[entity]
+    with binary_io.create_binary(path, entity, names, rows) as dst:
+        start = 0
+        for columns in chunks:
+            stop = start + len(columns["year"])
+            for name in names:
+                dst[name][start:stop] = columns[name]
+            start = stop
+
+
+def generate_population(entity, rows, output_path=None, fmt=None, seed=0, years=None):
+    """
+    Write `rows` synthetic entity records to output_path (stdout if
+    None/"-") as CSV or JSONL, or as a binary column file when fmt (default:
+    from the extension) is binary. Returns the number of rows.
+    """
+    fmt = fmt or batch_io.detect_format(output_path)
+    if fmt not in batch_io.FORMATS + (batch_io.BINARY,):
+        raise ValueError(f"Unknown format {fmt!r}")
+    chunks = population_chunks(entity, rows, seed, years)
+    if fmt == batch_io.BINARY:
+        if output_path in (None, "-"):
+            raise ValueError("The binary format needs an output file path")
+        _write_binary(output_path, entity, chunks, rows)
+        return rows
+    dst = batch_io.open_output(output_path)
+    try:
+        _write_text(dst, entity, fmt, chunks)
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="driver.py generate",
+        description="Write a seeded synthetic population of batch input records for load "
+        "testing (no real taxpayer data).",
+    )
+    parser.add_argument(
+        "entity",
+        choices=list(_GENERATORS),
+        help="Entity type of the records",
+    )
+    parser.add_argument("rows", type=int, help="Number of records")
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Output file (default: stdout, as CSV); its extension selects the format",
+    )
+    parser.add_argument(
+        "--format",
+        choices=batch_io.FORMATS + (batch_io.BINARY,),
+        default=None,
+        help="Output format (default: from the output file extension, csv for stdout)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Random seed; the same seed always gives the same records (default: 0)",
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Tax years to draw from (default: every configured year)",
+    )
+    args = parser.parse_args(argv)
+    if args.rows < 0:
+        parser.error("rows must be non-negative")
+    if args.seed < 0:
+        parser.error("--seed must be non-negative")
+    fmt = args.format or batch_io.detect_format(args.output)
+    if fmt == batch_io.BINARY and args.output == "-":
+        parser.error("the binary format needs an --output file path")
+    if args.years is not None:
+        unknown = set(args.years) - {int(y) for y in get_config_registry().years()}
+        if unknown:
+            parser.error(f"no CRA config for year(s) {', '.join(map(str, sorted(unknown)))}")
+    generate_population(args.entity, args.rows, args.output, fmt, args.seed, args.years)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,465 @@
+"""
+Projection pushdown: compute only the return fields a caller asks for.
+
+compute_basic_return and estimate_ccpc_tax are split into stages, each a
+small function that computes a named value from `rev` and the inputs or
+earlier stages listed in its dependency tuple. Given the requested fields,
+plan() walks the dependencies back to the inputs and keeps only the stages
+that feed them, in order. The plan is resolved once into a list of steps,
+each calling its stage with the values it depends on, and cached per field
+set, so a call runs just those functions. Asking for total_tax_payable, for
+example, skips the marginal rate (two bracket lookups, and a LookupError for
+an income between two brackets), the average rate and the after-tax income,
+and allocates no return object.
+
+Scalar stages call the same IndividualRevenue / CorporateRevenue methods as
+the full calculation, and batch stages the same batch kernels, so projected
+values equal the corresponding fields of the full return exactly. Any stage
+can be requested, including intermediates such as basic_federal_tax or
+non_refundable_tax_credits.
+"""
+
+from operator import itemgetter
+
+INDIVIDUAL_INPUTS = (
+    "employment_income",
+    "ucc_benefit",
+    "ei_benefits",
+    "investment_income",
+    "rrsp_contribution",
+    "medical_expenses",
+    "self_employed",
+)
+CORPORATE_INPUTS = ("revenue", "cpp_contributions", "deductions", "tax_credits")
+
+
+def _divide(numerator, denominator):
+    import numpy as np
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return numerator / denominator
+
+
+# Individual stages, in compute_basic_return order
+
+
+def _cpp_contribution(rev, employment_income, self_employed):
+    return rev.calculate_cpp(employment_income, self_employed)
+
+
+def _canada_employment_amount(rev, employment_income):
+    return rev.cra.get_canada_employment_amount(employment_income)
+
+
+def _federal_brackets(rev):
+    return rev.cra.get_federal_bracket_table()
+
+
+def _provincial_brackets(rev):
+    return rev.cra.get_provincial_bracket_table()
+
+
+def _total_income(rev, employment_income, ucc_benefit, ei_benefits, investment_income):
+    return rev.calculate_total_income(employment_income, ucc_benefit, ei_benefits,
+                                      investment_income)
+
+
+def _taxable_income(rev, total_income, rrsp_contribution):
+    return rev.calculate_net_income(total_income,
+                                    rev.calculate_employment_deductions(rrsp_contribution))
+
+
+def _basic_federal_tax(rev, taxable_income, federal_brackets):
+    return rev.compute_federal_tax(taxable_income, federal_brackets)
+
+
+def _provincial_tax(rev, taxable_income, provincial_brackets):
+    return rev.compute_provincial_tax(taxable_income, provincial_brackets,
+                                      rev.cra.get_provincial_bpa())
+
+
+def _marginal_tax_rate(rev, taxable_income, federal_brackets, provincial_brackets):
+    return rev._compute_margin_tax_rate(taxable_income, federal_brackets, provincial_brackets)
+
+
+def _non_refundable_tax_credits(rev, taxable_income, federal_brackets, cpp_contribution,
+                                canada_employment_amount, ei_benefits, medical_expenses):
+    return rev.compute_non_refundable_tax_credits(
+        taxable_income, rev.bpa, federal_brackets, cpp_contribution, canada_employment_amount,
+        ei_benefits, medical_expenses, taxable_income,
+    )
+
+
+def _net_federal_tax(rev, basic_federal_tax, non_refundable_tax_credits):
+    return rev.compute_net_federal_tax(basic_federal_tax, non_refundable_tax_credits)
+
+
+def _total_tax_payable(rev, net_federal_tax, provincial_tax):
+    return net_federal_tax + provincial_tax
+
+
+def _after_tax_income(rev, employment_income, total_tax_payable):
+    return employment_income - total_tax_payable
+
+
+def _avg_tax_rate(rev, total_tax_payable, employment_income):
+    return total_tax_payable / employment_income
+
+
+# Batch overrides: the batch kernels on float64 columns (see batch)
+
+
+def _cpp_contribution_batch(rev, employment_income, self_employed):
+    import batch
+
+    return batch.cpp_contribution(rev, employment_income, self_employed)
+
+
+def _canada_employment_amount_batch(rev, employment_income):
+    import batch
+
+    return batch.canada_employment_amount(rev.cra, employment_income)
+
+
+def _total_income_batch(rev, employment_income, ucc_benefit, ei_benefits, investment_income):
+    return employment_income + ucc_benefit + ei_benefits + investment_income
+
+
+def _taxable_income_batch(rev, total_income, rrsp_contribution):
+    return total_income - rrsp_contribution
+
+
+def _basic_federal_tax_batch(rev, taxable_income, federal_brackets):
+    return federal_brackets.tax_array(taxable_income)
+
+
+def _provincial_tax_batch(rev, taxable_income, provincial_brackets):
+    import batch
+
+    return batch.provincial_tax(taxable_income, provincial_brackets,
+                                rev.cra.get_provincial_bpa())
+
+
+def _marginal_tax_rate_batch(rev, taxable_income, federal_brackets, provincial_brackets):
+    return (federal_brackets.marginal_rate_array(taxable_income)
+            + provincial_brackets.marginal_rate_array(taxable_income))
+
+
+def _non_refundable_tax_credits_batch(rev, taxable_income, federal_brackets, cpp_contribution,
+                                      canada_employment_amount, ei_benefits, medical_expenses):
+    import batch
+
+    return batch.non_refundable_tax_credits(
+        rev, taxable_income, federal_brackets, cpp_contribution, canada_employment_amount,
+        ei_benefits, medical_expenses, taxable_income,
+    )
+
+
+def _net_federal_tax_batch(rev, basic_federal_tax, non_refundable_tax_credits):
+    import numpy as np
+
+    return np.maximum(0.0, basic_federal_tax - non_refundable_tax_credits)
+
+
+def _avg_tax_rate_batch(rev, total_tax_payable, employment_income):
+    return _divide(total_tax_payable, employment_income)
+
+
+# Corporate stages, in estimate_ccpc_tax order
+
+
+def _taxable_revenue(rev, revenue, deductions):
+    return rev.calculate_ccpc_taxable_revenue(revenue, deductions)
+
+
+def _federal_tax_rate(rev):
+    return rev.cra.get_federal_corporate_tax(is_small_business=True)
+
+
+def _provincial_tax_rate(rev):
+    return rev.cra.get_provincial_corporate_tax(is_small_business=True)
+
+
+def _corporate_net_federal_tax(rev, taxable_revenue, federal_tax_rate):
+    return taxable_revenue * federal_tax_rate
+
+
+def _corporate_provincial_tax(rev, taxable_revenue, provincial_tax_rate):
+    return taxable_revenue * provincial_tax_rate
+
+
+def _tax_rate(rev, federal_tax_rate, provincial_tax_rate):
+    return federal_tax_rate + provincial_tax_rate
+
+
+def _corporate_cpp_contribution(rev, cpp_contributions):
+    return sum(cpp_contributions)
+
+
+def _corporate_total_tax_payable(rev, taxable_revenue, tax_rate, cpp_contribution, tax_credits):
+    return rev.calculate_ccpc_tax_reduction((taxable_revenue * tax_rate) + cpp_contribution,
+                                            tax_credits)
+
+
+def _corporate_avg_tax_rate(rev, total_tax_payable, revenue):
+    return total_tax_payable / revenue
+
+
+def _after_tax_revenue(rev, revenue, total_tax_payable):
+    return revenue - total_tax_payable
+
+
+# Batch rows carry the already-summed CPP; tax_rate is output as a column
+
+
+def _corporate_cpp_contribution_batch(rev, cpp_contributions):
+    return cpp_contributions
+
+
+def _tax_rate_batch(rev, revenue, federal_tax_rate, provincial_tax_rate):
+    import numpy as np
+
+    return np.full(revenue.shape, federal_tax_rate + provincial_tax_rate)
+
+
+def _corporate_total_tax_payable_batch(rev, taxable_revenue, federal_tax_rate,
+                                       provincial_tax_rate, cpp_contribution, tax_credits):
+    return (taxable_revenue * (federal_tax_rate + provincial_tax_rate) + cpp_contribution) \
+        - tax_credits
+
+
+def _corporate_avg_tax_rate_batch(rev, total_tax_payable, revenue):
+    return _divide(total_tax_payable, revenue)
+
+
+# stage -> (dependencies, function called with rev and the dependencies in order)
+_INDIVIDUAL_STAGES = {
+    "cpp_contribution": (("employment_income", "self_employed"), _cpp_contribution),
+    "canada_employment_amount": (("employment_income",), _canada_employment_amount),
+    "federal_brackets": ((), _federal_brackets),
+    "provincial_brackets": ((), _provincial_brackets),
+    "total_income": (
+        ("employment_income", "ucc_benefit", "ei_benefits", "investment_income"),
+        _total_income,
+    ),
+    "taxable_income": (("total_income", "rrsp_contribution"), _taxable_income),
+    "basic_federal_tax": (("taxable_income", "federal_brackets"), _basic_federal_tax),
+    "provincial_tax": (("taxable_income", "provincial_brackets"), _provincial_tax),
+    "marginal_tax_rate": (
+        ("taxable_income", "federal_brackets", "provincial_brackets"),
+        _marginal_tax_rate,
+    ),
+    "non_refundable_tax_credits": (
+        ("taxable_income", "federal_brackets", "cpp_contribution", "canada_employment_amount",
+         "ei_benefits", "medical_expenses"),
+        _non_refundable_tax_credits,
+    ),
+    "net_federal_tax": (("basic_federal_tax", "non_refundable_tax_credits"), _net_federal_tax),
+    "total_tax_payable": (("net_federal_tax", "provincial_tax"), _total_tax_payable),
+    "after_tax_income": (("employment_income", "total_tax_payable"), _after_tax_income),
+    "avg_tax_rate": (("total_tax_payable", "employment_income"), _avg_tax_rate),
+}
+
+_INDIVIDUAL_BATCH_STAGES = {
+    **_INDIVIDUAL_STAGES,
+    "cpp_contribution": (("employment_income", "self_employed"), _cpp_contribution_batch),
+    "canada_employment_amount": (("employment_income",), _canada_employment_amount_batch),
+    "total_income": (
+        ("employment_income", "ucc_benefit", "ei_benefits", "investment_income"),
+        _total_income_batch,
+    ),
+    "taxable_income": (("total_income", "rrsp_contribution"), _taxable_income_batch),
+    "basic_federal_tax": (("taxable_income", "federal_brackets"), _basic_federal_tax_batch),
+    "provincial_tax": (("taxable_income", "provincial_brackets"), _provincial_tax_batch),
+    "marginal_tax_rate": (
+        ("taxable_income", "federal_brackets", "provincial_brackets"),
+        _marginal_tax_rate_batch,
+    ),
+    "non_refundable_tax_credits": (
+        ("taxable_income", "federal_brackets", "cpp_contribution", "canada_employment_amount",
+         "ei_benefits", "medical_expenses"),
+        _non_refundable_tax_credits_batch,
+    ),
+    "net_federal_tax": (
+        ("basic_federal_tax", "non_refundable_tax_credits"),
+        _net_federal_tax_batch,
+    ),
+    "avg_tax_rate": (("total_tax_payable", "employment_income"), _avg_tax_rate_batch),
+}
+
+_CORPORATE_STAGES = {
+    "taxable_revenue": (("revenue", "deductions"), _taxable_revenue),
+    "federal_tax_rate": ((), _federal_tax_rate),
+    "provincial_tax_rate": ((), _provincial_tax_rate),
+    "net_federal_tax": (("taxable_revenue", "federal_tax_rate"), _corporate_net_federal_tax),
+    "provincial_tax": (("taxable_revenue", "provincial_tax_rate"), _corporate_provincial_tax),
+    "tax_rate": (("federal_tax_rate", "provincial_tax_rate"), _tax_rate),
+    "cpp_contribution": (("cpp_contributions",), _corporate_cpp_contribution),
+    "total_tax_payable": (
+        ("taxable_revenue", "tax_rate", "cpp_contribution", "tax_credits"),
+        _corporate_total_tax_payable,
+    ),
+    "avg_tax_rate": (("total_tax_payable", "revenue"), _corporate_avg_tax_rate),
+    "after_tax_revenue": (("revenue", "total_tax_payable"), _after_tax_revenue),
+}
+
+_CORPORATE_BATCH_STAGES = {
+    **_CORPORATE_STAGES,
+    "cpp_contribution": (("cpp_contributions",), _corporate_cpp_contribution_batch),
+    "tax_rate": (("revenue", "federal_tax_rate", "provincial_tax_rate"), _tax_rate_batch),
+    "total_tax_payable": (
+        ("taxable_revenue", "federal_tax_rate", "provincial_tax_rate", "cpp_contribution",
+         "tax_credits"),
+        _corporate_total_tax_payable_batch,
+    ),
+    "avg_tax_rate": (("total_tax_payable", "revenue"), _corporate_avg_tax_rate_batch),
+}
+
+_ENTITIES = {
+    "individual": (INDIVIDUAL_INPUTS, _INDIVIDUAL_STAGES, _INDIVIDUAL_BATCH_STAGES),
+    "corporation": (CORPORATE_INPUTS, _CORPORATE_STAGES, _CORPORATE_BATCH_STAGES),
+}
+
+# (entity, batch, requested) -> compiled function
+_COMPILED = {}
+
+
+def fields(entity):
+    """Every field that can be requested for an entity: its inputs and stages."""
+    inputs, stages, _ = _ENTITIES[entity]
+    return inputs + tuple(stages)
+
+
+def plan(entity, requested, batch=False):
+    """Stage names needed for the requested fields, in dependency order."""
+    inputs, scalar_stages, batch_stages = _ENTITIES[entity]
+    stages = batch_stages if batch else scalar_stages
+    unknown = [f for f in requested if f not in stages and f not in inputs]
+    if unknown:
+        raise ValueError(
+            f"Unknown {entity} field(s) {unknown}. Must be one of {list(fields(entity))}"
+        )
+    order = []
+
+    def visit(name):
+        if name in inputs or name in order:
+            return
+        for dependency in stages[name][0]:
+            visit(dependency)
+        order.append(name)
+
+    for name in requested:
+        visit(name)
+    return tuple(order)
+
+
+def _bind(stage, slots):
+    """stage as a function of (rev, values) taking its arguments from the given value slots."""
+    if not slots:
+        return lambda rev, values: stage(rev)
+    if len(slots) == 1:
+        (i,) = slots
+        return lambda rev, values: stage(rev, values[i])
+    if len(slots) == 2:
+        i, j = slots
+        return lambda rev, values: stage(rev, values[i], values[j])
+    gather = itemgetter(*slots)
+    return lambda rev, values: stage(rev, *gather(values))
+
+
+def _compile(entity, requested, batch=False):
+    """The function computing the requested fields from rev and the inputs (cached)."""
+    key = (entity, batch, requested)
+    fn = _COMPILED.get(key)
+    if fn is not None:
+        return fn
+    inputs, scalar_stages, batch_stages = _ENTITIES[entity]
+    stages = batch_stages if batch else scalar_stages
+    # values are held in a list: the inputs, then each stage's result in plan order
+    slots = {name: i for i, name in enumerate(inputs)}
+    steps = []
+    for name in plan(entity, requested, batch):
+        dependencies, stage = stages[name]
+        steps.append(_bind(stage, tuple(slots[d] for d in dependencies)))
+        slots[name] = len(slots)
+    results = tuple((name, slots[name]) for name in requested)
+
+    def project(rev, *args):
+        values = list(args)
+        for step in steps:
+            values.append(step(rev, values))
+        return {name: values[i] for name, i in results}
+
+    fn = _COMPILED[key] = project
+    return fn
+
+
+def compute_basic_return_fields(
+    rev,
+    requested,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """{field: value} for the requested fields of IndividualRevenue `rev`'s return."""
+    return _compile("individual", tuple(requested))(
+        rev,
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+        self_employed,
+    )
+
+
+def compute_basic_return_fields_batch(
+    rev,
+    requested,
+    employment_income,
+    ucc_benefit,
+    ei_benefits,
+    investment_income,
+    rrsp_contribution,
+    medical_expenses,
+    self_employed,
+):
+    """Columnar compute_basic_return_fields: {field: float64 array}; scalars broadcast."""
+    import numpy as np
+
+    from batch import _columns
+
+    amounts = _columns(
+        employment_income,
+        ucc_benefit,
+        ei_benefits,
+        investment_income,
+        rrsp_contribution,
+        medical_expenses,
+    )
+    self_employed = np.broadcast_to(np.asarray(self_employed, dtype=bool), amounts[0].shape)
+    return _compile("individual", tuple(requested), batch=True)(rev, *amounts, self_employed)
+
+
+def estimate_ccpc_tax_fields(rev, requested, revenue, cpp_contributions, deductions, tax_credits):
+    """{field: value} for the requested fields of CorporateRevenue `rev`'s estimate."""
+    return _compile("corporation", tuple(requested))(
+        rev, revenue, cpp_contributions, deductions, tax_credits
+    )
+
+
+def estimate_ccpc_tax_fields_batch(rev, requested, revenue, cpp_contribution, deductions,
+                                   tax_credits):
+    """
+    Columnar estimate_ccpc_tax_fields: {field: float64 array}. cpp_contribution
+    is the summed CPP per row.
+    """
+    from batch import _columns
+
+    columns = _columns(revenue, cpp_contribution, deductions, tax_credits)
+    return _compile("corporation", tuple(requested), batch=True)(rev, *columns)
@@ -0,0 +1,183 @@
+"""
+Persistent SQLite cache of batch results, for re-running mostly unchanged batches.
+
+Each entry maps a hash of one record's normalized inputs (tax year, amounts,
+flags and the engine used) to its unrounded result fields, stored as packed
+float64s, under the CRA config version hash it was computed with. Opening a
+cache deletes every entry of another config version, so editing
+cra_config.json can never serve a stale result. Lookups and inserts take a
+whole chunk of keys at a time.
+
+    python src/driver.py batch individual --input q1.csv --cache results.sqlite
+    python src/driver.py cache results.sqlite
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+import struct
+import sys
+from pathlib import Path
+
+# Bump when the key or value encoding changes; older caches are emptied
+SCHEMA_VERSION = 1
+ENTITIES = ("individual", "corporation")
+
+# Parameters per "IN (...)" query, below SQLite's bound-variable limit
+_LOOKUP_BATCH = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    entity TEXT NOT NULL,
+    key BLOB NOT NULL,
+    config_version TEXT NOT NULL,
+    result BLOB NOT NULL,
+    PRIMARY KEY (entity, key, config_version)
+) WITHOUT ROWID;
+"""
+
+
+def input_key(inputs, cents=False):
+    """16-byte key for a tuple of numeric inputs (year first) and the engine."""
+    packed = struct.pack(f"<?{len(inputs)}d", cents, *inputs)
+    return hashlib.blake2b(packed, digest_size=16).digest()
+
+
+def _pack(values):
+    return struct.pack(f"<{len(values)}d", *values)
+
+
+def _unpack(blob):
+    return struct.unpack(f"<{len(blob) // 8}d", blob)
+
+
+class ResultCache:
+    """
+    An open cache file for one config version (default: the current one).
+    Use as a context manager or call close().
+    """
+
+    def __init__(self, path, config_version=None):
+        if config_version is None:
+            from cra import config_version as current_version
+
+            config_version = current_version()
+        self.path = Path(path)
+        self.config_version = config_version
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self.invalidated = self._invalidate()
+
+    def _invalidate(self):
+        """Drop entries of other config versions (or of an older schema)."""
+        with self._conn:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE name = 'schema'"
+            ).fetchone()
+            if row is None or int(row[0]) != SCHEMA_VERSION:
+                removed = self._conn.execute("DELETE FROM results").rowcount
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (str(SCHEMA_VERSION),)
+                )
+            else:
+                removed = self._conn.execute(
+                    "DELETE FROM results WHERE config_version != ?", (self.config_version,)
+                ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('config_version', ?)",
+                (self.config_version,),
+            )
+        return removed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def get_many(self, entity, keys):
+        """{key: result values} for the keys that are cached; counts hits and misses."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), _LOOKUP_BATCH):
+            batch = keys[i:i + _LOOKUP_BATCH]
+            rows = self._conn.execute(
+                "SELECT key, result FROM results WHERE entity = ? AND config_version = ? "
+                f"AND key IN ({','.join('?' * len(batch))})",
+                (entity, self.config_version, *batch),
+            )
+            found.update((key, _unpack(result)) for key, result in rows)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, entity, items):
+        """Store (key, result values) pairs in one transaction."""
+        rows = [(entity, key, self.config_version, _pack(values)) for key, values in items]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows)
+        self.inserts += len(rows)
+
+    def clear(self):
+        with self._conn:
+            self._conn.execute("DELETE FROM results")
+        self._conn.execute("VACUUM")
+
+    def stats(self):
+        """Entry counts, file size and this session's hit/miss/insert counters."""
+        entries = dict.fromkeys(ENTITIES, 0)
+        entries.update(self._conn.execute(
+            "SELECT entity, COUNT(*) FROM results GROUP BY entity"
+        ).fetchall())
+        lookups = self.hits + self.misses
+        return {
+            "path": str(self.path),
+            "config_version": self.config_version,
+            "entries": entries,
+            "size_bytes": self.path.stat().st_size if self.path.exists() else 0,
+            "hits": self.hits,
+            "misses": self.misses,
+            "inserts": self.inserts,
+            "invalidated": self.invalidated,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="driver.py cache",
+        description="Report on (or clear) a batch result cache. Opening it drops entries "
+        "computed with another CRA config version.",
+    )
+    parser.add_argument("path", help="Cache file (as given to 'driver.py batch --cache')")
+    parser.add_argument(
+        "--clear",
+        action="store_true",
+        help="Delete every cached result",
+    )
+    args = parser.parse_args(argv)
+    if not Path(args.path).exists():
+        sys.exit(f"cache: {args.path} does not exist")
+    with ResultCache(args.path) as cache:
+        if args.clear:
+            cache.clear()
+        print(json.dumps(cache.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
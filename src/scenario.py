@@ -0,0 +1,459 @@
+"""
+Scenario grids for the owner-manager model in taxcalc.py.
+
+A scenario file (JSON, or YAML when PyYAML is installed) declares the tax
+year and an axis of values for each parameter of the model: CCPC revenue,
+each spouse's salary and RRSP contribution, the spouse's monthly UCCB, the
+number of months the disbursement is spread over and the MRR it is compared
+with. An axis is a number, a list of numbers or a {"start", "stop", "step"}
+range (stop included):
+
+    {
+      "year": 2024,
+      "revenue": [158764.96, 215000],
+      "primary_salary": {"start": 0, "stop": 150000, "step": 1000},
+      "spouse_salary": {"start": 0, "stop": 100000, "step": 1000},
+      "primary_rrsp": [0, 34000],
+      "monthly_uccb": 201.18,
+      "months": [8.5, 12],
+      "mrr": 18000,
+      "rank_by": "total_after_tax",
+      "top": 10
+    }
+
+Every combination of the axes is evaluated. Individual returns depend only
+on a person's salary, RRSP (and for the spouse, UCCB), so each distinct one
+is computed once, with the vectorized batch engine, and shared by every
+revenue, months and MRR value it is combined with; the corporate tax is then
+computed per chunk of the product, also vectorized. Scenarios can be
+streamed to a CSV file, and the best `top` are kept as a ranked summary.
+
+    python src/driver.py scenario grid.json --output scenarios.csv
+"""
+
+import argparse
+import json
+import sys
+import time
+from functools import partial
+from pathlib import Path
+
+import numpy as np
+
+import batch_io
+from cra import get_config_registry
+from optimizer import grid_axis
+
+# Axes in scenario order; the last varies fastest
+AXES = (
+    "revenue",
+    "primary_salary",
+    "spouse_salary",
+    "primary_rrsp",
+    "spouse_rrsp",
+    "monthly_uccb",
+    "months",
+    "mrr",
+)
+_DEFAULTS = {
+    "primary_salary": 0.0,
+    "spouse_salary": 0.0,
+    "primary_rrsp": 0.0,
+    "spouse_rrsp": 0.0,
+    "monthly_uccb": 0.0,
+    "months": 12.0,
+    "mrr": float("nan"),
+}
+RESULT_FIELDS = (
+    "primary_tax",
+    "spouse_tax",
+    "corporate_tax",
+    "total_tax",
+    "household_after_tax",
+    "total_after_tax",
+    "total_rrsp",
+    "monthly_disbursement",
+    "left_over",
+)
+SCENARIO_FIELDS = AXES + RESULT_FIELDS
+
+# rank_by metric -> 1 to rank lowest first, -1 for highest first
+RANKINGS = {
+    "total_tax": 1,
+    "total_after_tax": -1,
+    "household_after_tax": -1,
+    "left_over": -1,
+}
+_OPTIONS = ("year", "rank_by", "top", "feasible_only")
+DEFAULT_TOP = 10
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+_INDIVIDUAL_FIELDS = ("total_tax_payable", "cpp_contribution", "after_tax_income")
+_CORPORATE_FIELDS = ("total_tax_payable", "after_tax_revenue")
+
+
+def load_scenario(path):
+    """The scenario dict from a .json file, or a .yaml/.yml file (needs PyYAML)."""
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        if path.suffix.lower() not in (".yaml", ".yml"):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError(f"{path}: reading YAML scenario files needs PyYAML") from None
+        return yaml.safe_load(f)
+
+
+def _axis_values(name, spec):
+    """Sorted distinct values of one axis spec."""
+    if spec is None:
+        raise ValueError(f"{name}: missing axis")
+    if isinstance(spec, dict):
+        unknown = set(spec) - {"start", "stop", "step"}
+        if unknown or "start" not in spec or "stop" not in spec:
+            raise ValueError(f"{name}: a range needs 'start', 'stop' and optionally 'step'")
+        values = grid_axis((float(spec["start"]), float(spec["stop"])),
+                           float(spec.get("step", 0)))
+    else:
+        values = np.unique(np.atleast_1d(np.asarray(spec, dtype=np.float64)))
+    if values.ndim != 1 or not len(values):
+        raise ValueError(f"{name}: an axis needs at least one value")
+    return values
+
+
+class ScenarioGrid:
+    """
+    The cartesian product of a scenario file's axes for one tax year. axes
+    maps every name in AXES to its sorted values; a scenario's index runs
+    over them in AXES order with the last axis varying fastest.
+    """
+
+    __slots__ = ("year", "axes", "rank_by", "top", "feasible_only")
+
+    def __init__(self, year, axes, rank_by="total_after_tax", top=DEFAULT_TOP,
+                 feasible_only=False):
+        if rank_by not in RANKINGS:
+            raise ValueError(f"Unknown rank_by {rank_by!r}. Must be one of {list(RANKINGS)}")
+        self.year = int(year)
+        self.axes = {name: _axis_values(name, axes.get(name, _DEFAULTS.get(name)))
+                     for name in AXES}
+        if (self.axes["months"] <= 0).any():
+            raise ValueError("months: every value must be positive")
+        if rank_by == "left_over" and np.isnan(self.axes["mrr"]).all():
+            raise ValueError("Ranking by left_over needs an mrr axis")
+        self.rank_by = rank_by
+        self.top = int(top)
+        self.feasible_only = bool(feasible_only)
+
+    @classmethod
+    def from_dict(cls, spec):
+        unknown = set(spec) - set(AXES) - set(_OPTIONS)
+        if unknown:
+            raise ValueError(
+                f"Unknown scenario key(s) {sorted(unknown)}. Must be among {list(AXES + _OPTIONS)}"
+            )
+        if "year" not in spec or "revenue" not in spec:
+            raise ValueError("A scenario needs a 'year' and a 'revenue' axis")
+        options = {k: spec[k] for k in ("rank_by", "top", "feasible_only") if k in spec}
+        return cls(spec["year"], {k: spec[k] for k in AXES if k in spec}, **options)
+
+    @property
+    def shape(self):
+        return tuple(len(self.axes[name]) for name in AXES)
+
+    def __len__(self):
+        size = 1
+        for n in self.shape:
+            size *= n
+        return size
+
+    def _people(self):
+        """
+        Unique individual returns: the primary earner's over (salary, RRSP)
+        and the spouse's over (salary, RRSP, UCCB), each as flat columns.
+        """
+        from individual import IndividualRevenue
+
+        rev = IndividualRevenue(self.year)
+        axes = self.axes
+        people = []
+        for salary, rrsp, uccb in (
+            (axes["primary_salary"], axes["primary_rrsp"], np.zeros(1)),
+            (axes["spouse_salary"], axes["spouse_rrsp"], axes["monthly_uccb"] * 12),
+        ):
+            s, r, u = (x.ravel() for x in np.meshgrid(salary, rrsp, uccb, indexing="ij"))
+            people.append(
+                (s, r, rev.compute_basic_return_fields_batch(_INDIVIDUAL_FIELDS, s, u, 0.0, 0.0,
+                                                             r, 0.0, False))
+            )
+        return people
+
+    def chunks(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Yield (first scenario index, {field: array}) for consecutive chunks of
+        about chunk_size scenarios, with every field in SCENARIO_FIELDS.
+        """
+        from corporate import CorporateRevenue
+
+        corp = CorporateRevenue(self.year)
+        (sa, ra, a), (sb, rb, b) = self._people()
+        axes = self.axes
+        core_shape = self.shape[:6]
+        months, mrr = (x.ravel() for x in np.meshgrid(axes["months"], axes["mrr"],
+                                                      indexing="ij"))
+        tail = len(months)
+        core_size = len(self) // tail
+        step = max(1, chunk_size // tail)
+        for start in range(0, core_size, step):
+            r, ps, ss, pr, sr, u = np.unravel_index(
+                np.arange(start, min(start + step, core_size)), core_shape
+            )
+            # row of each person's return in _people's meshgrid order
+            ia = ps * len(axes["primary_rrsp"]) + pr
+            ib = (ss * len(axes["spouse_rrsp"]) + sr) * len(axes["monthly_uccb"]) + u
+            revenue = axes["revenue"][r]
+            corporate = corp.estimate_ccpc_tax_fields_batch(
+                _CORPORATE_FIELDS,
+                revenue - sa[ia] - sb[ib],
+                a["cpp_contribution"][ia] + b["cpp_contribution"][ib],
+                0.0,
+                0.0,
+            )
+            core = {
+                "revenue": revenue,
+                "primary_salary": sa[ia],
+                "spouse_salary": sb[ib],
+                "primary_rrsp": ra[ia],
+                "spouse_rrsp": rb[ib],
+                "monthly_uccb": axes["monthly_uccb"][u],
+                "primary_tax": a["total_tax_payable"][ia],
+                "spouse_tax": b["total_tax_payable"][ib],
+                "corporate_tax": corporate["total_tax_payable"],
+            }
+            core["total_tax"] = core["primary_tax"] + core["spouse_tax"] + core["corporate_tax"]
+            core["household_after_tax"] = a["after_tax_income"][ia] + b["after_tax_income"][ib]
+            core["total_after_tax"] = core["household_after_tax"] + corporate["after_tax_revenue"]
+            core["total_rrsp"] = core["primary_rrsp"] + core["spouse_rrsp"]
+            # months and MRR only scale and shift the disbursement: broadcast them last
+            out = {name: np.repeat(values, tail) for name, values in core.items()}
+            out["months"] = np.tile(months, len(revenue))
+            out["mrr"] = np.tile(mrr, len(revenue))
+            out["monthly_disbursement"] = (
+                out["household_after_tax"] + out["total_tax"] + out["total_rrsp"]
+            ) / out["months"]
+            out["left_over"] = out["mrr"] - out["monthly_disbursement"]
+            yield start * tail, out
+
+    @staticmethod
+    def feasible(columns):
+        """Mask of scenarios whose salaries fit in the revenue and disbursement in the MRR."""
+        return (columns["primary_salary"] + columns["spouse_salary"] <= columns["revenue"]) & ~(
+            columns["left_over"] < 0
+        )
+
+
+def _merge_top(best, start, columns, keep, rank_by, top):
+    """The `top` best of the current ranking and the kept rows of a chunk, ties by index."""
+    rows = np.flatnonzero(keep)
+    key = RANKINGS[rank_by] * columns[rank_by][rows]
+    if len(rows) > top:
+        # every row tied with the top-th best survives to the exact sort below
+        threshold = np.partition(key, top - 1)[top - 1]
+        rows, key = rows[key <= threshold], key[key <= threshold]
+    chunk = {name: columns[name][rows] for name in SCENARIO_FIELDS}
+    chunk["index"] = rows + start
+    chunk["key"] = key
+    if best is not None:
+        chunk = {name: np.concatenate((best[name], chunk[name])) for name in chunk}
+    order = np.lexsort((chunk["index"], chunk["key"]))[:top]
+    return {name: values[order] for name, values in chunk.items()}
+
+
+_OUTPUT_COLUMNS = ("index",) + SCENARIO_FIELDS
+
+
+def _csv_formats():
+    formats = ["%.2f"] * len(SCENARIO_FIELDS)
+    formats[AXES.index("months")] = "%g"
+    return ["%d"] + formats
+
+
+def _write_csv_chunk(stream, formats, start, columns):
+    values = [np.arange(start, start + len(columns["revenue"]))]
+    values += [columns[name] for name in SCENARIO_FIELDS]
+    stream.write(batch_io.format_csv_rows(values, formats))
+
+
+def _write_binary_chunk(dst, start, columns):
+    stop = start + len(columns["revenue"])
+    dst["index"][start:stop] = np.arange(start, stop)
+    for name in SCENARIO_FIELDS:
+        dst[name][start:stop] = columns[name]
+
+
+def run_scenarios(grid, output_path=None, fmt=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Evaluate every scenario of a ScenarioGrid. With output_path ("-" for
+    stdout), every scenario is also streamed there, after its index, as CSV
+    or, when fmt (default: from the extension) is binary, as a column file.
+    Returns the ranked summary: a list of the grid.top best scenario dicts,
+    each with its "index" into the grid.
+    """
+    if grid.top < 1:
+        raise ValueError(f"top must be at least 1, got {grid.top}")
+    dst = write = None
+    if output_path is not None:
+        fmt = fmt or batch_io.detect_format(output_path)
+        if fmt == batch_io.BINARY:
+            import binary_io
+            from cra import config_version
+
+            if output_path == "-":
+                raise ValueError("The binary format needs an output file path")
+            dst = binary_io.create_binary(output_path, "scenario", _OUTPUT_COLUMNS, len(grid),
+                                          config_version())
+            write = partial(_write_binary_chunk, dst)
+        elif fmt == "csv":
+            dst = batch_io.open_output(output_path)
+            dst.write(",".join(_OUTPUT_COLUMNS) + "\r\n")
+            write = partial(_write_csv_chunk, dst, _csv_formats())
+        else:
+            raise ValueError(f"Scenarios are written as csv or binary, not {fmt!r}")
+    best = None
+    try:
+        for start, columns in grid.chunks(chunk_size):
+            if write is not None:
+                write(start, columns)
+            if grid.feasible_only:
+                keep = grid.feasible(columns)
+            else:
+                keep = columns[grid.rank_by] == columns[grid.rank_by]
+            best = _merge_top(best, start, columns, keep, grid.rank_by, grid.top)
+        if dst is not None:
+            dst.flush()
+    finally:
+        if dst is not None and dst is not sys.stdout:
+            dst.close()
+    if best is None:
+        return []
+    return [
+        {"index": int(best["index"][k]), **{name: float(best[name][k]) for name in SCENARIO_FIELDS}}
+        for k in range(len(best["index"]))
+    ]
+
+
+def print_summary(grid, ranked, elapsed=None):
+    sizes = " × ".join(f"{len(grid.axes[name])} {name}" for name in AXES
+                       if len(grid.axes[name]) > 1)
+    print(f"Year {grid.year}: {len(grid):,} scenarios ({sizes or 'a single point'})"
+          + (f" in {elapsed:.2f}s" if elapsed is not None else ""))
+    order = "lowest" if RANKINGS[grid.rank_by] > 0 else "highest"
+    scope = "feasible scenarios" if grid.feasible_only else "scenarios"
+    print(f"Top {len(ranked)} {scope} by {grid.rank_by} ({order} first):")
+    print()
+    columns = ("revenue", "primary_salary", "spouse_salary", "primary_rrsp", "spouse_rrsp",
+               "months", "total_tax", "total_after_tax", "monthly_disbursement", "left_over")
+    headers = ("Revenue", "Primary", "Spouse", "P. RRSP", "S. RRSP", "Months", "Total tax",
+               "After tax", "Monthly", "MRR left")
+    print(f"{'#':>3} " + " ".join(f"{h:>12}" for h in headers))
+    for rank, scenario in enumerate(ranked, 1):
+        cells = []
+        for name in columns:
+            value = scenario[name]
+            if value != value:
+                cells.append(f"{'-':>12}")
+            elif name == "months":
+                cells.append(f"{value:>12g}")
+            else:
+                cells.append(f"{value:>12,.2f}")
+        print(f"{rank:>3} " + " ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="driver.py scenario",
+        description="Evaluate every combination of a scenario file's revenue, salary, RRSP, "
+        "UCCB, months and MRR axes for the owner-manager model and rank them.",
+    )
+    parser.add_argument("file", help="Scenario file (.json, or .yaml/.yml with PyYAML)")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Also write every scenario to this file ('-' for stdout, as CSV); a .taxcol "
+        "extension writes a binary column file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", batch_io.BINARY),
+        default=None,
+        help="Format of --output (default: from its extension, csv for stdout)",
+    )
+    parser.add_argument(
+        "--rank-by",
+        choices=list(RANKINGS),
+        default=None,
+        help="Metric to rank by (default: the file's rank_by, else total_after_tax)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help=f"Scenarios in the ranked summary (default: the file's top, else {DEFAULT_TOP})",
+    )
+    parser.add_argument(
+        "--feasible-only",
+        action="store_true",
+        help="Rank only scenarios whose salaries fit in the revenue and whose monthly "
+        "disbursement fits in the MRR",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Scenarios evaluated per chunk (bounds memory use)",
+    )
+    parser.add_argument(
+        "--json",
+        action="store_true",
+        help="Print the ranked summary as JSON",
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    if args.top is not None and args.top < 1:
+        parser.error("--top must be at least 1")
+    fmt = args.format or batch_io.detect_format(args.output)
+    if fmt == batch_io.BINARY and args.output in (None, "-"):
+        parser.error("the binary format needs an --output file path")
+    try:
+        spec = load_scenario(args.file)
+        if not isinstance(spec, dict):
+            raise ValueError(f"{args.file}: a scenario file holds one mapping of keys to axes")
+        spec = dict(spec)
+        if args.rank_by is not None:
+            spec["rank_by"] = args.rank_by
+        if args.top is not None:
+            spec["top"] = args.top
+        if args.feasible_only:
+            spec["feasible_only"] = True
+        grid = ScenarioGrid.from_dict(spec)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if grid.year not in {int(y) for y in get_config_registry().years()}:
+        parser.error(f"no CRA config for year {grid.year}")
+    started = time.perf_counter()
+    ranked = run_scenarios(grid, args.output, fmt, args.chunk_size)
+    elapsed = time.perf_counter() - started
+    if args.output == "-":
+        return
+    if args.json:
+        # a missing MRR is null rather than NaN, which is not JSON
+        ranked = [{k: None if v != v else v for k, v in s.items()} for s in ranked]
+        print(json.dumps(ranked, indent=2))
+    else:
+        print_summary(grid, ranked, elapsed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Dense income sweeps: "tax at every income" tables.
+
+For every tax year and self-employed flag, run_sweep() evaluates the
+individual return at income = start, start + step, ..., stop (e.g. every
+dollar from $0 to $1M) with the vectorized batch engine, one chunk of
+incomes at a time, and streams the rows to a CSV file or a binary column
+file (.taxcol). Memory use is bounded by the chunk size, however many rows
+the table has.
+
+    python src/driver.py sweep --years 2023 2024 --output sweep.taxcol
+"""
+
+import argparse
+import math
+import sys
+
+import batch_io
+from cra import config_version, get_config_registry
+from batch_calc import INDIVIDUAL_RETURN_FIELDS, calculate_individual_tax_batch
+
+DEFAULT_START = 0.0
+DEFAULT_STOP = 1_000_000.0
+DEFAULT_STEP = 1.0
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Which self-employed flags to sweep
+SELF_EMPLOYED_CHOICES = {"both": (False, True), "no": (False,), "yes": (True,)}
+
+_KEY_COLUMNS = ("year", "self_employed", "income")
+
+
+def income_count(start, stop, step):
+    """Number of grid points start, start + step, ... up to and including stop."""
+    if step <= 0:
+        raise ValueError(f"Step must be positive, got {step}")
+    if stop < start:
+        raise ValueError(f"Invalid range ({start}, {stop}): stop is below start")
+    # tolerate float noise so that e.g. (0, 1, 0.1) includes 1
+    return math.floor((stop - start) / step + 1e-9) + 1
+
+
+def result_fields(full=False):
+    """Result columns of a sweep; employment_income is the income column itself."""
+    if not full:
+        return ("total_tax_payable",)
+    return tuple(f for f in INDIVIDUAL_RETURN_FIELDS if f != "employment_income")
+
+
+def sweep_chunks(years, self_employed=(False, True), start=DEFAULT_START, stop=DEFAULT_STOP,
+                 step=DEFAULT_STEP, full=False, chunk_size=DEFAULT_CHUNK_SIZE, cents=False):
+    """
+    Yield (year, self_employed, incomes, results) per chunk, in year, flag,
+    income order. results maps each result field to an array.
+    """
+    import numpy as np
+
+    n = income_count(start, stop, step)
+    fields = result_fields(full)
+    for year in years:
+        for flag in self_employed:
+            for a in range(0, n, chunk_size):
+                # index-based grid: no drift from accumulating the step
+                incomes = start + np.arange(a, min(a + chunk_size, n)) * step
+                results = calculate_individual_tax_batch(year, incomes, cents=cents,
+                                                         fields=fields, self_employed=flag)
+                yield year, flag, incomes, {name: results[name] for name in fields}
+
+
+def _csv_formats(fields):
+    return ["%d", "%d", "%.2f"] + ["%.6f" if f.endswith("_rate") else "%.2f" for f in fields]
+
+
+def _write_csv(stream, chunks, fields):
+    import numpy as np
+
+    formats = _csv_formats(fields)
+    stream.write(",".join(_KEY_COLUMNS + fields) + "\r\n")
+    for year, flag, incomes, results in chunks:
+        n = len(incomes)
+        columns = [np.full(n, year), np.full(n, int(flag)), incomes]
+        columns += [results[name] for name in fields]
+        stream.write(batch_io.format_csv_rows(columns, formats))
+    stream.flush()
+
+
+def _write_binary(path, chunks, fields, rows):
+    import binary_io
+
+    with binary_io.create_binary(path, "individual", _KEY_COLUMNS + fields, rows,
+                                 config_version()) as dst:
+        row = 0
+        for year, flag, incomes, results in chunks:
+            end = row + len(incomes)
+            dst["year"][row:end] = year
+            dst["self_employed"][row:end] = flag
+            dst["income"][row:end] = incomes
+            for name in fields:
+                dst[name][row:end] = results[name]
+            row = end
+
+
+def run_sweep(years, output_path=None, fmt=None, self_employed=(False, True),
+              start=DEFAULT_START, stop=DEFAULT_STOP, step=DEFAULT_STEP, full=False,
+              chunk_size=DEFAULT_CHUNK_SIZE, cents=False):
+    """
+    Write the sweep table for years × self_employed × incomes to output_path
+    (stdout if None/"-") as CSV, or as a binary column file when fmt (default:
+    from the extension) is binary. Returns the number of rows.
+    """
+    fmt = fmt or batch_io.detect_format(output_path)
+    if fmt not in ("csv", batch_io.BINARY):
+        raise ValueError(f"Sweeps are written as csv or binary, not {fmt!r}")
+    years = list(years)
+    fields = result_fields(full)
+    rows = len(years) * len(self_employed) * income_count(start, stop, step)
+    chunks = sweep_chunks(years, self_employed, start, stop, step, full, chunk_size, cents)
+    if fmt == batch_io.BINARY:
+        if output_path in (None, "-"):
+            raise ValueError("The binary format needs an output file path")
+        _write_binary(output_path, chunks, fields, rows)
+        return rows
+    dst = batch_io.open_output(output_path)
+    try:
+        _write_csv(dst, chunks, fields)
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="driver.py sweep",
+        description="Write a tax-at-every-income table for individuals: one row per "
+        "year, self-employed flag and income on a fixed grid.",
+    )
+    parser.add_argument(
+        "--years",
+        type=int,
+        nargs="+",
+        required=True,
+        help="Tax years to sweep (e.g. 2023 2024)",
+    )
+    parser.add_argument(
+        "--start",
+        type=float,
+        default=DEFAULT_START,
+        help=f"Lowest income in dollars (default: {DEFAULT_START:,.0f})",
+    )
+    parser.add_argument(
+        "--stop",
+        type=float,
+        default=DEFAULT_STOP,
+        help=f"Highest income in dollars, inclusive (default: {DEFAULT_STOP:,.0f})",
+    )
+    parser.add_argument(
+        "--step",
+        type=float,
+        default=DEFAULT_STEP,
+        help=f"Income step in dollars (default: {DEFAULT_STEP:g})",
+    )
+    parser.add_argument(
+        "--self-employed",
+        choices=list(SELF_EMPLOYED_CHOICES),
+        default="both",
+        help="Self-employed flags to sweep (default: both)",
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Output file (default: stdout, as CSV); a .taxcol extension writes a binary "
+        "column file",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", batch_io.BINARY),
+        default=None,
+        help="Output format (default: from the output file extension, csv for stdout)",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Write every return field instead of only total_tax_payable",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help="Incomes computed per chunk (bounds memory use)",
+    )
+    parser.add_argument(
+        "--cents",
+        action="store_true",
+        help="Use the integer-cents engine: every line rounded to the cent, exact results",
+    )
+    args = parser.parse_args(argv)
+    fmt = args.format or batch_io.detect_format(args.output)
+    if fmt == batch_io.BINARY and args.output == "-":
+        parser.error("the binary format needs an --output file path")
+    unknown = set(args.years) - {int(y) for y in get_config_registry().years()}
+    if unknown:
+        parser.error(f"no CRA config for year(s) {', '.join(map(str, sorted(unknown)))}")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be positive")
+    try:
+        income_count(args.start, args.stop, args.step)
+    except ValueError as e:
+        parser.error(str(e))
+    run_sweep(
+        args.years,
+        output_path=args.output,
+        fmt=fmt,
+        self_employed=SELF_EMPLOYED_CHOICES[args.self_employed],
+        start=args.start,
+        stop=args.stop,
+        step=args.step,
+        full=args.full,
+        chunk_size=args.chunk_size,
+        cents=args.cents,
+    )
+
+
+if __name__ == "__main__":
+    main()
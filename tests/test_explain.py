@@ -0,0 +1,113 @@
+"""
+Parity of the explain trace (explain) with the normal scalar calculation and
+the batch engine, including the rows the scalar path cannot compute.
+"""
+
+from dataclasses import fields
+
+import numpy as np
+import pytest
+
+from corporate import CorporateRevenue
+from cra import get_config_registry
+from data_objects import CorporateReturn, IndividualReturn
+from explain import explain_row
+from individual import IndividualRevenue
+
+YEARS = [int(y) for y in get_config_registry().years()]
+ROWS = 300
+
+
+def _sometimes(rng, n, high, share):
+    return np.round(rng.uniform(0, high, n) * (rng.random(n) < share), 2)
+
+
+def _bracket_gaps(*tables):
+    """An income inside each gap between one bracket's ceiling and the next floor."""
+    return [
+        (ceiling + floor) / 2
+        for table in tables
+        for ceiling, floor in zip(table.ceilings, table.floors[1:])
+        if floor > ceiling
+    ]
+
+
+def _individual_columns(rev, seed=0):
+    rng = np.random.default_rng(seed)
+    cra = rev.cra
+    edges = [0.0] + _bracket_gaps(cra.get_federal_bracket_table(),
+                                  cra.get_provincial_bracket_table())
+    n = ROWS - len(edges)
+    zeros = np.zeros(len(edges))
+    return {
+        "employment_income": np.concatenate([edges, np.round(rng.uniform(1, 400_000, n), 2)]),
+        "ucc_benefit": np.concatenate([zeros, _sometimes(rng, n, 5_000, 0.3)]),
+        "ei_benefits": np.concatenate([zeros, _sometimes(rng, n, 9_000, 0.1)]),
+        "investment_income": np.concatenate([zeros, _sometimes(rng, n, 5_000, 0.3)]),
+        "rrsp_contribution": np.concatenate([zeros, _sometimes(rng, n, 30_000, 0.3)]),
+        "medical_expenses": np.concatenate([zeros, _sometimes(rng, n, 5_000, 0.3)]),
+        "self_employed": np.concatenate([zeros.astype(bool), rng.random(n) < 0.1]),
+    }
+
+
+def _corporate_columns(seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "revenue": np.concatenate([[0.0], np.round(rng.uniform(1, 2_000_000, ROWS - 1), 2)]),
+        "cpp_contribution": np.round(rng.uniform(0, 16_000, ROWS), 2),
+        "deductions": _sometimes(rng, ROWS, 100_000, 0.6),
+        "tax_credits": _sometimes(rng, ROWS, 5_000, 0.1),
+    }
+
+
+def _assert_matches_batch(results, batch, names):
+    for name in names:
+        actual = np.array([getattr(r, name) for r in results])
+        np.testing.assert_allclose(actual, batch[name], rtol=1e-9, atol=1e-9, err_msg=name)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_explain_individual_matches_scalar_and_batch(year):
+    rev = IndividualRevenue(year)
+    columns = _individual_columns(rev)
+    batch = rev.compute_basic_return_batch(**columns)
+    results = [explain_row(rev, i, **columns).result for i in range(ROWS)]
+    _assert_matches_batch(results, batch, [f.name for f in fields(IndividualReturn)])
+
+    # rows the scalar path can compute give exactly its return
+    computable = np.isfinite(batch["avg_tax_rate"]) & np.isfinite(batch["marginal_tax_rate"])
+    assert computable.sum() > ROWS // 2
+    for i in np.flatnonzero(computable):
+        row = {name: column[i].item() for name, column in columns.items()}
+        explanation = rev.explain_basic_return(**row)
+        assert explanation.result == rev.compute_basic_return(**row)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_explain_individual_edge_rows_use_batch_semantics(year):
+    rev = IndividualRevenue(year)
+    columns = _individual_columns(rev)
+    zero_income = explain_row(rev, 0, **columns)
+    assert np.isnan(zero_income.result.avg_tax_rate)
+    assert np.isnan(zero_income["avg_tax_rate"].value)
+    assert '"avg_tax_rate": null' in zero_income.to_json()
+    cra = rev.cra
+    gaps = _bracket_gaps(cra.get_federal_bracket_table(), cra.get_provincial_bracket_table())
+    for i in range(1, len(gaps) + 1):
+        assert np.isnan(explain_row(rev, i, **columns).result.marginal_tax_rate)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_explain_corporate_matches_scalar_and_batch(year):
+    rev = CorporateRevenue(year)
+    columns = _corporate_columns()
+    batch = rev.estimate_ccpc_tax_batch(**columns)
+    results = [explain_row(rev, i, **columns).result for i in range(ROWS)]
+    _assert_matches_batch(results, batch, [f.name for f in fields(CorporateReturn)])
+    assert not np.isfinite(results[0].avg_tax_rate)
+
+    for i in range(1, ROWS):
+        row = {name: column[i].item() for name, column in columns.items()}
+        cpp = [row.pop("cpp_contribution")]
+        explanation = rev.explain_ccpc_tax(cpp_contributions=cpp, **row)
+        assert explanation.result == rev.estimate_ccpc_tax(cpp_contributions=cpp, **row)
@@ -0,0 +1,121 @@
+"""
+Parity of the integer-cents engine (fixed_point) with the float engine, and
+of its batch functions with its scalar ones.
+"""
+
+import numpy as np
+import pytest
+
+import fixed_point
+from corporate import CorporateRevenue
+from cra import get_config_registry
+from fixed_point import (
+    SAFE_CENTS,
+    batch_to_dollars,
+    compute_basic_return_cents,
+    estimate_ccpc_tax_cents,
+    to_cents_array,
+)
+from individual import IndividualRevenue
+
+YEARS = [int(y) for y in get_config_registry().years()]
+# Per-line rounding: a few lines, each off by at most half a cent
+TOLERANCE = 0.05
+MONEY_FIELDS = ("net_federal_tax", "provincial_tax", "cpp_contribution", "total_tax_payable",
+                "after_tax_income", "taxable_income")
+INPUTS = ("employment_income", "ucc_benefit", "ei_benefits", "investment_income",
+          "rrsp_contribution", "medical_expenses")
+
+
+def _sometimes(rng, n, high, share):
+    return np.round(rng.uniform(0, high, n) * (rng.random(n) < share), 2)
+
+
+def _individual_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "employment_income": np.round(rng.uniform(0, 400_000, n), 2),
+        "ucc_benefit": _sometimes(rng, n, 5_000, 0.3),
+        "ei_benefits": _sometimes(rng, n, 9_000, 0.1),
+        "investment_income": _sometimes(rng, n, 5_000, 0.3),
+        "rrsp_contribution": _sometimes(rng, n, 30_000, 0.3),
+        "medical_expenses": _sometimes(rng, n, 5_000, 0.3),
+    }, rng.random(n) < 0.1
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_individual_cents_match_float_engine(year):
+    rev = IndividualRevenue(year)
+    amounts, self_employed = _individual_inputs(20_000)
+    expected = rev.compute_basic_return_batch(**amounts, self_employed=self_employed)
+    cents = rev.compute_basic_return_cents_batch(
+        **{k: to_cents_array(v) for k, v in amounts.items()}, self_employed=self_employed
+    )
+    assert all(cents[name].dtype == np.int64 for name in MONEY_FIELDS)
+    actual = batch_to_dollars(cents)
+    for name in MONEY_FIELDS:
+        np.testing.assert_allclose(actual[name], expected[name], rtol=0, atol=TOLERANCE,
+                                   err_msg=name)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_individual_batch_matches_scalar_to_the_cent(year):
+    rev = IndividualRevenue(year)
+    amounts, self_employed = _individual_inputs(500, seed=1)
+    cents = {k: to_cents_array(v) for k, v in amounts.items()}
+    batch = rev.compute_basic_return_cents_batch(**cents, self_employed=self_employed)
+    for i in range(500):
+        try:
+            tr = compute_basic_return_cents(
+                rev, *(int(cents[k][i]) for k in INPUTS), bool(self_employed[i])
+            )
+        except (LookupError, ZeroDivisionError):
+            continue
+        for name in MONEY_FIELDS:
+            assert batch[name][i] == getattr(tr, name), (name, i)
+
+
+@pytest.mark.parametrize("year", YEARS)
+def test_corporate_cents_match_float_engine(year):
+    rev = CorporateRevenue(year)
+    rng = np.random.default_rng(2)
+    revenue = np.round(rng.uniform(1, 2_000_000, 10_000), 2)
+    cpp = np.round(rng.uniform(0, 16_000, 10_000), 2)
+    deductions = np.round(revenue * rng.uniform(0, 0.3, 10_000), 2)
+    credits = np.round(rng.uniform(0, 5_000, 10_000), 2)
+    expected = rev.estimate_ccpc_tax_batch(revenue, cpp, deductions, credits)
+    cents = rev.estimate_ccpc_tax_cents_batch(
+        *(to_cents_array(v) for v in (revenue, cpp, deductions, credits))
+    )
+    actual = batch_to_dollars(cents)
+    for name in ("net_federal_tax", "provincial_tax", "total_tax_payable", "after_tax_revenue"):
+        np.testing.assert_allclose(actual[name], expected[name], rtol=0, atol=TOLERANCE,
+                                   err_msg=name)
+    scalar = estimate_ccpc_tax_cents(rev, int(cents["revenue"][0]),
+                                     [int(cents["cpp_contribution"][0])],
+                                     int(cents["deductions"][0]), int(cents["tax_credits"][0]))
+    assert scalar.total_tax_payable == cents["total_tax_payable"][0]
+
+
+def test_amounts_beyond_int64_safe_range_stay_exact():
+    rev = IndividualRevenue(YEARS[-1])
+    incomes = np.array([100_000.0, SAFE_CENTS / 100 * 2, 5e12])
+    cents = rev.compute_basic_return_cents_batch(to_cents_array(incomes), 0, 0, 0, 0, 0, False)
+    assert cents["total_tax_payable"].dtype == np.int64
+    for i, income in enumerate(to_cents_array(incomes)):
+        tr = compute_basic_return_cents(rev, int(income), 0, 0, 0, 0, 0, False)
+        assert cents["total_tax_payable"][i] == tr.total_tax_payable
+    expected = rev.compute_basic_return_batch(incomes, 0.0, 0.0, 0.0, 0.0, 0.0, False)
+    np.testing.assert_allclose(batch_to_dollars(cents)["total_tax_payable"],
+                               expected["total_tax_payable"], rtol=0, atol=TOLERANCE)
+
+    corp = CorporateRevenue(YEARS[-1])
+    revenue = to_cents_array([5e12])
+    batch = corp.estimate_ccpc_tax_cents_batch(revenue, 0, 0, 0)
+    scalar = estimate_ccpc_tax_cents(corp, int(revenue[0]), [0], 0, 0)
+    assert batch["total_tax_payable"][0] == scalar.total_tax_payable
+
+
+def test_safe_bound_leaves_headroom_for_rounding():
+    # round_div(2 × cents × RATE_SCALE) over a credit base of several amounts
+    assert 8 * SAFE_CENTS * fixed_point.RATE_SCALE < 2**63
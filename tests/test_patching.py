@@ -0,0 +1,49 @@
+"""memo and instrumentation wrap the same methods; any disable order must work."""
+
+from itertools import permutations
+
+import pytest
+
+import instrumentation
+import memo
+from corporate import CorporateRevenue
+from individual import IndividualRevenue
+
+LAYERS = {"memo": memo, "instrumentation": instrumentation}
+METHODS = [
+    (IndividualRevenue, "compute_basic_return"),
+    (IndividualRevenue, "calculate_cpp"),
+    (CorporateRevenue, "estimate_ccpc_tax"),
+]
+
+
+def _timed_calls():
+    return instrumentation.report()["stages"]["compute_basic_return"]["calls"]
+
+
+@pytest.mark.parametrize("enabled", list(permutations(LAYERS)))
+@pytest.mark.parametrize("disabled", list(permutations(LAYERS)))
+def test_layers_disable_in_any_order(enabled, disabled):
+    originals = {(cls, name): cls.__dict__[name] for cls, name in METHODS}
+    rev = IndividualRevenue(2024)
+    try:
+        for name in enabled:
+            LAYERS[name].enable()
+        LAYERS[disabled[0]].disable()
+        remaining = LAYERS[disabled[1]]
+        assert remaining.is_enabled() and not LAYERS[disabled[0]].is_enabled()
+
+        memo.individual_cache.clear()
+        instrumentation.reset()
+        rev.compute_basic_return(60_000.0, 0.0, 0.0, 0.0, 0.0, 0.0, False)
+        if remaining is memo:
+            assert len(memo.individual_cache) == 1 and _timed_calls() == 0
+        else:
+            assert len(memo.individual_cache) == 0 and _timed_calls() == 1
+
+        remaining.disable()
+        for (cls, name), original in originals.items():
+            assert cls.__dict__[name] is original
+    finally:
+        memo.disable()
+        instrumentation.disable()